@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Headless entry point: process a whole transcript folder without any GUI."""
+
+import argparse
+import json
+import os
+import sys
+from dotenv import load_dotenv
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
+
+# Load environment variables from .env file
+load_dotenv()
+
+from src.batch import BatchRunner
+from src.utils.config import Config
+from src.utils.logger import setup_logging
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Upload transcripts and start chats for a whole folder.")
+    parser.add_argument('pattern', nargs='?', help="Glob of files to process (default: batch.pattern inside paths.transcript_folder)")
+    parser.add_argument('--folder', help="Transcript folder (default: paths.transcript_folder)")
+    parser.add_argument('--model', help="Model to use (default: models.default)")
+    parser.add_argument('--workers', type=int, help="Files processed in parallel (default: batch.workers)")
+    parser.add_argument('--prompt', help="User message sent with every transcript (default: chat.prompt)")
+    parser.add_argument('--stream', action='store_true', default=None, help="Stream replies token by token and report time to first token")
+    parser.add_argument('--summary-dir', help="Write streamed replies to <dir>/<transcript>.md (default: stderr)")
+    parser.add_argument('--map-reduce', action='store_true', help="Summarize in context-sized chunks concurrently, then merge (see summarize: in config.yaml)")
+    parser.add_argument('--combine', action='store_true', help="Attach all files to one chat, uploading them in parallel (upload.parallel at a time)")
+    parser.add_argument('--compare', action='store_true', help="With --map-reduce, also time the single-shot path")
+    parser.add_argument('--preprocess', action='store_true', default=None, help="Strip timestamps, filler words and repeated speaker labels before uploading (default: preprocess.enabled)")
+    parser.add_argument('--no-preprocess', dest='preprocess', action='store_false', help="Upload transcripts unchanged")
+    parser.add_argument('--no-completion-cache', dest='use_cache', action='store_false', help="Send every file again instead of reusing stored replies; new replies are still cached")
+    parser.add_argument('--metrics-sink', help="Append one JSON line per API request to this file (default: metrics.sink)")
+    parser.add_argument('--output', help="Write the JSON summary to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    config = Config()
+    # Human-readable logs go to stderr so stdout stays machine-readable;
+    # the JSON log file is written by a background thread
+    setup_logging(config.get_log_config(), console=sys.stderr)
+    runner = BatchRunner(
+        config,
+        workers=args.workers,
+        prompt=args.prompt,
+        stream=args.stream,
+        summary_dir=args.summary_dir,
+        map_reduce=args.map_reduce,
+        compare=args.compare,
+        preprocess=args.preprocess,
+        use_cache=args.use_cache
+    )
+    if args.metrics_sink and runner.client.metrics:
+        runner.client.metrics.set_sink(args.metrics_sink)
+    files = runner.collect_files(args.pattern, args.folder)
+    model = args.model or config.get_default_model()
+    summary = runner.run_combined(model, files) if args.combine else runner.run(model, files)
+    runner.close()
+
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0 if summary["failed"] == 0 and summary.get("chat", {}).get("success", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Throughput and latency benchmarks for OpenWebUIClient against the mock server.
+
+The mock server runs in its own process so only the client is measured.
+Each workload reports p50/p95/p99 latency, requests/sec, error count, peak
+memory (Python heap via tracemalloc, and process RSS), the mean time per
+request phase from the client's metrics and the request bytes on the wire
+against their uncompressed size.
+
+    python benchmarks/client_bench.py                       # all workloads
+    python benchmarks/client_bench.py upload --compression none
+    python benchmarks/client_bench.py upload --requests 500 --size-kb 256
+    python benchmarks/client_bench.py completion --stream --latency 0.05 --rate-429 0.05
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Process, Queue
+from typing import Callable, Dict, List, Any
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+WORKLOADS = ('upload', 'completion')
+
+
+def _serve(queue: Queue, options: Dict[str, Any]) -> None:
+    from src.mock_server import MockOpenWebUIServer
+    server = MockOpenWebUIServer(keep_bodies=False, **options)
+    queue.put(server.url)
+    server.serve_forever()
+
+
+def start_mock_server(**options: Any):
+    """Start the mock server in a child process.
+
+    Returns:
+        (process, base URL)
+    """
+    queue: Queue = Queue()
+    process = Process(target=_serve, args=(queue, options), daemon=True)
+    process.start()
+    return process, queue.get(timeout=10)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def run_workload(name: str, call: Callable[[int], bool], requests: int, concurrency: int) -> Dict[str, Any]:
+    """Run ``call`` ``requests`` times over a thread pool and summarize it."""
+    latencies: List[float] = []
+    errors = 0
+
+    def timed(i: int) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        ok = call(i)
+        latencies.append(time.perf_counter() - start)
+        if not ok:
+            errors += 1
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(requests)))
+    wall = time.perf_counter() - start
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "workload": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "requests_per_s": round(requests / wall, 1) if wall else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "peak_heap_mb": round(heap_peak / (1024 * 1024), 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+def make_client(url: str, concurrency: int, compression: str = 'auto'):
+    from src.metrics import MetricsRegistry
+    from src.utils.config import Config
+    from src.webui_client import OpenWebUIClient
+
+    config = Config()
+    config.webui_url = url
+    config.override('upload_cache', {'enabled': False})
+    # Every request has to reach the server, or the numbers time cache hits
+    config.override('completion_cache', {'enabled': False})
+    config.override('upload', {'progress': False})
+    transport = config.get_transport_config()
+    config.override('webui.transport.pool_maxsize', max(int(transport.get('pool_maxsize', 10)), concurrency))
+    config.override('webui.compression', {**config.get_compression_config(), 'encoding': compression})
+    config.override('paths.data_dir', tempfile.mkdtemp(prefix='client-bench-'))
+    return OpenWebUIClient(config, metrics=MetricsRegistry())
+
+
+def phase_breakdown(client) -> Dict[str, Any]:
+    """Mean seconds per request phase, from the client's metrics."""
+    endpoints = client.metrics.summary()["endpoints"]
+    return {name: endpoint["phases_mean_s"] for name, endpoint in endpoints.items()}
+
+
+def wire_savings(client) -> Dict[str, Any]:
+    """Request body bytes sent, before and after compression."""
+    wire = sum(endpoint["bytes_sent"] for endpoint in client.metrics.summary()["endpoints"].values())
+    compression = client.compression.stats()
+    raw = wire + compression["saved_bytes"]
+    return {
+        "request_bytes_raw": raw,
+        "request_bytes_on_wire": wire,
+        "saved_pct": round(100.0 * (raw - wire) / raw, 1) if raw else 0.0,
+        "compressed_bodies": compression["compressed"],
+        "fallbacks": compression["fallbacks"]
+    }
+
+
+WORDS = (
+    "action items budget review the we should next week owner deadline agree "
+    "customer release plan risk question follow up team update numbers quarter "
+    "I think that is right let's move on to then okay so about design"
+).split()
+
+
+def synthetic_transcript(size: int, seed: int = 0) -> bytes:
+    """Meeting-like text of ``size`` bytes: timestamps, speakers, varied words."""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    second = 0
+    while total < size:
+        second += rng.randint(2, 20)
+        words = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 25)))
+        line = f"[{second // 3600:02}:{second // 60 % 60:02}:{second % 60:02}] Speaker {rng.randint(1, 6)}: {words}.\n"
+        lines.append(line)
+        total += len(line)
+    return ''.join(lines).encode()[:size]
+
+
+def bench_upload(url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Upload-heavy workload: many transcript uploads of ``size_kb`` each."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'transcript.txt')
+        with open(path, 'wb') as f:
+            f.write(synthetic_transcript(args.size_kb * 1024))
+        with make_client(url, args.concurrency, args.compression) as client:
+            result = run_workload(
+                'upload',
+                lambda i: client.upload_document(path, use_cache=False)["success"],
+                args.requests,
+                args.concurrency
+            )
+            result["phases_mean_s"] = phase_breakdown(client)
+            result["wire"] = wire_savings(client)
+    result["size_kb"] = args.size_kb
+    result["mb_per_s"] = round(args.requests * args.size_kb / 1024 / result["wall_s"], 1)
+    return result
+
+
+def bench_completion(url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Completion-heavy workload: many chat completions, optionally streamed."""
+    messages = [{"role": "user", "content": "Summarize the meeting."}]
+    with make_client(url, args.concurrency, args.compression) as client:
+        def call(i: int) -> bool:
+            try:
+                if args.stream:
+                    client.stream_chat("stand-in-model", messages).consume()
+                else:
+                    client.complete("stand-in-model", messages)
+                return True
+            except Exception:
+                return False
+
+        result = run_workload('completion', call, args.requests, args.concurrency)
+        result["phases_mean_s"] = phase_breakdown(client)
+        result["wire"] = wire_savings(client)
+    result["stream"] = args.stream
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark OpenWebUIClient against the mock server.")
+    parser.add_argument('workload', nargs='?', choices=WORKLOADS, help="Workload to run (default: all)")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--size-kb', type=int, default=128, help="Upload size per request")
+    parser.add_argument('--stream', action='store_true', help="Stream completions (SSE)")
+    parser.add_argument('--compression', default='auto', choices=('auto', 'gzip', 'zstd', 'none'), help="Request body compression")
+    parser.add_argument('--latency', type=float, default=0.01, help="Mock server latency per request, seconds")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--token-delay', type=float, default=0.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault('OPENWEBUI_API_KEY', 'benchmark')
+    import logging
+    logging.basicConfig(level=logging.CRITICAL)
+
+    process, url = start_mock_server(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_429=args.rate_429,
+        retry_after=0.05,
+        token_delay=args.token_delay
+    )
+    try:
+        results = []
+        for workload in ([args.workload] if args.workload else WORKLOADS):
+            bench = bench_upload if workload == 'upload' else bench_completion
+            results.append(bench(url, args))
+    finally:
+        process.terminate()
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Cold-start import-time benchmark with a recorded budget.
+
+Every module listed in startup_budget.json is imported in a fresh
+interpreter with ``python -X importtime``. The best cumulative import time
+of ``runs`` attempts is compared with its ``max_ms`` budget, and the
+``forbidden`` modules (Tk, CustomTkinter, requests) must not be loaded.
+Exits non-zero if any module is over budget.
+
+    python benchmarks/startup.py
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Any, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_budget.json')
+
+
+def load_budget(path: str = BUDGET_PATH) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def import_time(module: str) -> Tuple[float, List[str]]:
+    """Import ``module`` in a fresh interpreter.
+
+    Returns:
+        (cumulative import time in ms, names of all modules imported)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    cumulative_us = None
+    imported = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        imported.append(name.strip())
+        if name.strip() == module and not name[1:].startswith(' '):
+            cumulative_us = int(cumulative.strip())
+    if cumulative_us is None:
+        raise RuntimeError(f"No import time reported for {module}")
+    return cumulative_us / 1000.0, imported
+
+
+def check(budget: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Measure every budgeted module.
+
+    Returns:
+        One result per module with its best time, budget and violations
+    """
+    runs = int(budget.get('runs', 5))
+    results = []
+    for module, limits in budget['modules'].items():
+        samples = [import_time(module) for _ in range(runs)]
+        best_ms = min(ms for ms, _ in samples)
+        loaded = set(samples[0][1])
+        forbidden = sorted(
+            name for name in limits.get('forbidden', [])
+            if name in loaded or any(m.startswith(f'{name}.') for m in loaded)
+        )
+        results.append({
+            "module": module,
+            "best_ms": round(best_ms, 1),
+            "max_ms": limits['max_ms'],
+            "forbidden_loaded": forbidden,
+            "ok": best_ms <= limits['max_ms'] and not forbidden
+        })
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check cold-start import time against startup_budget.json")
+    parser.add_argument('--budget', default=BUDGET_PATH, help="Budget file")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = check(load_budget(args.budget))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            status = 'ok' if r['ok'] else 'OVER BUDGET'
+            extra = f" loads {', '.join(r['forbidden_loaded'])}" if r['forbidden_loaded'] else ''
+            print(f"{r['module']:<28} {r['best_ms']:>7.1f} ms / {r['max_ms']:>4} ms  {status}{extra}")
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Peak-RSS benchmark for streamed uploads of a large synthetic transcript.
+
+Writes a synthetic transcript (1 GB by default), starts a sink server in a
+separate process that reads and discards the request body, uploads the file
+through OpenWebUIClient.upload_document and reports the client's peak RSS.
+
+    python benchmarks/upload_rss.py --size-mb 1024
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Process, Queue
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+LINE = b"[00:12:34] Speaker 1: So the quarterly numbers look good, let's move on to the roadmap.\n"
+
+
+def write_transcript(path: str, size_mb: int) -> None:
+    """Write ``size_mb`` MB of repeated transcript lines without holding them in memory."""
+    block = LINE * (1024 * 1024 // len(LINE))
+    target = size_mb * 1024 * 1024
+    with open(path, 'wb') as f:
+        written = 0
+        while written < target:
+            chunk = block[:target - written]
+            f.write(chunk)
+            written += len(chunk)
+
+
+def _serve(queue: Queue) -> None:
+    class SinkHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            remaining = int(self.headers.get('Content-Length') or 0)
+            while remaining > 0:
+                remaining -= len(self.rfile.read(min(remaining, 1024 * 1024)))
+            body = json.dumps({"id": "sink-file"}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), SinkHandler)
+    queue.put(httpd.server_address[1])
+    httpd.serve_forever()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=1024, help="Synthetic transcript size in MB")
+    args = parser.parse_args()
+
+    os.environ.setdefault('OPENWEBUI_API_KEY', 'benchmark')
+    from src.utils.config import Config
+    from src.webui_client import OpenWebUIClient
+
+    queue: Queue = Queue()
+    server = Process(target=_serve, args=(queue,), daemon=True)
+    server.start()
+    port = queue.get(timeout=10)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic_transcript.txt')
+        write_transcript(path, args.size_mb)
+
+        config = Config()
+        config.webui_url = f"http://127.0.0.1:{port}"
+        config.override('upload_cache', {'enabled': False})
+        config.override('upload', {'progress': False})
+        # The sink reads Content-Length bodies only
+        config.override('webui.compression', {'encoding': 'none'})
+
+        baseline = peak_rss_mb()
+        with OpenWebUIClient(config) as client:
+            start = time.perf_counter()
+            result = client.upload_document(path)
+            elapsed = time.perf_counter() - start
+        peak = peak_rss_mb()
+
+    server.terminate()
+    print(json.dumps({
+        "file_mb": args.size_mb,
+        "success": result["success"],
+        "seconds": round(elapsed, 2),
+        "throughput_mb_s": round(args.size_mb / elapsed, 1),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(peak, 1),
+        "upload_rss_growth_mb": round(peak - baseline, 1)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Durable job queue entry point: enqueue transcripts, run the queue, show its status."""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+from dotenv import load_dotenv
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
+
+# Load environment variables from .env file
+load_dotenv()
+
+from src.job_queue import JobQueue, JobRunner
+from src.utils.config import Config
+from src.utils.logger import setup_logging
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Process transcripts through a crash-safe job queue.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help="Enqueue matching files (if given) and process the queue until it is empty")
+    run.add_argument('pattern', nargs='?', help="Glob of files to enqueue first, relative to --folder")
+    run.add_argument('--folder', help="Transcript folder (default: paths.transcript_folder)")
+    run.add_argument('--model', help="Model to use (default: models.default)")
+    run.add_argument('--prompt', help="User message sent with every transcript (default: chat.prompt)")
+    run.add_argument('--workers', type=int, help="Jobs executed in parallel (default: batch.workers)")
+
+    enqueue = sub.add_parser('enqueue', help="Add files to the queue without processing them")
+    enqueue.add_argument('pattern', nargs='?', help="Glob of files to enqueue (default: batch.pattern)")
+    enqueue.add_argument('--folder', help="Transcript folder (default: paths.transcript_folder)")
+    enqueue.add_argument('--model', help="Model to use (default: models.default)")
+    enqueue.add_argument('--prompt', help="User message sent with every transcript (default: chat.prompt)")
+
+    status = sub.add_parser('status', help="Show queue depth, throughput and dead-lettered jobs")
+    status.add_argument('--window', type=float, default=300.0, help="Seconds over which throughput is measured")
+
+    sub.add_parser('retry-dead', help="Move dead-lettered jobs back to pending")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    config = Config()
+    # Human-readable logs go to stderr so stdout stays machine-readable;
+    # the JSON log file is written by a background thread
+    setup_logging(config.get_log_config(), console=sys.stderr)
+    queue = JobQueue(os.path.join(config.get_data_dir(), 'jobs.sqlite3'), config.get_jobs_config())
+    try:
+        if args.command == 'status':
+            print(json.dumps(queue.status(window=args.window), indent=2))
+            return 0
+        if args.command == 'retry-dead':
+            print(json.dumps({"requeued": queue.retry_dead()}))
+            return 0
+
+        # Imported here so status and retry-dead work without an API key
+        from src.batch import BatchRunner
+        from src.preprocess import Preprocessor
+        from src.webui_client import OpenWebUIClient
+
+        client = OpenWebUIClient(config)
+        preprocessor = Preprocessor.from_config(config) if config.get_preprocess_config().get('enabled') else None
+        try:
+            runner = JobRunner(
+                queue,
+                client,
+                args.model or config.get_default_model(),
+                prompt=args.prompt or config.get_chat_config().get('prompt'),
+                workers=getattr(args, 'workers', None) or config.get_batch_config().get('workers', 4),
+                preprocessor=preprocessor
+            )
+            if args.pattern or args.command == 'enqueue':
+                files = BatchRunner(config, client=client, preprocess=False).collect_files(args.pattern, args.folder)
+                logging.getLogger(__name__).info(f"Enqueued {runner.enqueue_files(files)} of {len(files)} files")
+            if args.command == 'enqueue':
+                return 0
+
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: runner.stop())
+            status = runner.run()
+        finally:
+            if preprocessor:
+                preprocessor.close()
+            client.close()
+        print(json.dumps(status, indent=2))
+        return 0 if not status["dead"] else 1
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Entry point for OpenWebUI automation."""
 
+import argparse
 import os
 import sys
 from dotenv import load_dotenv
@@ -14,5 +15,9 @@ load_dotenv()
 from src.main import OpenWebUIAutomation
 
 if __name__ == "__main__":
-    app = OpenWebUIAutomation()
+    parser = argparse.ArgumentParser(description="Upload a transcript and open a chat in OpenWebUI.")
+    parser.add_argument('--refresh-models', action='store_true', help="Fetch the model list from the server even if the cached copy is fresh")
+    args = parser.parse_args()
+
+    app = OpenWebUIAutomation(refresh_models=args.refresh_models)
     app.run()
@@ -0,0 +1,368 @@
+"""Asyncio OpenWebUI API client for concurrent uploads and completions."""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Any, Iterable
+
+import aiohttp
+
+from .metrics import MetricsRegistry, endpoint_label, new_record
+from .transport import DEFAULT_TRANSPORT_CONFIG, IDEMPOTENT_METHODS
+from .utils.config import Config
+from .utils.error_handler import OpenWebUIError
+
+
+def _read_bytes(file_path: str) -> bytes:
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+class AsyncOpenWebUIClient:
+    """Asyncio counterpart of ``OpenWebUIClient``.
+
+    One instance owns an ``aiohttp`` session whose connector is capped at
+    ``max_concurrency`` connections per host, and a semaphore that bounds the
+    number of calls in flight. Many uploads and completions can therefore be
+    scheduled on a single event loop without overloading the server. Uploads
+    also take one of ``max_concurrency`` upload slots before reading their
+    file, so at most that many files are held in memory at once.
+
+    Use as an async context manager::
+
+        async with AsyncOpenWebUIClient(config) as client:
+            results = await client.create_chats(model, paths)
+
+    Requests are recorded in the metrics registry through aiohttp trace
+    hooks; aiohttp reports TCP connect and TLS handshake as one ``connect``
+    phase.
+    """
+
+    def __init__(self, config: Config, max_concurrency: Optional[int] = None, metrics: Optional[MetricsRegistry] = None):
+        """Initialize async client with configuration.
+
+        Args:
+            config: Loaded configuration
+            max_concurrency: Max calls in flight, defaults to
+                webui.transport.max_concurrency
+            metrics: Registry for per-request metrics; defaults to the
+                process-wide registry when ``metrics.enabled`` is set
+        """
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+        self.api_key = config.get_api_key() or os.getenv('OPENWEBUI_API_KEY')
+        if not self.api_key:
+            raise ValueError("OPENWEBUI_API_KEY environment variable is required")
+
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        self.settings = {**DEFAULT_TRANSPORT_CONFIG, **config.get_transport_config()}
+        self.max_concurrency = int(max_concurrency or self.settings['max_concurrency'])
+        if metrics is None and config.get_metrics_config().get('enabled', True):
+            metrics = MetricsRegistry.shared(config)
+        self.metrics = metrics
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._upload_slots: Optional[asyncio.Semaphore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'AsyncOpenWebUIClient':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Create the underlying session. Must run inside the event loop."""
+        if self._session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.max_concurrency,
+            keepalive_timeout=30
+        )
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=float(self.settings['connect_timeout']),
+            sock_read=float(self.settings['read_timeout'])
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._upload_slots = asyncio.Semaphore(self.max_concurrency)
+        trace_configs = [self._trace_config()] if self.metrics else []
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=trace_configs)
+
+    @staticmethod
+    def _trace_config() -> aiohttp.TraceConfig:
+        """Trace hooks adding phase timings and byte counts to the request record."""
+        trace = aiohttp.TraceConfig()
+
+        def record_of(ctx):
+            return ctx.trace_request_ctx if isinstance(ctx.trace_request_ctx, dict) else None
+
+        def setup_time(record):
+            return record["phases"]["dns"] + record["phases"]["connect"]
+
+        async def on_request_start(session, ctx, params):
+            record = record_of(ctx)
+            if record is not None:
+                record["attempts"] += 1
+                ctx.started = time.perf_counter()
+                ctx.setup_before = setup_time(record)
+
+        async def on_dns_start(session, ctx, params):
+            if record_of(ctx) is not None:
+                ctx.dns_started = time.perf_counter()
+
+        async def on_dns_end(session, ctx, params):
+            record = record_of(ctx)
+            if record is not None and hasattr(ctx, 'dns_started'):
+                record["phases"]["dns"] += time.perf_counter() - ctx.dns_started
+
+        async def on_connect_start(session, ctx, params):
+            record = record_of(ctx)
+            if record is not None:
+                ctx.connect_started = time.perf_counter()
+                ctx.dns_before = record["phases"]["dns"]
+
+        async def on_connect_end(session, ctx, params):
+            # Name resolution happens inside connection setup; count it once
+            record = record_of(ctx)
+            if record is not None and hasattr(ctx, 'connect_started'):
+                dns = record["phases"]["dns"] - ctx.dns_before
+                record["phases"]["connect"] += max(0.0, time.perf_counter() - ctx.connect_started - dns)
+
+        async def on_chunk_sent(session, ctx, params):
+            record = record_of(ctx)
+            if record is not None:
+                record["bytes_sent"] += len(params.chunk)
+                ctx.sent = time.perf_counter()
+
+        async def on_headers_sent(session, ctx, params):
+            if record_of(ctx) is not None:
+                ctx.sent = time.perf_counter()
+
+        async def on_request_end(session, ctx, params):
+            record = record_of(ctx)
+            if record is None:
+                return
+            now = time.perf_counter()
+            sent = getattr(ctx, 'sent', now)
+            setup = setup_time(record) - ctx.setup_before
+            record["phases"]["send"] += max(0.0, sent - ctx.started - setup)
+            record["phases"]["wait"] += now - sent
+            record["headers_at"] = now
+
+        async def on_chunk_received(session, ctx, params):
+            record = record_of(ctx)
+            if record is not None:
+                record["bytes_received"] += len(params.chunk)
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_dns_resolvehost_start.append(on_dns_start)
+        trace.on_dns_resolvehost_end.append(on_dns_end)
+        trace.on_connection_create_start.append(on_connect_start)
+        trace.on_connection_create_end.append(on_connect_end)
+        trace.on_request_headers_sent.append(on_headers_sent)
+        trace.on_request_chunk_sent.append(on_chunk_sent)
+        trace.on_request_end.append(on_request_end)
+        trace.on_response_chunk_received.append(on_chunk_received)
+        return trace
+
+    def _observe(self, record: Dict[str, Any], started: float) -> None:
+        now = time.perf_counter()
+        record["duration_s"] = now - started
+        record["retries"] = max(0, record["attempts"] - 1)
+        headers_at = record.pop("headers_at", None)
+        if headers_at is not None:
+            record["phases"]["download"] = now - headers_at
+        self.metrics.observe(record)
+
+    async def close(self) -> None:
+        """Close the session and its pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _make_request(self, method: str, endpoint: str, data: Any = None, json: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make HTTP request to OpenWebUI API.
+
+        Idempotent methods are retried with exponential backoff on connection
+        errors and on the configured retry statuses.
+
+        Args:
+            method: HTTP method (GET, POST, etc)
+            endpoint: API endpoint
+            data: Form data for multipart uploads
+            json: JSON data for POST
+
+        Returns:
+            Response data as dictionary
+        """
+        await self.open()
+        url = f"{self.config.get_webui_url()}{endpoint}"
+        headers = self.headers.copy()
+        if data is not None:
+            # Let aiohttp set the multipart boundary
+            headers.pop('Content-Type', None)
+
+        retries = int(self.settings['max_retries']) if method in IDEMPOTENT_METHODS else 0
+        backoff = float(self.settings['backoff_factor'])
+        retry_statuses = set(self.settings['retry_statuses'])
+
+        record = new_record(method, endpoint_label(endpoint)) if self.metrics else None
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    async with self._session.request(
+                        method, url, headers=headers, data=data, json=json, trace_request_ctx=record
+                    ) as response:
+                        if record is not None:
+                            record["status"] = response.status
+                        response.raise_for_status()
+                        result = await response.json(content_type=None)
+                if record is not None:
+                    self._observe(record, started)
+                return result
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in retry_statuses
+                if retryable and attempt < retries:
+                    delay = backoff * (2 ** attempt)
+                    attempt += 1
+                    self.logger.debug(f"Retrying {method} {endpoint} in {delay:.2f}s: {e}")
+                    await asyncio.sleep(delay)
+                    continue
+                if record is not None:
+                    if not isinstance(e, aiohttp.ClientResponseError):
+                        record["status"] = None
+                        record["error"] = type(e).__name__
+                    self._observe(record, started)
+                self.logger.error(f"API request failed: {str(e)}")
+                raise OpenWebUIError(f"API request failed: {str(e)}")
+
+    async def list_models(self) -> List[Dict[str, Any]]:
+        """List available models.
+
+        Returns:
+            List of model information dictionaries
+        """
+        try:
+            response = await self._make_request('GET', '/api/models')
+            if not response or not isinstance(response, dict):
+                raise OpenWebUIError("Invalid response format")
+
+            return response.get('data', [])
+
+        except Exception as e:
+            self.logger.error(f"Failed to list models: {str(e)}")
+            return []
+
+    async def upload_document(self, file_path: str) -> Dict[str, Any]:
+        """Upload a document to OpenWebUI's document storage.
+
+        Args:
+            file_path: Path to the file to upload
+
+        Returns:
+            Response from the upload API
+        """
+        self.logger.info(f"Uploading document: {file_path}")
+
+        try:
+            file_name = os.path.basename(file_path)
+            await self.open()
+            # The file is read only once a slot is free, and released after the upload
+            async with self._upload_slots:
+                # Read on a worker thread so a slow disk does not stall the event loop
+                loop = asyncio.get_running_loop()
+                content = await loop.run_in_executor(None, _read_bytes, file_path)
+                form = aiohttp.FormData()
+                form.add_field('file', content, filename=file_name, content_type='text/plain')
+                upload_response = await self._make_request('POST', '/api/files/', data=form)
+
+            file_id = upload_response.get('id')
+            if not file_id:
+                raise OpenWebUIError("No file ID in response")
+
+            self.logger.info("Document uploaded successfully")
+            return {
+                "success": True,
+                "file_id": file_id,
+                "response": upload_response
+            }
+
+        except Exception as e:
+            self.logger.error(f"Failed to upload document: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    async def create_chat(
+        self,
+        model: str,
+        file_path: str
+    ) -> Dict[str, Any]:
+        """Create new chat with file reference.
+
+        Args:
+            model: Model to use for chat
+            file_path: Path to transcript file
+
+        Returns:
+            Chat session information
+        """
+        try:
+            upload_result = await self.upload_document(file_path)
+            if not upload_result["success"]:
+                return upload_result
+
+            chat_data = {
+                "model": model,
+                "messages": [],
+                "file_ids": [upload_result["file_id"]]
+            }
+
+            chat_response = await self._make_request('POST', '/api/chat/completions', json=chat_data)
+
+            return {
+                "success": True,
+                "file_id": upload_result["file_id"],
+                "chat_id": chat_response.get("id"),
+                "response": chat_response
+            }
+
+        except Exception as e:
+            self.logger.error(f"Failed to create chat: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    async def upload_documents(self, file_paths: Iterable[str]) -> List[Dict[str, Any]]:
+        """Upload several documents concurrently.
+
+        Args:
+            file_paths: Paths of the files to upload
+
+        Returns:
+            Upload results, in the order of ``file_paths``
+        """
+        return await asyncio.gather(*(self.upload_document(p) for p in file_paths))
+
+    async def create_chats(self, model: str, file_paths: Iterable[str]) -> List[Dict[str, Any]]:
+        """Create one chat per file, concurrently.
+
+        Args:
+            model: Model to use for every chat
+            file_paths: Paths of the transcript files
+
+        Returns:
+            Chat results, in the order of ``file_paths``
+        """
+        return await asyncio.gather(*(self.create_chat(model, p) for p in file_paths))
@@ -0,0 +1,92 @@
+"""Work run off the Tk main thread while the GUI waits for the user.
+
+Tk may only be touched from the thread running its event loop, so workers
+never call into it. A BackgroundTask records its stage and upload progress
+under a lock instead; the dialog polls ``describe()`` from a ``window.after``
+callback and redraws its status line. The event loop therefore never waits
+on the network.
+
+Nothing here imports Tk, so tasks can be driven and tested headless.
+"""
+
+import logging
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Optional
+
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class BackgroundTask:
+    """A function run on an executor whose progress another thread can poll."""
+
+    def __init__(self, name: str, executor: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any):
+        """Start the task.
+
+        Args:
+            name: What the task does, shown in the status line, e.g. "Upload"
+            executor: Executor the task runs on
+            fn: Called as ``fn(task, *args, **kwargs)``; it may report
+                ``task.stage(...)`` and ``task.progress(...)``
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.state = RUNNING
+        self.error: Optional[str] = None
+        self._stage = 'Waiting'
+        self._sent = 0
+        self._total = 0
+        self._lock = threading.Lock()
+        self.future: Future = executor.submit(self._run, fn, args, kwargs)
+
+    def _run(self, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        try:
+            result = fn(self, *args, **kwargs)
+        except Exception as e:
+            self.logger.error(f"{self.name} failed: {str(e)}")
+            with self._lock:
+                self.state, self.error = FAILED, str(e)
+            raise
+        with self._lock:
+            if isinstance(result, dict) and not result.get("success", True):
+                self.state, self.error = FAILED, str(result.get("error"))
+            else:
+                self.state = DONE
+        return result
+
+    def stage(self, text: str) -> None:
+        """Name the step the task is in, e.g. "Uploading"."""
+        with self._lock:
+            self._stage = text
+            self._sent = self._total = 0
+
+    def progress(self, sent: int, total: int) -> None:
+        """Record bytes sent; a ProgressCallback for upload_document."""
+        with self._lock:
+            self._sent, self._total = sent, total
+
+    def done(self) -> bool:
+        """Whether the task has finished, successfully or not."""
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Wait for the task and return what ``fn`` returned (or raise what it raised)."""
+        return self.future.result(timeout)
+
+    def cancel(self) -> bool:
+        """Cancel the task if it has not started yet."""
+        return self.future.cancel()
+
+    def describe(self) -> str:
+        """One-line status for the GUI."""
+        with self._lock:
+            if self.state == DONE:
+                return f"{self.name} finished"
+            if self.state == FAILED:
+                return f"{self.name} failed: {self.error}"
+            if self._total:
+                percent = 100 * self._sent // self._total
+                return f"{self._stage}... {percent}% of {self._total / (1024 * 1024):.1f} MB"
+            return f"{self._stage}..."
@@ -0,0 +1,375 @@
+"""Headless batch processing of a transcript folder.
+
+Nothing on this path imports tkinter or customtkinter, so it runs on
+display-less machines (cron, CI, servers).
+"""
+
+import glob
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any
+
+from .chat_stream import token_writer
+from .planner import CHUNKED, ContextPlanner
+from .preprocess import Preprocessor, summarize_reports
+from .summarize import MapReduceSummarizer
+from .tokens import TokenEstimator
+from .utils.config import Config
+from .utils.logger import log_context
+from .webui_client import OpenWebUIClient
+
+DEFAULT_PATTERN = '*.txt'
+DEFAULT_WORKERS = 8
+
+
+class BatchRunner:
+    """Upload transcripts and create chats for many files in parallel."""
+
+    def __init__(
+        self,
+        config: Config,
+        client: Optional[OpenWebUIClient] = None,
+        workers: Optional[int] = None,
+        prompt: Optional[str] = None,
+        stream: Optional[bool] = None,
+        summary_dir: Optional[str] = None,
+        map_reduce: bool = False,
+        compare: bool = False,
+        preprocess: Optional[bool] = None,
+        use_cache: bool = True
+    ):
+        """Initialize batch runner.
+
+        Args:
+            config: Loaded configuration
+            client: Client to use, created from ``config`` if omitted
+            workers: Number of files processed in parallel, defaults to batch.workers
+            prompt: User message sent with every file, defaults to chat.prompt
+            stream: Stream replies token by token, defaults to chat.stream
+            summary_dir: Folder streamed replies are written to as
+                ``<transcript name>.md``; stderr if omitted
+            map_reduce: Summarize long transcripts chunk by chunk instead of
+                attaching the whole file to one chat
+            compare: With map_reduce, also time the single-shot path
+            preprocess: Clean transcripts before uploading them, defaults
+                to preprocess.enabled
+            use_cache: Reuse stored replies from the completion cache; when
+                False every file is sent again and its reply re-stored
+        """
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.client = client or OpenWebUIClient(config)
+        batch_config = config.get_batch_config()
+        chat_config = config.get_chat_config()
+        self.workers = int(workers or batch_config.get('workers', DEFAULT_WORKERS))
+        self.pattern = batch_config.get('pattern', DEFAULT_PATTERN)
+        self.prompt = prompt or chat_config.get('prompt')
+        self.stream = bool(chat_config.get('stream', False) if stream is None else stream)
+        self.summary_dir = summary_dir
+        self.map_reduce = map_reduce
+        self.compare = compare
+        self.planner: Optional[ContextPlanner] = None
+        if preprocess is None:
+            preprocess = config.get_preprocess_config().get('enabled', False)
+        self.preprocessor = Preprocessor.from_config(config) if preprocess else None
+        self._cleaned: Dict[str, Dict[str, Any]] = {}
+        self.use_cache = use_cache
+
+    def close(self) -> None:
+        """Release the client, the planner's estimate cache and the preprocessor."""
+        if self.planner:
+            self.planner.estimator.close()
+        if self.preprocessor:
+            self.preprocessor.close()
+        self.client.close()
+
+    def collect_files(self, pattern: Optional[str] = None, folder: Optional[str] = None) -> List[str]:
+        """Resolve the files to process.
+
+        Args:
+            pattern: Glob pattern; relative patterns are matched inside ``folder``
+            folder: Folder to search, defaults to paths.transcript_folder
+
+        Returns:
+            Sorted list of matching file paths
+        """
+        folder = folder or self.config.get_transcript_folder()
+        pattern = os.path.expanduser(pattern or self.pattern)
+        if not os.path.isabs(pattern):
+            pattern = os.path.join(folder, pattern)
+        return sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+
+    def process_file(self, model: str, file_path: str) -> Dict[str, Any]:
+        """Upload one file and create a chat for it.
+
+        Args:
+            model: Model to use for the chat
+            file_path: Path to transcript file
+
+        Returns:
+            Per-file summary entry
+        """
+        # Every record logged while the file is processed names it
+        with log_context(file=file_path):
+            return self._process_file(model, file_path)
+
+    def _process_file(self, model: str, file_path: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        plan = None
+        cleaned = None
+        try:
+            upload_path = file_path
+            if self.preprocessor:
+                cleaned = self._cleaned.pop(file_path, None) or self.preprocessor.process(file_path)
+                if cleaned.get("error"):
+                    raise RuntimeError(f"Preprocessing failed: {cleaned['error']}")
+                upload_path = cleaned["output"]
+
+            map_reduce = self.map_reduce
+            if self.planner:
+                plan = self.planner.plan(upload_path, model)
+                plan["file"] = file_path
+                model = plan["model"]
+                map_reduce = map_reduce or plan["strategy"] == CHUNKED
+
+            if map_reduce:
+                result = self._map_reduce(model, upload_path, plan)
+            elif self.stream:
+                result = self._stream_chat(model, upload_path)
+            else:
+                result = self.client.create_chat(model, upload_path, prompt=self.prompt, use_cache=self.use_cache)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        latency = time.perf_counter() - start
+
+        entry = {
+            "file": file_path,
+            "success": bool(result.get("success")),
+            "file_id": result.get("file_id"),
+            "chat_id": result.get("chat_id"),
+            "server": result.get("server"),
+            "chat": result.get("response") if result.get("success") else None,
+            "latency_s": round(latency, 3),
+            "error": result.get("error")
+        }
+        if result.get("stats"):
+            entry["stream"] = result["stats"]
+        if result.get("completion_cached"):
+            entry["completion_cached"] = True
+        if result.get("summary_path"):
+            entry["summary_path"] = result["summary_path"]
+        if result.get("map_reduce"):
+            entry["map_reduce"] = result["map_reduce"]
+        if cleaned and not cleaned.get("error"):
+            entry["preprocess"] = {
+                k: cleaned[k] for k in ("bytes_in", "bytes_out", "bytes_saved", "tokens_in", "tokens_out", "tokens_saved", "saved_pct", "cached")
+            }
+        if plan:
+            entry["plan"] = {k: plan[k] for k in ("model", "strategy", "tokens", "context", "warning")}
+        if entry["success"]:
+            self.logger.info(f"Processed {file_path} in {latency:.2f}s")
+        else:
+            self.logger.error(f"Failed to process {file_path}: {entry['error']}")
+        return entry
+
+    def _map_reduce(self, model: str, file_path: str, plan: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Summarize a file with map-reduce, optionally timing the single-shot path too.
+
+        With a plan, chunks are sized to the model's context and the file's
+        estimated characters per token.
+        """
+        settings = self.config.get_summarize_config()
+        if plan:
+            reserve = int(self.config.get_planner_config().get('reserve_tokens', 1024))
+            chunk_tokens = int(settings.get('chunk_tokens', plan["context"] - reserve))
+            settings['chunk_tokens'] = max(1, min(chunk_tokens, plan["context"] - reserve))
+            if plan["chars_per_token"]:
+                settings['chars_per_token'] = plan["chars_per_token"]
+        summarizer = MapReduceSummarizer(self.client, model, settings)
+        stats = summarizer.summarize_file(file_path)
+        summary = stats.pop("summary")
+        stats.pop("file")
+        if self.compare:
+            single = summarizer.single_shot(file_path, self.prompt)
+            stats["single_shot_wall_time_s"] = single["wall_time_s"]
+            stats["single_shot_success"] = single["success"]
+            self.logger.info(
+                f"{file_path}: map-reduce {stats['wall_time_s']:.2f}s vs single-shot {single['wall_time_s']:.2f}s"
+            )
+        return {
+            "success": True,
+            "response": {"model": model, "choices": [{"index": 0, "message": {"role": "assistant", "content": summary}}]},
+            "map_reduce": stats
+        }
+
+    def _stream_chat(self, model: str, file_path, stem: Optional[str] = None) -> Dict[str, Any]:
+        """Create a streamed chat, writing tokens out as they arrive.
+
+        Args:
+            model: Model to use for the chat
+            file_path: Path of the file, or list of paths, to attach
+            stem: Name of the summary file, defaults to the transcript's name
+        """
+        if not self.summary_dir:
+            return self.client.create_chat(
+                model, file_path, prompt=self.prompt, stream=True, on_token=token_writer(sys.stderr),
+                use_cache=self.use_cache
+            )
+
+        os.makedirs(self.summary_dir, exist_ok=True)
+        stem = stem or os.path.splitext(os.path.basename(file_path))[0]
+        summary_path = os.path.join(self.summary_dir, f"{stem}.md")
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            result = self.client.create_chat(
+                model, file_path, prompt=self.prompt, stream=True, on_token=token_writer(f),
+                use_cache=self.use_cache
+            )
+        if result.get("success"):
+            result["summary_path"] = summary_path
+        return result
+
+    def prepare(self) -> None:
+        """Set up the context planner, if enabled, before files are processed."""
+        if self.config.get_planner_config().get('enabled', True) and self.planner is None:
+            # Plan every file locally before anything is uploaded
+            self.planner = ContextPlanner(
+                TokenEstimator.from_config(self.config),
+                self.client.list_models(),
+                self.config.get_planner_config()
+            )
+
+    def run_combined(self, model: str, files: List[str]) -> Dict[str, Any]:
+        """Attach all files to a single chat, uploading them concurrently.
+
+        Files that fail to preprocess or upload are reported per file; the
+        chat is created with the rest. Context planning and map-reduce work
+        per file and are not applied here.
+
+        Args:
+            model: Model to use for the chat
+            files: Paths of the transcripts to attach
+
+        Returns:
+            Machine-readable summary of the run, with the ``chat`` and one
+            entry per file
+        """
+        self.logger.info(f"Attaching {len(files)} files to one chat using {model}")
+        start = time.perf_counter()
+        entries: Dict[str, Dict[str, Any]] = {}
+        upload_paths: Dict[str, str] = {}
+        reports = self.preprocessor.process_many(files) if self.preprocessor else [None] * len(files)
+        for file_path, cleaned in zip(files, reports):
+            if cleaned and cleaned.get("error"):
+                entries[file_path] = {"file": file_path, "success": False, "error": f"Preprocessing failed: {cleaned['error']}"}
+            else:
+                upload_paths[cleaned["output"] if cleaned else file_path] = file_path
+
+        result: Dict[str, Any] = {"success": False, "error": "No files to attach"}
+        if upload_paths:
+            try:
+                if self.stream:
+                    result = self._stream_chat(model, list(upload_paths), stem="combined")
+                else:
+                    result = self.client.create_chat(model, list(upload_paths), prompt=self.prompt, use_cache=self.use_cache)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+        wall_time = time.perf_counter() - start
+
+        for upload in result.get("files", []):
+            file_path = upload_paths[upload["path"]]
+            entries[file_path] = {
+                "file": file_path,
+                "success": bool(upload["success"]),
+                "file_id": upload["file_id"],
+                "upload_s": upload["upload_s"],
+                "error": upload["error"]
+            }
+        if not result.get("files") and not result.get("completion_cached"):
+            # Nothing was attempted per file (e.g. hashing failed); the chat error applies to all
+            for file_path in upload_paths.values():
+                entries.setdefault(file_path, {"file": file_path, "success": False, "error": result.get("error")})
+        for file_path in upload_paths.values():
+            entries.setdefault(file_path, {"file": file_path, "success": True})
+        results = [entries[f] for f in files]
+
+        succeeded = sum(1 for r in results if r["success"])
+        uploads = [r["upload_s"] for r in results if r.get("upload_s") is not None]
+        chat = {
+            "success": bool(result.get("success")),
+            "chat_id": result.get("chat_id"),
+            "server": result.get("server"),
+            "file_ids": result.get("file_ids"),
+            "response": result.get("response") if result.get("success") else None,
+            "error": result.get("error")
+        }
+        if result.get("completion_cached"):
+            chat["completion_cached"] = True
+        if result.get("summary_path"):
+            chat["summary_path"] = result["summary_path"]
+        summary = {
+            "model": model,
+            "combined": True,
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "wall_time_s": round(wall_time, 3),
+            "slowest_upload_s": max(uploads) if uploads else None,
+            "chat": chat,
+            "files": results
+        }
+        if self.client.upload_cache:
+            summary["upload_cache"] = self.client.upload_cache.stats()
+        if self.client.metrics:
+            summary["metrics"] = self.client.metrics.summary()["endpoints"]
+        if chat["success"]:
+            self.logger.info(f"Chat with {len(chat['file_ids'] or [])} of {len(files)} files created in {wall_time:.2f}s")
+        else:
+            self.logger.error(f"Failed to create chat: {chat['error']}")
+        return summary
+
+    def run(self, model: str, files: List[str]) -> Dict[str, Any]:
+        """Process files over the worker pool.
+
+        Args:
+            model: Model to use for every chat
+            files: Paths of the transcripts to process
+
+        Returns:
+            Machine-readable summary of the run
+        """
+        self.logger.info(f"Processing {len(files)} files with {self.workers} workers using {model}")
+        start = time.perf_counter()
+        self.prepare()
+        if self.preprocessor and self.preprocessor.processes > 1:
+            # Clean the whole batch in a process pool before uploading
+            self._cleaned.update(zip(files, self.preprocessor.process_many(files)))
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            results = list(pool.map(lambda path: self.process_file(model, path), files))
+        wall_time = time.perf_counter() - start
+
+        succeeded = sum(1 for r in results if r["success"])
+        summary = {
+            "model": model,
+            "workers": self.workers,
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "wall_time_s": round(wall_time, 3),
+            "files": results
+        }
+        if self.preprocessor:
+            summary["preprocess"] = summarize_reports([r["preprocess"] for r in results if "preprocess" in r])
+        if self.client.upload_cache:
+            summary["upload_cache"] = self.client.upload_cache.stats()
+        if self.client.completion_cache:
+            summary["completion_cache"] = self.client.completion_cache.stats()
+        if self.client.limiter:
+            summary["limits"] = self.client.limiter.stats()
+        if len(self.client.router.endpoints) > 1:
+            summary["servers"] = self.client.router.stats()
+        if self.client.metrics:
+            summary["metrics"] = self.client.metrics.summary()["endpoints"]
+        return summary
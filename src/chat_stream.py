@@ -0,0 +1,150 @@
+"""Incremental parsing of streamed (server-sent events) chat completions."""
+
+import json
+import logging
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any
+
+from .utils.error_handler import OpenWebUIError
+
+TokenCallback = Callable[[str], None]
+
+
+def iter_sse_data(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Yield the ``data`` payload of every server-sent event.
+
+    Chunks may split lines and events at any byte; multi-line ``data``
+    fields are joined with newlines as the SSE spec requires.
+
+    Args:
+        chunks: Raw response body chunks as they arrive
+
+    Yields:
+        Event data strings
+    """
+    buffer = b''
+    data_lines: List[str] = []
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for raw in lines:
+            line = raw.rstrip(b'\r').decode('utf-8')
+            if not line:
+                if data_lines:
+                    yield '\n'.join(data_lines)
+                    data_lines = []
+            elif line.startswith('data:'):
+                value = line[5:]
+                data_lines.append(value[1:] if value.startswith(' ') else value)
+            # Comments (":") and other fields (event, id, retry) are ignored
+    if buffer.strip().startswith(b'data:'):
+        value = buffer.strip()[5:].decode('utf-8')
+        data_lines.append(value[1:] if value.startswith(' ') else value)
+    if data_lines:
+        yield '\n'.join(data_lines)
+
+
+class ChatStream:
+    """Iterator over the tokens of a streamed chat completion.
+
+    Iterating yields content deltas as they arrive and calls ``on_token`` for
+    each. Once exhausted, ``content`` holds the full reply and ``stats`` the
+    time to first token and token throughput.
+    """
+
+    def __init__(self, response, on_token: Optional[TokenCallback] = None, started: Optional[float] = None):
+        """Initialize chat stream.
+
+        Args:
+            response: Streaming ``requests.Response`` of /api/chat/completions
+            on_token: Called with every content delta
+            started: ``time.perf_counter()`` when the request was sent
+        """
+        self.response = response
+        self.on_token = on_token
+        self.logger = logging.getLogger(__name__)
+        self.started = started if started is not None else time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.chat_id: Optional[str] = None
+        self.tokens = 0
+        self.usage: Dict[str, Any] = {}
+        self._parts: List[str] = []
+
+    def _events(self) -> Iterator[Dict[str, Any]]:
+        content_type = self.response.headers.get('Content-Type', '')
+        if content_type.startswith('application/json'):
+            # Server ignored "stream": true and answered with one JSON body
+            body = self.response.json()
+            for choice in body.get('choices') or []:
+                choice['delta'] = choice.get('message') or {}
+            yield body
+            return
+        for data in iter_sse_data(self.response.iter_content(chunk_size=None)):
+            if data.strip() == '[DONE]':
+                return
+            yield json.loads(data)
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for event in self._events():
+                if 'error' in event:
+                    raise OpenWebUIError(f"Streamed completion failed: {event['error']}")
+                self.chat_id = self.chat_id or event.get('id')
+                if event.get('usage'):
+                    self.usage = event['usage']
+                for choice in event.get('choices') or []:
+                    token = (choice.get('delta') or {}).get('content')
+                    if not token:
+                        continue
+                    if self.first_token_at is None:
+                        self.first_token_at = time.perf_counter()
+                    self.tokens += 1
+                    self._parts.append(token)
+                    if self.on_token:
+                        self.on_token(token)
+                    yield token
+        finally:
+            self.finished_at = time.perf_counter()
+            self.response.close()
+            self.logger.info(
+                f"Streamed completion: ttft={self.stats['ttft_s']}s, "
+                f"{self.stats['completion_tokens']} tokens, {self.stats['tokens_per_s']} tokens/s"
+            )
+
+    def consume(self) -> str:
+        """Read the stream to the end and return the full reply."""
+        for _ in self:
+            pass
+        return self.content
+
+    @property
+    def content(self) -> str:
+        """Reply text received so far."""
+        return ''.join(self._parts)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Time to first token, total time and tokens/sec of this call.
+
+        The server-reported ``completion_tokens`` is used when the final
+        chunk carries usage; otherwise every content delta counts as one.
+        """
+        end = self.finished_at or time.perf_counter()
+        tokens = int(self.usage.get('completion_tokens') or self.tokens)
+        ttft = self.first_token_at - self.started if self.first_token_at else None
+        generating = end - self.first_token_at if self.first_token_at else 0.0
+        return {
+            "ttft_s": round(ttft, 3) if ttft is not None else None,
+            "total_s": round(end - self.started, 3),
+            "completion_tokens": tokens,
+            "tokens_per_s": round(tokens / generating, 1) if generating > 0 else None
+        }
+
+
+def token_writer(stream) -> TokenCallback:
+    """Build an ``on_token`` callback that writes tokens to a text stream as they arrive."""
+    def write(token: str) -> None:
+        stream.write(token)
+        stream.flush()
+    return write
@@ -0,0 +1,204 @@
+"""Two-tier cache of chat completions: in-memory LRU over an SQLite store."""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any
+
+DEFAULT_COMPLETION_CACHE_CONFIG: Dict[str, Any] = {
+    'enabled': True,
+    'ttl': 7 * 86400,
+    'memory_entries': 256,
+    'max_disk_mb': 100,
+}
+
+# Bump when the key or the stored entry changes shape
+KEY_VERSION = 2
+
+
+def normalize_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Messages reduced to what affects the reply: role and content, whitespace-trimmed.
+
+    Line endings are unified and trailing whitespace is dropped, so the same
+    prompt typed on another machine maps to the same key.
+    """
+    normalized = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            content = '\n'.join(line.rstrip() for line in content.replace('\r\n', '\n').split('\n')).strip()
+        normalized.append({"role": message.get("role"), "content": content})
+    return normalized
+
+
+def completion_key(model: str, messages: List[Dict[str, Any]], files: Optional[List[str]] = None) -> str:
+    """Cache key of a completion request.
+
+    The server is not part of the key: every configured server answers for
+    the same models, so a reply is reused whichever server produced it.
+
+    Args:
+        model: Model id
+        messages: Chat messages in OpenAI format
+        files: Content hashes of attached files (or file IDs when the
+            content is not at hand)
+
+    Returns:
+        Hex SHA-256 of the canonical request
+    """
+    canonical = json.dumps({
+        "v": KEY_VERSION,
+        "model": model,
+        "messages": normalize_messages(messages),
+        "files": list(files or []),
+    }, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class CompletionCache:
+    """Completion results keyed by model, normalized messages and attached content.
+
+    Recently used entries are served from an in-memory LRU of
+    ``memory_entries``; everything is also kept in an SQLite file so results
+    survive restarts. Entries expire ``ttl`` seconds after they were stored,
+    and the least recently used are evicted once the stored responses exceed
+    ``max_disk_mb``.
+    """
+
+    def __init__(self, db_path: str, config: Optional[Dict[str, Any]] = None):
+        """Initialize completion cache.
+
+        Args:
+            db_path: Path of the SQLite store
+            config: Cache settings, see DEFAULT_COMPLETION_CACHE_CONFIG
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_COMPLETION_CACHE_CONFIG, **(config or {})}
+        self.db_path = db_path
+        self.ttl = float(self.settings['ttl'])
+        self.memory_entries = max(0, int(self.settings['memory_entries']))
+        self.max_bytes = int(float(self.settings['max_disk_mb']) * 1024 * 1024)
+        self._memory: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "bypassed": 0, "evicted": 0}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS completions (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    entry TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+        self.evict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a stored completion.
+
+        Returns:
+            The stored entry, or None on a miss or when it expired
+        """
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None and now - item["created_at"] < self.ttl:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                hit = item["entry"]
+            else:
+                if item is not None:
+                    del self._memory[key]
+                row = self._conn.execute(
+                    "SELECT entry, created_at FROM completions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or now - row[1] >= self.ttl:
+                    self._counters["misses"] += 1
+                    hit = None
+                else:
+                    hit = json.loads(row[0])
+                    self._counters["disk_hits"] += 1
+                    self._remember(key, hit, row[1])
+                    with self._conn:
+                        self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+        self.logger.info(f"Completion cache {'hit' if hit else 'miss'} for {key[:12]} ({self._summary()})")
+        return hit
+
+    def put(self, key: str, model: str, entry: Dict[str, Any]) -> None:
+        """Store a completion result (JSON-serializable)."""
+        now = time.time()
+        data = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._counters["stores"] += 1
+            self._remember(key, entry, now)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, data, len(data.encode('utf-8')), now, now)
+                )
+        self.evict()
+
+    def bypassed(self) -> None:
+        """Count a request that skipped the lookup (its result is still stored)."""
+        with self._lock:
+            self._counters["bypassed"] += 1
+
+    def _remember(self, key: str, entry: Dict[str, Any], created_at: float) -> None:
+        if not self.memory_entries:
+            return
+        self._memory[key] = {"entry": entry, "created_at": created_at}
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def evict(self) -> int:
+        """Remove expired entries and trim the store to max_disk_mb, least recently used first.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM completions WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                doomed = []
+                for key, size in self._conn.execute("SELECT key, size FROM completions ORDER BY last_used"):
+                    if excess <= 0:
+                        break
+                    doomed.append((key,))
+                    excess -= size
+                self._conn.executemany("DELETE FROM completions WHERE key = ?", doomed)
+                for (key,) in doomed:
+                    self._memory.pop(key, None)
+                removed += len(doomed)
+            self._counters["evicted"] += removed
+        return removed
+
+    def _summary(self) -> str:
+        return ', '.join(f"{k}={v}" for k, v in self.stats().items())
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss, store and eviction counters for this process, and the store size."""
+        counters = dict(self._counters)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        counters["hit_rate"] = round((counters["memory_hits"] + counters["disk_hits"]) / lookups, 3) if lookups else 0.0
+        counters["memory_entries"] = len(self._memory)
+        return counters
+
+    def close(self) -> None:
+        """Log the counters and close the store."""
+        self.logger.info(f"Completion cache stats: {self._summary()}")
+        with self._lock:
+            self._conn.close()
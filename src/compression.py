@@ -0,0 +1,287 @@
+"""Request body compression (gzip, zstd) chosen per server.
+
+Transcripts are plain text and compress 3-5x, which matters on slow links.
+HTTP has no handshake for compressed *request* bodies, so the encoding is
+either set per server in config.yaml or found out by trying: with
+``encoding: auto`` the client compresses and, if the server answers with one
+of ``fallback_statuses``, resends the body uncompressed once. Servers that
+cannot decode a body rarely say so: stock OpenWebUI answers a generic 400.
+401, 403 and 404 never trigger a resend. A 415 response may list the
+encodings it does accept in ``Accept-Encoding`` (RFC 7694). What
+was learned is kept in ``paths.data_dir/compression.json`` so later runs do
+not pay for the failed attempt, and re-checked after ``relearn_after``.
+
+zstd needs the optional ``zstandard`` package; without it gzip is used.
+"""
+
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+GZIP = 'gzip'
+ZSTD = 'zstd'
+IDENTITY = 'identity'
+ENCODINGS = (ZSTD, GZIP)
+
+DEFAULT_COMPRESSION_CONFIG: Dict[str, Any] = {
+    'encoding': 'none',
+    'level': None,
+    'min_size': 1024,
+    'fallback_statuses': [400, 415, 422],
+    'relearn_after': 86400,
+    'servers': {},
+}
+
+DEFAULT_LEVELS = {GZIP: 6, ZSTD: 3}
+
+# Answers that are never about the body encoding, whatever the config says
+NEVER_FALLBACK_STATUSES = frozenset({401, 403, 404})
+
+
+@functools.lru_cache(maxsize=None)
+def zstd_available() -> bool:
+    """Whether the optional ``zstandard`` package is installed."""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_encodings() -> List[str]:
+    """Encodings this process can produce, preferred first."""
+    return [e for e in ENCODINGS if e != ZSTD or zstd_available()]
+
+
+def compressor(encoding: str, level: Optional[int] = None):
+    """Incremental compressor with ``compress(data)`` and ``flush()``."""
+    level = DEFAULT_LEVELS[encoding] if level is None else int(level)
+    if encoding == GZIP:
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if encoding == ZSTD:
+        import zstandard
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def decompressor(encoding: str):
+    """Incremental decompressor with ``decompress(data)``, for the mock server and tests."""
+    if encoding in (GZIP, 'x-gzip'):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.decompressobj()
+    if encoding == ZSTD:
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def compress_bytes(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress a whole body."""
+    c = compressor(encoding, level)
+    return c.compress(data) + c.flush()
+
+
+def parse_accept_encoding(header: Optional[str]) -> List[str]:
+    """Codings listed in an Accept-Encoding header, best first, excluding q=0."""
+    codings = []
+    for position, item in enumerate((header or '').split(',')):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            codings.append((-q, position, name))
+    return [name for _, _, name in sorted(codings)]
+
+
+class CompressedStream:
+    """Iterable compressing another iterable chunk by chunk.
+
+    It has no length, so requests sends it with chunked transfer encoding;
+    memory use stays at one chunk as with the uncompressed stream.
+    """
+
+    def __init__(self, source: Iterable[bytes], encoding: str, level: Optional[int] = None, on_done=None):
+        """Initialize compressed stream.
+
+        Args:
+            source: Re-iterable body, e.g. a MultipartFileStream
+            encoding: gzip or zstd
+            level: Compression level, defaults per encoding
+            on_done: Called with (raw_bytes, wire_bytes) once fully sent
+        """
+        self.source = source
+        self.encoding = encoding
+        self.level = level
+        self.on_done = on_done
+        self.raw_bytes = 0
+        self.wire_bytes = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.raw_bytes = 0
+        self.wire_bytes = 0
+        c = compressor(self.encoding, self.level)
+        for chunk in self.source:
+            self.raw_bytes += len(chunk)
+            out = c.compress(chunk)
+            if out:
+                self.wire_bytes += len(out)
+                yield out
+        tail = c.flush()
+        self.wire_bytes += len(tail)
+        yield tail
+        if self.on_done:
+            self.on_done(self.raw_bytes, self.wire_bytes)
+
+
+def server_key(url: str) -> str:
+    """Scheme and authority of a URL, the unit compression support is learned for."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class CompressionPolicy:
+    """Decide the request body encoding per server and learn from rejections."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, state_path: Optional[str] = None):
+        """Initialize compression policy.
+
+        Args:
+            config: Compression settings, see DEFAULT_COMPRESSION_CONFIG
+            state_path: JSON file remembering what each server accepted
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_COMPRESSION_CONFIG, **(config or {})}
+        self.level = self.settings['level']
+        self.min_size = int(self.settings['min_size'])
+        self.fallback_statuses = frozenset(
+            int(s) for s in self.settings['fallback_statuses'] or [] if int(s) not in NEVER_FALLBACK_STATUSES
+        )
+        self.servers = {server_key(k): v for k, v in (self.settings['servers'] or {}).items()}
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._learned: Dict[str, Dict[str, Any]] = self._load()
+        self._stats = {"compressed": 0, "raw_bytes": 0, "wire_bytes": 0, "fallbacks": 0}
+        self._warned = False
+        for server in [None, *self.servers]:
+            self._configured(server)  # Fail early on a misspelled encoding
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable compression state {self.state_path}: {str(e)}")
+            return {}
+
+    def _save(self) -> None:
+        if not self.state_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.state_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._learned, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _configured(self, server: str) -> Optional[str]:
+        encoding = self.servers.get(server, self.settings['encoding'])
+        if not encoding or str(encoding).lower() in ('none', IDENTITY, 'false'):
+            return None
+        encoding = str(encoding).lower()
+        if encoding == ZSTD and not zstd_available():
+            if not self._warned:
+                self._warned = True
+                self.logger.warning("zstd compression needs the zstandard package; using gzip")
+            return GZIP
+        if encoding not in ('auto',) + ENCODINGS:
+            raise ValueError(f"Unsupported request compression: {encoding}")
+        return encoding
+
+    def encoding_for(self, url: str) -> Optional[str]:
+        """Encoding to use for a request body sent to ``url``, or None to send it as is."""
+        server = server_key(url)
+        configured = self._configured(server)
+        if configured is None:
+            return None
+        with self._lock:
+            learned = self._learned.get(server)
+        if learned and time.time() - learned.get('at', 0) < float(self.settings['relearn_after']):
+            return None if learned['encoding'] == IDENTITY else learned['encoding']
+        return available_encodings()[0] if configured == 'auto' else configured
+
+    def _learn(self, server: str, encoding: str) -> None:
+        with self._lock:
+            previous = self._learned.get(server, {}).get('encoding')
+            self._learned[server] = {'encoding': encoding, 'at': time.time()}
+            if previous != encoding:
+                self._save()
+
+    def refuses_encoding(self, status: int) -> bool:
+        """Whether an error answer to a compressed request may be about the encoding.
+
+        The request is then resent uncompressed once; whether the encoding
+        was really at fault is decided by the answer to that.
+        """
+        return status in self.fallback_statuses
+
+    def accepted(self, url: str, encoding: str) -> None:
+        """Remember that the server took a body with this encoding."""
+        server = server_key(url)
+        with self._lock:
+            known = self._learned.get(server, {}).get('encoding') == encoding
+        if not known:
+            self._learn(server, encoding)
+
+    def rejected(self, url: str, encoding: str, accept_encoding: Optional[str] = None) -> str:
+        """Remember that the server refused a body with this encoding.
+
+        Args:
+            url: Request URL
+            encoding: Encoding that was refused
+            accept_encoding: Accept-Encoding header of the error response
+
+        Returns:
+            Encoding that will be used for this server from now on
+        """
+        offered = [e for e in parse_accept_encoding(accept_encoding) if e in available_encodings() and e != encoding]
+        fallback = offered[0] if offered else IDENTITY
+        with self._lock:
+            self._stats["fallbacks"] += 1
+        self.logger.warning(f"{server_key(url)} does not accept {encoding} request bodies; using {fallback}")
+        self._learn(server_key(url), fallback)
+        return fallback
+
+    def record(self, raw_bytes: int, wire_bytes: int) -> None:
+        """Count a compressed body."""
+        with self._lock:
+            self._stats["compressed"] += 1
+            self._stats["raw_bytes"] += raw_bytes
+            self._stats["wire_bytes"] += wire_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Bodies compressed, bytes before and after, and fallbacks so far."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["saved_bytes"] = stats["raw_bytes"] - stats["wire_bytes"]
+        stats["ratio"] = round(stats["raw_bytes"] / stats["wire_bytes"], 2) if stats["wire_bytes"] else None
+        return stats
@@ -1,8 +1,6 @@
 """File picker utility for OpenWebUI automation."""
 
 import os
-import tkinter as tk
-from tkinter import filedialog
 from typing import Optional
 from src.utils.error_handler import FileAccessError
 
@@ -28,6 +26,9 @@ class FilePicker:
         Returns:
             Selected file path or None if cancelled
         """
+        import tkinter as tk
+        from tkinter import filedialog
+
         root = tk.Tk()
         root.withdraw()  # Hide the main window
         
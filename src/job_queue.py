@@ -0,0 +1,437 @@
+"""Durable SQLite job queue for uploads and chats.
+
+Every transcript becomes an ``upload`` job; a successful upload enqueues its
+``chat`` job in the same transaction. Jobs move through these states::
+
+    pending -> running -> done
+                       -> pending (retry after exponential backoff)
+                       -> dead    (attempts exhausted or permanent error)
+
+A job left ``running`` by a process that died is returned to ``pending`` on
+the next start, so a restarted run resumes where the previous one stopped.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Any, Set
+
+from .utils.logger import log_context
+
+UPLOAD = 'upload'
+CHAT = 'chat'
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+DEAD = 'dead'
+STATES = (PENDING, RUNNING, DONE, DEAD)
+
+DEFAULT_JOBS_CONFIG: Dict[str, Any] = {
+    'max_attempts': 5,
+    'backoff_base': 2.0,
+    'backoff_max': 300.0,
+    'lease_seconds': 3600,
+}
+
+
+class PermanentJobError(Exception):
+    """A job failure that retrying cannot fix; the job is dead-lettered at once."""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """SQLite-backed queue with attempts, backoff, leases and a dead-letter state.
+
+    Safe to share between the threads of one process and between processes
+    using the same database file.
+    """
+
+    def __init__(self, db_path: str, config: Optional[Dict[str, Any]] = None):
+        """Initialize job queue.
+
+        Args:
+            db_path: Path of the SQLite file
+            config: Queue settings, see DEFAULT_JOBS_CONFIG
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_JOBS_CONFIG, **(config or {})}
+        self.db_path = db_path
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_run_at REAL NOT NULL,
+                owner TEXT,
+                lease_expires REAL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, next_run_at)")
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, kind: str, key: str, payload: Dict[str, Any], now: float) -> Optional[int]:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO jobs (kind, key, payload, state, next_run_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, key, json.dumps(payload), PENDING, now, now)
+        )
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def enqueue(self, kind: str, key: str, payload: Dict[str, Any]) -> Optional[int]:
+        """Add a job unless one with the same key exists.
+
+        Args:
+            kind: Job type, UPLOAD or CHAT
+            key: Deduplication key; enqueueing the same key again is a no-op
+            payload: JSON-serializable job arguments
+
+        Returns:
+            The new job id, or None if the key was already queued
+        """
+        return self._transaction(lambda conn: self._insert(conn, kind, key, payload, time.time()))
+
+    def recover(self) -> int:
+        """Return jobs of dead processes and expired leases to ``pending``.
+
+        Returns:
+            Number of jobs recovered
+        """
+        host = socket.gethostname()
+        now = time.time()
+
+        def recover(conn):
+            rows = conn.execute("SELECT id, owner, lease_expires FROM jobs WHERE state = ?", (RUNNING,)).fetchall()
+            stale = []
+            for job_id, owner, lease_expires in rows:
+                owner_host, _, pid = (owner or '').rpartition(':')
+                dead_owner = owner_host == host and pid.isdigit() and not _pid_alive(int(pid))
+                if dead_owner or (lease_expires or 0) < now:
+                    stale.append(job_id)
+            conn.executemany(
+                "UPDATE jobs SET state = ?, owner = NULL, lease_expires = NULL, next_run_at = ? WHERE id = ?",
+                [(PENDING, now, job_id) for job_id in stale]
+            )
+            return len(stale)
+
+        recovered = self._transaction(recover)
+        if recovered:
+            self.logger.info(f"Recovered {recovered} interrupted jobs")
+        return recovered
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Take the oldest job that is due, marking it running.
+
+        Returns:
+            Job dict (id, kind, key, payload, attempts) or None if nothing is due
+        """
+        now = time.time()
+
+        def claim(conn):
+            row = conn.execute(
+                "SELECT id, kind, key, payload, attempts FROM jobs WHERE state = ? AND next_run_at <= ? "
+                "ORDER BY next_run_at, id LIMIT 1",
+                (PENDING, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = ?, owner = ?, lease_expires = ?, started_at = ? WHERE id = ?",
+                (RUNNING, self.owner, now + float(self.settings['lease_seconds']), now, row[0])
+            )
+            return {"id": row[0], "kind": row[1], "key": row[2], "payload": json.loads(row[3]), "attempts": row[4]}
+
+        return self._transaction(claim)
+
+    def complete(self, job: Dict[str, Any], result: Dict[str, Any], follow_up: Optional[Dict[str, Any]] = None) -> None:
+        """Mark a job done, optionally enqueueing the next job atomically.
+
+        Args:
+            job: Job returned by claim
+            result: JSON-serializable result to store
+            follow_up: ``kind``, ``key`` and ``payload`` of a job to enqueue
+        """
+        now = time.time()
+
+        def complete(conn):
+            conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, result = ?, error = NULL, "
+                "owner = NULL, lease_expires = NULL, finished_at = ? WHERE id = ?",
+                (DONE, json.dumps(result), now, job["id"])
+            )
+            if follow_up:
+                self._insert(conn, follow_up["kind"], follow_up["key"], follow_up["payload"], now)
+
+        self._transaction(complete)
+
+    def fail(self, job: Dict[str, Any], error: str, permanent: bool = False) -> str:
+        """Record a failed attempt and schedule a retry or dead-letter the job.
+
+        Returns:
+            The job's new state, PENDING or DEAD
+        """
+        attempts = job["attempts"] + 1
+        now = time.time()
+        if permanent or attempts >= int(self.settings['max_attempts']):
+            state, next_run_at = DEAD, now
+        else:
+            delay = min(float(self.settings['backoff_max']), float(self.settings['backoff_base']) * (2 ** (attempts - 1)))
+            state, next_run_at = PENDING, now + delay
+
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET state = ?, attempts = ?, error = ?, next_run_at = ?, "
+            "owner = NULL, lease_expires = NULL, finished_at = ? WHERE id = ?",
+            (state, attempts, error, next_run_at, now if state == DEAD else None, job["id"])
+        ))
+        if state == DEAD:
+            self.logger.error(f"Job {job['id']} ({job['kind']} {job['key']}) dead after {attempts} attempts: {error}")
+        else:
+            self.logger.warning(
+                f"Job {job['id']} ({job['kind']}) failed attempt {attempts}: {error}; retry in {next_run_at - now:.1f}s"
+            )
+        return state
+
+    def retry_dead(self) -> int:
+        """Move dead jobs back to ``pending`` with their attempts reset.
+
+        Returns:
+            Number of jobs requeued
+        """
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET state = ?, attempts = 0, next_run_at = ?, finished_at = NULL WHERE state = ?",
+            (PENDING, time.time(), DEAD)
+        ).rowcount)
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next pending job is due, or None if none are pending."""
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_run_at) FROM jobs WHERE state = ?", (PENDING,)).fetchone()
+        return max(0.0, row[0] - time.time()) if row[0] is not None else None
+
+    def has_unfinished(self) -> bool:
+        """Whether any job is pending or running."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state IN (?, ?)", (PENDING, RUNNING)
+            ).fetchone()
+        return row[0] > 0
+
+    def status(self, window: float = 300.0) -> Dict[str, Any]:
+        """Queue depth per kind and state, throughput and dead-lettered jobs.
+
+        Args:
+            window: Seconds over which throughput is measured
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, state, COUNT(*) FROM jobs GROUP BY kind, state").fetchall()
+            recent = self._conn.execute(
+                "SELECT COUNT(*), AVG(finished_at - started_at) FROM jobs WHERE state = ? AND finished_at >= ?",
+                (DONE, now - window)
+            ).fetchone()
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM jobs WHERE state = ?", (PENDING,)
+            ).fetchone()[0]
+            dead = self._conn.execute(
+                "SELECT id, kind, key, attempts, error FROM jobs WHERE state = ? ORDER BY id", (DEAD,)
+            ).fetchall()
+
+        by_kind: Dict[str, Dict[str, int]] = {}
+        totals = dict.fromkeys(STATES, 0)
+        for kind, state, count in rows:
+            by_kind.setdefault(kind, dict.fromkeys(STATES, 0))[state] = count
+            totals[state] += count
+        return {
+            "depth": totals[PENDING] + totals[RUNNING],
+            "states": totals,
+            "kinds": by_kind,
+            "oldest_pending_age_s": round(now - oldest, 1) if oldest else None,
+            "throughput_per_min": round(recent[0] * 60.0 / window, 2),
+            "mean_job_s": round(recent[1], 3) if recent[1] is not None else None,
+            "dead": [
+                {"id": r[0], "kind": r[1], "key": r[2], "attempts": r[3], "error": r[4]} for r in dead
+            ]
+        }
+
+
+class JobRunner:
+    """Execute upload and chat jobs from a JobQueue with an OpenWebUIClient."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        client,
+        model: str,
+        prompt: Optional[str] = None,
+        workers: int = 4,
+        preprocessor=None
+    ):
+        """Initialize job runner.
+
+        Args:
+            queue: Queue to take jobs from
+            client: OpenWebUIClient used for uploads and chats
+            model: Model used by chat jobs enqueued from uploads
+            prompt: User message sent with every chat
+            workers: Jobs executed in parallel
+            preprocessor: Preprocessor cleaning files before they are uploaded
+        """
+        self.queue = queue
+        self.client = client
+        self.model = model
+        self.prompt = prompt
+        self.workers = max(1, int(workers))
+        self.preprocessor = preprocessor
+        self.logger = logging.getLogger(__name__)
+        self._stop = threading.Event()
+
+    def enqueue_files(self, file_paths: List[str]) -> int:
+        """Enqueue an upload job per file; files already queued are skipped.
+
+        Jobs are keyed by path, size and mtime, so re-running the same batch
+        does not repeat finished work but a modified file is processed again.
+
+        Returns:
+            Number of new jobs
+        """
+        added = 0
+        for path in file_paths:
+            path = os.path.abspath(path)
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                self.logger.error(f"Cannot queue {path}: {str(e)}")
+                continue
+            key = f"{path}:{st.st_size}:{st.st_mtime_ns}"
+            if self.queue.enqueue(UPLOAD, key, {"file": path, "model": self.model, "prompt": self.prompt}):
+                added += 1
+        return added
+
+    def stop(self) -> None:
+        """Finish running jobs and stop claiming new ones."""
+        self._stop.set()
+
+    def _upload_path(self, payload: Dict[str, Any]) -> str:
+        """File to upload for a job, cleaned first if preprocessing is on."""
+        if not os.path.isfile(payload["file"]):
+            raise PermanentJobError(f"File not found: {payload['file']}")
+        if self.preprocessor:
+            return self.preprocessor.process(payload["file"])["output"]
+        return payload["file"]
+
+    def execute(self, job: Dict[str, Any]) -> None:
+        """Run one claimed job and record its outcome."""
+        with log_context(job_id=job["id"], file=job["payload"].get("file")):
+            self._execute(job)
+
+    def _execute(self, job: Dict[str, Any]) -> None:
+        payload = job["payload"]
+        try:
+            if job["kind"] == UPLOAD:
+                result = self.client.upload_document(self._upload_path(payload))
+                if not result["success"]:
+                    raise RuntimeError(result["error"])
+                self.queue.complete(job, {"file_id": result["file_id"], "cached": result["cached"]}, follow_up={
+                    "kind": CHAT,
+                    "key": f"{job['key']}:{result['file_id']}",
+                    "payload": {**payload, "file_id": result["file_id"], "server": result.get("server")}
+                })
+            elif job["kind"] == CHAT:
+                server = payload.get("server")
+                if server and not self.client.router.is_healthy(server):
+                    # The file is stranded on a server that is down; upload it elsewhere
+                    self.logger.warning(f"Job {job['id']}: {server} is unavailable, uploading {payload['file']} again")
+                    result = self.client.create_chat(payload["model"], self._upload_path(payload), prompt=payload.get("prompt"))
+                else:
+                    result = self.client.chat_with_files(
+                        payload["model"], [payload["file_id"]], prompt=payload.get("prompt"), server=server
+                    )
+                if not result["success"]:
+                    raise RuntimeError(result["error"])
+                self.queue.complete(job, {
+                    "file_id": result.get("file_id"),
+                    "chat_id": result.get("chat_id"),
+                    "server": result.get("server")
+                })
+            else:
+                raise PermanentJobError(f"Unknown job kind: {job['kind']}")
+            self.logger.info(f"Job {job['id']} ({job['kind']} {payload.get('file')}) done")
+        except PermanentJobError as e:
+            self.queue.fail(job, str(e), permanent=True)
+        except Exception as e:
+            self.queue.fail(job, str(e))
+
+    def run(self, poll_interval: float = 0.5) -> Dict[str, Any]:
+        """Process jobs until none are pending or running, or ``stop`` is called.
+
+        Jobs waiting for a backoff are waited for; dead jobs are left alone.
+
+        Returns:
+            Queue status after the run
+        """
+        self.queue.recover()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            in_flight: Set[Future] = set()
+            while not self._stop.is_set():
+                in_flight = {f for f in in_flight if not f.done()}
+                while len(in_flight) < self.workers:
+                    job = self.queue.claim()
+                    if job is None:
+                        break
+                    in_flight.add(pool.submit(self.execute, job))
+                if in_flight:
+                    wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    continue
+                if not self.queue.has_unfinished():
+                    break
+                # Only jobs in backoff (or running elsewhere) are left
+                due = self.queue.next_due_in()
+                self._stop.wait(min(poll_interval, due) if due is not None else poll_interval)
+        status = self.queue.status()
+        status["wall_time_s"] = round(time.perf_counter() - started, 3)
+        return status
@@ -0,0 +1,359 @@
+"""Incremental sync of the transcript folder into a knowledge collection.
+
+Works like rsync with a local manifest. ``paths.data_dir/knowledge_manifest.sqlite3``
+records, per collection, every synced file's relative path, size, mtime,
+content hash and the id of its upload on the server. A sync
+
+1. fetches the collection once (``GET /api/v1/knowledge/{id}``), which is
+   the only request when nothing changed;
+2. stats the folder and compares it with the manifest. Only files whose
+   size or mtime differ are hashed; a file whose content did not change is
+   just re-stamped;
+3. uploads new and changed files in parallel and adds them to the
+   collection, replacing the previous version;
+4. removes files deleted from the folder from the collection.
+
+Files added to the collection by other means are left alone. A file whose
+id disappeared from the collection is added again.
+"""
+
+import fnmatch
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Any, Set, Tuple
+
+from .utils.config import Config
+from .utils.hashing import file_sha256
+from .utils.logger import log_context
+from .webui_client import OpenWebUIClient
+
+DEFAULT_KNOWLEDGE_CONFIG: Dict[str, Any] = {
+    'collection': 'Transcripts',
+    'description': 'Transcripts synced from the transcript folder',
+    'pattern': None,
+    'recursive': True,
+    'workers': 4,
+}
+
+# Manifest rows written per transaction while a sync runs
+RECORD_BATCH = 200
+
+StatSignature = Tuple[int, int]
+
+
+def scan_tree(folder: str, pattern: str, recursive: bool = True) -> Dict[str, StatSignature]:
+    """(size, mtime_ns) of every file matching ``pattern``, by path relative to ``folder``."""
+    found: Dict[str, StatSignature] = {}
+    pending = [folder]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif fnmatch.fnmatch(entry.name, pattern) and entry.is_file():
+                    st = entry.stat()
+                    found[os.path.relpath(entry.path, folder)] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                continue
+    return found
+
+
+class SyncManifest:
+    """SQLite record of the files synced into each collection."""
+
+    def __init__(self, db_path: str):
+        """Initialize manifest.
+
+        Args:
+            db_path: Path of the SQLite file
+        """
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS collections (
+                    server TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    collection_id TEXT NOT NULL,
+                    PRIMARY KEY (server, name)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS synced_files (
+                    collection_id TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    file_id TEXT NOT NULL,
+                    synced_at REAL NOT NULL,
+                    PRIMARY KEY (collection_id, path)
+                )"""
+            )
+
+    def collection_id(self, server: str, name: str) -> Optional[str]:
+        """ID of the collection ``name`` on ``server`` from the last sync."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT collection_id FROM collections WHERE server = ? AND name = ?", (server, name)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_collection(self, server: str, name: str, collection_id: str) -> None:
+        """Remember the collection's ID, dropping entries of the one it replaces."""
+        previous = self.collection_id(server, name)
+        with self._lock, self._conn:
+            if previous and previous != collection_id:
+                self._conn.execute("DELETE FROM synced_files WHERE collection_id = ?", (previous,))
+            self._conn.execute("INSERT OR REPLACE INTO collections VALUES (?, ?, ?)", (server, name, collection_id))
+
+    def entries(self, collection_id: str) -> Dict[str, Dict[str, Any]]:
+        """All synced files of a collection by relative path."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT path, size, mtime_ns, sha256, file_id FROM synced_files WHERE collection_id = ?",
+                (collection_id,)
+            )
+            return {
+                row[0]: {"size": row[1], "mtime_ns": row[2], "sha256": row[3], "file_id": row[4]}
+                for row in cursor.fetchall()
+            }
+
+    def record(self, collection_id: str, rows: List[Tuple[str, StatSignature, str, str]]) -> None:
+        """Store synced files as (path, signature, sha256, file_id) in one transaction."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO synced_files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(collection_id, path, sig[0], sig[1], sha, file_id, now) for path, sig, sha, file_id in rows]
+            )
+
+    def remove(self, collection_id: str, paths: List[str]) -> None:
+        """Forget files that are no longer in the folder."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM synced_files WHERE collection_id = ? AND path = ?",
+                [(collection_id, path) for path in paths]
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class KnowledgeSync:
+    """Mirror a folder into an OpenWebUI knowledge collection."""
+
+    def __init__(
+        self,
+        config: Config,
+        client: Optional[OpenWebUIClient] = None,
+        folder: Optional[str] = None,
+        collection: Optional[str] = None,
+        pattern: Optional[str] = None,
+        workers: Optional[int] = None
+    ):
+        """Initialize sync.
+
+        Args:
+            config: Loaded configuration
+            client: Client to use, created from ``config`` if omitted
+            folder: Folder to sync, defaults to paths.transcript_folder
+            collection: Collection name, defaults to knowledge.collection
+            pattern: File name pattern, defaults to knowledge.pattern, then batch.pattern
+            workers: Files uploaded in parallel, defaults to knowledge.workers
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.settings = {**DEFAULT_KNOWLEDGE_CONFIG, **config.get_knowledge_config()}
+        self.client = client or OpenWebUIClient(config)
+        self.folder = os.path.abspath(folder or config.get_transcript_folder())
+        self.collection = collection or self.settings['collection']
+        self.pattern = pattern or self.settings['pattern'] or config.get_batch_config().get('pattern', '*.txt')
+        self.workers = max(1, int(workers or self.settings['workers']))
+        self.manifest = SyncManifest(os.path.join(config.get_data_dir(), 'knowledge_manifest.sqlite3'))
+        self._lock = threading.Lock()
+        self._adding: Dict[str, threading.Lock] = {}
+
+    def close(self) -> None:
+        """Release the client and the manifest."""
+        self.client.close()
+        self.manifest.close()
+
+    def _collection(self, server: str) -> Dict[str, Any]:
+        """Fetch the collection, finding or creating it on the first sync."""
+        collection_id = self.manifest.collection_id(server, self.collection)
+        if collection_id:
+            collection = self.client.get_knowledge(collection_id)
+            if collection is not None:
+                return collection
+            self.logger.warning(f"Collection {self.collection} ({collection_id}) is gone from {server}; syncing into a new one")
+
+        match = next((c for c in self.client.list_knowledge() if c.get('name') == self.collection), None)
+        if match:
+            collection = self.client.get_knowledge(match['id']) or match
+        else:
+            self.logger.info(f"Creating knowledge collection {self.collection} on {server}")
+            collection = self.client.create_knowledge(self.collection, self.settings['description'])
+        self.manifest.set_collection(server, self.collection, collection['id'])
+        return collection
+
+    def _sync_file(self, path: str, signature: StatSignature, entry: Optional[Dict[str, Any]],
+                   collection_id: str, remote: Set[str], server: str) -> Dict[str, Any]:
+        """Upload one new or changed file and add it to the collection; runs on a worker."""
+        full_path = os.path.join(self.folder, path)
+        with log_context(file=path), self.client.pinned(server):
+            try:
+                sha256 = file_sha256(full_path)
+            except OSError as e:
+                return {"path": path, "action": "failed", "error": str(e)}
+            if entry and entry["sha256"] == sha256 and entry["file_id"] in remote:
+                # Touched but not changed
+                return {"path": path, "action": "restamped", "signature": signature, "sha256": sha256, "file_id": entry["file_id"]}
+
+            # Files with the same content are handled one at a time: the
+            # later ones reuse the cached upload and do not add its file_id again
+            with self._lock:
+                content_lock = self._adding.setdefault(sha256, threading.Lock())
+            with content_lock:
+                upload = self.client.upload_document(full_path)
+                if not upload["success"]:
+                    return {"path": path, "action": "failed", "error": upload["error"]}
+                file_id = upload["file_id"]
+                if file_id not in remote:
+                    added = self.client.add_knowledge_file(collection_id, file_id)
+                    if not added["success"]:
+                        return {"path": path, "action": "failed", "error": added["error"]}
+                    remote.add(file_id)
+            return {
+                "path": path,
+                "action": "added" if entry is None else "updated",
+                "signature": signature,
+                "sha256": sha256,
+                "file_id": file_id
+            }
+
+    def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Sync the folder into the collection.
+
+        Args:
+            dry_run: Only report what would be uploaded and removed
+
+        Returns:
+            Machine-readable summary of the sync
+        """
+        started = time.perf_counter()
+        with self.client.pinned() as server:
+            collection = self._collection(server)
+        collection_id = collection['id']
+        # Grows with the files added during this run
+        remote = set(self.client.knowledge_file_ids(collection))
+        self._adding = {}
+        known = self.manifest.entries(collection_id)
+        current = scan_tree(self.folder, self.pattern, bool(self.settings['recursive']))
+
+        # Only files whose size or mtime moved, or whose upload left the collection, need work
+        todo = []
+        for path, signature in current.items():
+            entry = known.get(path)
+            if entry is None or (entry["size"], entry["mtime_ns"]) != signature or entry["file_id"] not in remote:
+                todo.append((path, signature, entry))
+        deleted = sorted(set(known) - set(current))
+
+        summary: Dict[str, Any] = {
+            "collection": self.collection,
+            "collection_id": collection_id,
+            "server": server,
+            "folder": self.folder,
+            "files": len(current),
+            "unchanged": len(current) - len(todo),
+        }
+        if dry_run:
+            summary.update({
+                "dry_run": True,
+                "to_check": sorted(path for path, _, entry in todo if entry is not None),
+                "to_add": sorted(path for path, _, entry in todo if entry is None),
+                "to_remove": deleted,
+                "wall_time_s": round(time.perf_counter() - started, 3),
+            })
+            return summary
+
+        counts = {"added": 0, "updated": 0, "restamped": 0, "removed": 0, "failed": 0}
+        errors: List[Dict[str, str]] = []
+        rows: List[Tuple[str, StatSignature, str, str]] = []
+        # Rows of files whose old version is still to be removed, recorded after that
+        replacing: Dict[str, Tuple[Tuple[str, StatSignature, str, str], str]] = {}
+        if todo:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='sync') as pool:
+                futures = [
+                    pool.submit(self._sync_file, path, signature, entry, collection_id, remote, server)
+                    for path, signature, entry in todo
+                ]
+                for future in as_completed(futures):
+                    result = future.result()
+                    counts[result["action"]] += 1
+                    if result["action"] == "failed":
+                        errors.append({"path": result["path"], "error": result["error"]})
+                        continue
+                    row = (result["path"], result["signature"], result["sha256"], result["file_id"])
+                    old = known.get(result["path"])
+                    if old and old["file_id"] != result["file_id"]:
+                        replacing[result["path"]] = (row, old["file_id"])
+                        continue
+                    rows.append(row)
+                    if len(rows) >= RECORD_BATCH:
+                        self.manifest.record(collection_id, rows)
+                        rows = []
+        if rows:
+            self.manifest.record(collection_id, rows)
+
+        # Drop old versions and deleted files, unless another synced file has the same content
+        obsolete = {old_id for _, old_id in replacing.values()} | {known[path]["file_id"] for path in deleted}
+        still_used = {
+            e["file_id"] for p, e in self.manifest.entries(collection_id).items() if p not in deleted and p not in replacing
+        } | {row[3] for row, _ in replacing.values()}
+        to_remove = sorted((obsolete - still_used) & remote)
+        failed_ids: Set[str] = set()
+        if to_remove:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='sync') as pool:
+                for result in pool.map(lambda file_id: self._remove(collection_id, file_id, server), to_remove):
+                    if result["success"]:
+                        counts["removed"] += 1
+                    else:
+                        counts["failed"] += 1
+                        failed_ids.add(result["file_id"])
+                        errors.append({"file_id": result["file_id"], "error": result["error"]})
+        # A file whose old version could not be removed keeps its old manifest
+        # row, and a deleted one stays listed, so the next sync retries the removal
+        updated = [row for row, old_id in replacing.values() if old_id not in failed_ids]
+        if updated:
+            self.manifest.record(collection_id, updated)
+        forgotten = [path for path in deleted if known[path]["file_id"] not in failed_ids]
+        if forgotten:
+            self.manifest.remove(collection_id, forgotten)
+
+        summary.update(counts)
+        summary["unchanged"] += counts["restamped"]
+        summary["errors"] = errors
+        summary["wall_time_s"] = round(time.perf_counter() - started, 3)
+        self.logger.info(
+            f"Synced {self.folder} into {self.collection}: {counts['added']} added, {counts['updated']} updated, "
+            f"{counts['removed']} removed, {counts['failed']} failed, {summary['unchanged']} unchanged "
+            f"({summary['wall_time_s']:.2f}s)"
+        )
+        return summary
+
+    def _remove(self, collection_id: str, file_id: str, server: str) -> Dict[str, Any]:
+        with self.client.pinned(server):
+            return self.client.remove_knowledge_file(collection_id, file_id)
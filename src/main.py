@@ -1,31 +1,41 @@
 """Main script for OpenWebUI automation."""
 
 import logging
+import os
+import sys
 import webbrowser
-import requests
-from typing import Optional, Dict, Any
-import tkinter as tk
-from customtkinter import CTk, CTkButton, CTkLabel
-from .webui_client import OpenWebUIClient
+from typing import Optional, Dict, Any, List
+from urllib.parse import quote
 from .utils.config import Config
 from .utils.error_handler import OpenWebUIError, AuthenticationError
 from .utils.file_picker import FilePicker
+from .utils.logger import setup_logging
+
+# Tk, CustomTkinter and requests are imported lazily by the code paths that
+# use them; see benchmarks/startup.py for the import-time budget.
 
 class OpenWebUIAutomation:
-    def __init__(self):
-        """Initialize OpenWebUI automation."""
-        self.config = Config()
+    def __init__(self, refresh_models: bool = False, config: Optional[Config] = None):
+        """Initialize OpenWebUI automation.
+        
+        Args:
+            refresh_models: Revalidate the cached model list with the server
+                instead of trusting a fresh copy
+            config: Configuration; loaded from config.yaml if omitted
+        """
+        self.refresh_models = refresh_models
+        from .webui_client import OpenWebUIClient
+
+        self.config = config or Config()
+        setup_logging(self.config.get_log_config(), console=sys.stderr)
         self.logger = logging.getLogger(__name__)
         self.client = OpenWebUIClient(self.config)
         self.file_picker = FilePicker()
         
-        # Setup logging
-        logging.basicConfig(**self.config.get_log_config())
-        
     def check_auth(self) -> bool:
         """Check if we can authenticate with OpenWebUI."""
         try:
-            models = self.client.list_models()
+            models = self.client.list_models(refresh=self.refresh_models)
             if not models:
                 self.logger.warning("Authentication required. Please set API key in config.yaml")
                 return False
@@ -34,60 +44,212 @@ class OpenWebUIAutomation:
             self.logger.error(f"Authentication Error: Failed to check authentication status - {e}")
             return False
 
-    def _select_model(self) -> Optional[str]:
+    def _select_model(self, models: List[Dict[str, Any]], status=None) -> Optional[str]:
         """Select model from available models.
         
+        Args:
+            models: Model list from the server
+            status: BackgroundTask whose progress the dialog shows
+            
         Returns:
             Selected model name or None if cancelled
         """
         try:
-            # For now, just return a hardcoded model
-            return "meta-llama-3-8b-instruct"
+            from .model_selector import ModelSelector
+            from .model_search import ModelUsage
+
+            usage = ModelUsage(os.path.join(self.config.get_data_dir(), 'model_usage.json'))
+            names = [m.get('id') or m.get('name') for m in models]
+            selector = ModelSelector(
+                [m for m in names if m],
+                self.config.get_default_model(),
+                self.config.get_last_used_model(),
+                on_select=self.config.set_last_used_model,
+                usage=usage,
+                status=status
+            )
+            return selector.show()
             
         except Exception as e:
             self.logger.error(f"Model Selection Error: Failed to get available models - {e}")
             return None
 
+    def _plan(self, file_path: str, model: str) -> str:
+        """Estimate the transcript's size locally and pick a model whose context fits.
+        
+        Returns:
+            The model to use; unchanged unless a larger-context model is needed
+        """
+        planner_config = self.config.get_planner_config()
+        if not planner_config.get('enabled', True):
+            return model
+        try:
+            from .planner import CHUNKED, ContextPlanner
+            from .tokens import TokenEstimator
+
+            estimator = TokenEstimator.from_config(self.config)
+            planner = ContextPlanner(estimator, self.client.list_models(), planner_config)
+            plan = planner.plan(file_path, model)
+            estimator.close()
+        except Exception as e:
+            self.logger.warning(f"Could not plan context fit: {e}")
+            return model
+
+        if plan["strategy"] == CHUNKED:
+            self.logger.warning(
+                f"Transcript (~{plan['tokens']} tokens) exceeds the context of {model}; "
+                f"the chat may only see part of it. Use batch.py --map-reduce for a full summary."
+            )
+        return plan["model"]
+
+    def _preprocess(self, file_path: str) -> str:
+        """Clean the transcript before uploading it, if preprocess.enabled is set.
+        
+        Returns:
+            Path of the cleaned copy, or the original path
+        """
+        if not self.config.get_preprocess_config().get('enabled', False):
+            return file_path
+        try:
+            from .preprocess import Preprocessor
+
+            preprocessor = Preprocessor.from_config(self.config)
+            try:
+                report = preprocessor.process(file_path)
+            finally:
+                preprocessor.close()
+        except Exception as e:
+            self.logger.warning(f"Could not preprocess transcript, uploading it unchanged: {e}")
+            return file_path
+
+        self.logger.info(
+            f"Preprocessing saved {report['bytes_saved']} bytes, ~{report['tokens_saved']} tokens "
+            f"({report['saved_pct']}%)"
+        )
+        return report["output"]
+
+    def _prepare_upload(self, task, file_paths: List[str]) -> Dict[str, Any]:
+        """Preprocess and upload the transcripts; runs on a worker thread.
+        
+        The files go to one server, ``upload.parallel`` at a time.
+        
+        Returns:
+            ``success`` if any file was uploaded, the ``server`` holding them
+            and upload_documents' per-file ``uploads``
+        """
+        task.stage("Preparing transcripts" if len(file_paths) > 1 else "Preparing transcript")
+        upload_paths = [self._preprocess(path) for path in file_paths]
+        task.stage(f"Uploading {len(upload_paths)} transcripts" if len(upload_paths) > 1 else "Uploading transcript")
+        uploads = self.client.upload_documents(upload_paths, progress=task.progress)
+        failed = [u for u in uploads if not u["success"]]
+        for upload in failed:
+            self.logger.error(f"Failed to upload {upload['path']}: {upload['error']}")
+        return {
+            "success": len(failed) < len(uploads),
+            "server": uploads[0]["server"],
+            "uploads": uploads,
+            "error": failed[0]["error"] if failed else None
+        }
+
+    def _create_chat(self, upload, model: str, file_paths: List[str]) -> Dict[str, Any]:
+        """Create the chat once the model is chosen and the upload has finished.
+        
+        A single transcript is checked against the model's context while
+        the upload is still running, so planning adds no wait of its own.
+        """
+        if len(file_paths) == 1:
+            model = self._plan(file_paths[0], model)
+        if not upload.done():
+            self.logger.info(f"Waiting for the upload to finish ({upload.describe()})")
+        try:
+            uploaded = upload.result()
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        if not uploaded["success"]:
+            return uploaded
+
+        paths = [u["path"] for u in uploaded["uploads"] if u["success"]]
+        file_ids = [u["file_id"] for u in uploaded["uploads"] if u["success"]]
+        chat_response = self.client.chat_with_files(model, file_ids, server=uploaded["server"])
+        if not chat_response["success"] and not self.client.router.is_healthy(uploaded["server"]):
+            # The files are stranded on a server that went down; upload them elsewhere
+            chat_response = self.client.create_chat(model, paths)
+        chat_response["model"] = model
+        chat_response["failed"] = [u["path"] for u in uploaded["uploads"] if not u["success"]]
+        return chat_response
+
     def run(self):
-        """Run the automation workflow."""
+        """Run the automation workflow.
+        
+        Network work overlaps with the dialogs: the model list (which also
+        checks authentication) is fetched while the file picker is open,
+        and the upload starts as soon as a file is picked and runs while the
+        model is chosen. The dialogs poll the workers' progress and never
+        wait on them.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from .background import BackgroundTask
+
+        pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='gui-worker')
+        pending = []
         try:
-            # Check authentication
-            if not self.check_auth():
-                return
-                
-            # Pick transcript file
-            file_path = self.file_picker.pick_file()
-            if not file_path:
+            # Fetch the model list while the user looks for the transcripts
+            prefetch = pool.submit(self.client.list_models, refresh=self.refresh_models)
+            pending.append(prefetch)
+
+            # Pick one or more transcript files
+            file_paths = self.file_picker.pick_files()
+            if not file_paths:
                 self.logger.info("File selection cancelled")
                 return
-                
-            # Select model
-            model = self._select_model()
+
+            # Start the upload now; it does not depend on the model
+            upload = BackgroundTask("Upload", pool, self._prepare_upload, file_paths)
+            pending.append(upload.future)
+
+            models = prefetch.result()
+            if not models:
+                self.logger.warning("Authentication required. Please set API key in config.yaml")
+                upload.cancel()
+                return
+
+            # Select model while the upload runs
+            model = self._select_model(models, status=upload)
             if not model:
                 self.logger.info("Model selection cancelled")
                 return
-            
-            # Create chat with file
-            chat_response = self.client.create_chat(model, file_path)
+
+            # Create chat with the uploaded files
+            chat_response = self._create_chat(upload, model, file_paths)
+            model = chat_response.get("model", model)
             
             if chat_response["success"]:
-                # If API call succeeded, open the chat URL with the model
-                chat_url = f"{self.config.get_webui_url()}/?model={requests.utils.quote(model)}"
+                # If API call succeeded, open the chat on the server holding the files
+                server = chat_response.get("server") or self.config.get_webui_url()
+                chat_url = f"{server}/?model={quote(model)}"
+                file_ids = chat_response.get("file_ids") or [chat_response['file_id']]
                 
-                # Display file ID prominently
+                # Display file IDs prominently
                 print("\n" + "="*50)
-                print(f"📄 File uploaded successfully!")
-                print(f"📎 File ID: {chat_response['file_id']}")
-                print("\nTo use this file in your chat:")
+                if len(file_ids) > 1:
+                    print(f"📄 {len(file_ids)} files uploaded successfully!")
+                else:
+                    print(f"📄 File uploaded successfully!")
+                for file_id in file_ids:
+                    print(f"📎 File ID: {file_id}")
+                for path in chat_response.get("failed", []):
+                    print(f"⚠️  Not uploaded: {path}")
+                print("\nTo use these files in your chat:" if len(file_ids) > 1 else "\nTo use this file in your chat:")
                 print("1. Wait for the chat window to open")
                 print("2. Type # in the chat to see your uploaded files")
                 print("3. Click on the file to reference it in your message")
                 print("\nOr if you want to reference it manually:")
-                print(f"#file-{chat_response['file_id']}")
+                for file_id in file_ids:
+                    print(f"#file-{file_id}")
                 print("="*50 + "\n")
             else:
                 # If API failed, just open new chat with model
-                chat_url = f"{self.config.get_webui_url()}/?model={requests.utils.quote(model)}"
+                chat_url = f"{self.config.get_webui_url()}/?model={quote(model)}"
                 self.logger.warning(f"Failed to create chat via API: {chat_response.get('error')}")
             
             self.logger.info(f"Opening chat URL: {chat_url}")
@@ -99,6 +261,12 @@ class OpenWebUIAutomation:
             self.logger.error(f"OpenWebUI Error: {e}")
         except Exception as e:
             self.logger.error(f"Unexpected Error: An unexpected error occurred - {e}")
+        finally:
+            # Drop work that has not started; a running upload is left to finish.
+            # (shutdown's cancel_futures needs Python 3.9)
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False)
 
 if __name__ == "__main__":
     automation = OpenWebUIAutomation()
@@ -0,0 +1,362 @@
+"""Per-request metrics for the OpenWebUI clients.
+
+Every HTTP call is recorded with its endpoint, status, bytes sent and
+received, retry count and phase timings:
+
+    dns       name resolution (new connections only)
+    connect   TCP connect (new connections only)
+    tls       TLS handshake (new HTTPS connections only)
+    send      writing the request line, headers and body
+    wait      server think-time, until the response headers arrive
+    download  reading the response body
+
+Records feed in-process histograms that are exported as a Prometheus text
+file and a JSON summary when the process exits, and can also be appended to
+a JSON-lines sink file as they happen.
+"""
+
+import atexit
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+PHASES = ('dns', 'connect', 'tls', 'send', 'wait', 'download')
+
+# Points of concurrency-limit history kept per server and endpoint class
+LIMIT_HISTORY = 200
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+DEFAULT_METRICS_CONFIG: Dict[str, Any] = {
+    'enabled': True,
+    'export_dir': None,
+    'sink': None,
+    'buckets': list(DEFAULT_BUCKETS),
+}
+
+_ID_SEGMENT_RE = re.compile(r'^(?:[0-9a-fA-F-]{16,}|\d+)$')
+
+_local = threading.local()
+
+
+def endpoint_label(path: str) -> str:
+    """Collapse IDs in a URL path so it can be used as a metric label.
+
+    ``/api/files/3f2c...`` becomes ``/api/files/{id}``.
+    """
+    path = path.split('?', 1)[0]
+    return '/'.join('{id}' if _ID_SEGMENT_RE.match(part) else part for part in path.split('/'))
+
+
+def new_record(method: str, endpoint: str) -> Dict[str, Any]:
+    """Create an empty per-request record."""
+    return {
+        "method": method,
+        "endpoint": endpoint,
+        "status": None,
+        "error": None,
+        "bytes_sent": 0,
+        "bytes_received": 0,
+        "attempts": 0,
+        "retries": 0,
+        "duration_s": 0.0,
+        "phases": dict.fromkeys(PHASES, 0.0),
+    }
+
+
+@contextmanager
+def tracking(record: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Make ``record`` the current thread's request record.
+
+    Instrumented connections add their phase timings to the current record.
+    """
+    previous = getattr(_local, 'record', None)
+    _local.record = record
+    try:
+        yield record
+    finally:
+        _local.record = previous
+
+
+def current_record() -> Optional[Dict[str, Any]]:
+    """Request record of the call running on this thread, if any."""
+    return getattr(_local, 'record', None)
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds, Prometheus style."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(upper bound, cumulative count) pairs including ``+Inf``."""
+        total = 0
+        pairs = []
+        for bound, count in zip(list(self.buckets) + [float('inf')], self.counts):
+            total += count
+            pairs.append(('+Inf' if bound == float('inf') else f"{bound:g}", total))
+        return pairs
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.buckets[-1] if self.buckets else None
+
+
+class MetricsRegistry:
+    """Thread-safe store of request metrics with Prometheus and JSON export.
+
+    Histograms are kept per (method, endpoint) for the total duration and
+    per (endpoint, phase) for phase timings; requests are counted per
+    (method, endpoint, status), bytes and retries per endpoint. Concurrency
+    limits chosen by the request limiter are kept per (server, endpoint
+    class), with their recent history.
+    """
+
+    _shared: Optional['MetricsRegistry'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, export_dir: Optional[str] = None):
+        """Initialize registry.
+
+        Args:
+            config: Metrics settings, see DEFAULT_METRICS_CONFIG
+            export_dir: Directory for metrics.prom and metrics.json, overrides
+                ``export_dir`` in the settings
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_METRICS_CONFIG, **(config or {})}
+        self.export_dir = export_dir or self.settings['export_dir']
+        self.buckets = tuple(self.settings['buckets'] or DEFAULT_BUCKETS)
+        self._lock = threading.Lock()
+        self.durations: Dict[Tuple[str, str], Histogram] = {}
+        self.phases: Dict[Tuple[str, str], Histogram] = {}
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.bytes_sent: Dict[str, int] = {}
+        self.bytes_received: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+        self.limits: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._started = time.monotonic()
+        self._sink = None
+        if self.settings['sink']:
+            self.set_sink(self.settings['sink'])
+
+    @classmethod
+    def shared(cls, config) -> 'MetricsRegistry':
+        """Process-wide registry, created from config on first use.
+
+        The shared registry writes its exports to ``metrics.export_dir``
+        (default ``paths.data_dir/metrics``) when the process exits.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                settings = config.get_metrics_config()
+                export_dir = settings.get('export_dir') or os.path.join(config.get_data_dir(), 'metrics')
+                cls._shared = cls(settings, export_dir=export_dir)
+                atexit.register(cls._shared.export)
+            return cls._shared
+
+    def set_sink(self, path: Optional[str]) -> None:
+        """Append every request record to a JSON-lines file (None to stop)."""
+        with self._lock:
+            if self._sink:
+                self._sink.close()
+                self._sink = None
+            if path:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._sink = open(path, 'a', buffering=1)
+
+    def _histogram(self, table: Dict, key: Tuple[str, ...]) -> Histogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(self.buckets)
+        return histogram
+
+    def observe(self, record: Dict[str, Any]) -> None:
+        """Add a finished request record."""
+        endpoint = record["endpoint"]
+        status = str(record["status"]) if record["status"] is not None else 'error'
+        with self._lock:
+            self._histogram(self.durations, (record["method"], endpoint)).observe(record["duration_s"])
+            for phase, seconds in record["phases"].items():
+                if seconds:
+                    self._histogram(self.phases, (endpoint, phase)).observe(seconds)
+            key = (record["method"], endpoint, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.bytes_sent[endpoint] = self.bytes_sent.get(endpoint, 0) + record["bytes_sent"]
+            self.bytes_received[endpoint] = self.bytes_received.get(endpoint, 0) + record["bytes_received"]
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + record["retries"]
+            if self._sink:
+                line = {"ts": round(time.time(), 3), **record}
+                line["phases"] = {k: round(v, 6) for k, v in record["phases"].items()}
+                self._sink.write(json.dumps(line) + '\n')
+        if record["error"] or (record["status"] or 0) >= 400:
+            self.logger.debug(f"{record['method']} {endpoint} -> {status} after {record['retries']} retries")
+
+    def observe_limit(self, server: str, endpoint_class: str, limit: float, throttled: bool = False) -> None:
+        """Record the concurrency limit in force for a server and endpoint class.
+
+        Args:
+            server: Server base URL
+            endpoint_class: files, completions or other
+            limit: Current limit
+            throttled: The change was caused by a 429/503 from the server
+        """
+        with self._lock:
+            entry = self.limits.setdefault((server, endpoint_class), {"throttled": 0, "history": []})
+            entry["limit"] = limit
+            if throttled:
+                entry["throttled"] += 1
+            entry["history"].append((round(time.monotonic() - self._started, 3), round(limit, 2)))
+            del entry["history"][:-LIMIT_HISTORY]
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def histogram(name: str, help_text: str, table: Dict, label_names: Tuple[str, ...]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, hist in sorted(table.items()):
+                labels = ','.join(f'{n}="{v}"' for n, v in zip(label_names, key))
+                for bound, count in hist.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        def counter(name: str, help_text: str, values: Dict, label_names: Tuple[str, ...]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(values.items()):
+                key = key if isinstance(key, tuple) else (key,)
+                labels = ','.join(f'{n}="{v}"' for n, v in zip(label_names, key))
+                lines.append(f"{name}{{{labels}}} {value}")
+
+        with self._lock:
+            histogram('openwebui_request_duration_seconds', "Total time of API requests.",
+                      self.durations, ('method', 'endpoint'))
+            histogram('openwebui_request_phase_seconds', "Time spent in each phase of API requests.",
+                      self.phases, ('endpoint', 'phase'))
+            counter('openwebui_requests_total', "API requests by status ('error' when no response).",
+                    self.requests, ('method', 'endpoint', 'status'))
+            counter('openwebui_request_bytes_sent_total', "Request body bytes sent.",
+                    self.bytes_sent, ('endpoint',))
+            counter('openwebui_request_bytes_received_total', "Response body bytes received.",
+                    self.bytes_received, ('endpoint',))
+            counter('openwebui_request_retries_total', "Transport-level retries.",
+                    self.retries, ('endpoint',))
+            if self.limits:
+                lines.append("# HELP openwebui_concurrency_limit Concurrency limit chosen by the request limiter.")
+                lines.append("# TYPE openwebui_concurrency_limit gauge")
+                for (server, cls), entry in sorted(self.limits.items()):
+                    lines.append(f'openwebui_concurrency_limit{{server="{server}",class="{cls}"}} {entry["limit"]:.2f}')
+                counter('openwebui_throttled_total', "Requests the server answered with 429 or 503 + Retry-After.",
+                        {key: entry["throttled"] for key, entry in self.limits.items()}, ('server', 'class'))
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-endpoint summary and concurrency limits.
+
+        Endpoints get counts, errors, bytes, retries, latency and phase
+        quantiles; limits are keyed by server and endpoint class.
+        """
+        endpoints: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for (method, endpoint), hist in sorted(self.durations.items()):
+                name = f"{method} {endpoint}"
+                statuses = {s: n for (m, e, s), n in self.requests.items() if m == method and e == endpoint}
+                endpoints[name] = {
+                    "requests": hist.count,
+                    "errors": sum(n for s, n in statuses.items() if s == 'error' or int(s) >= 400),
+                    "statuses": statuses,
+                    "mean_s": round(hist.sum / hist.count, 4) if hist.count else None,
+                    "p50_s": _round(hist.quantile(0.5)),
+                    "p95_s": _round(hist.quantile(0.95)),
+                    "p99_s": _round(hist.quantile(0.99)),
+                    "bytes_sent": self.bytes_sent.get(endpoint, 0),
+                    "bytes_received": self.bytes_received.get(endpoint, 0),
+                    "retries": self.retries.get(endpoint, 0),
+                    "phases_mean_s": {
+                        phase: round(h.sum / h.count, 4)
+                        for (e, phase), h in self.phases.items() if e == endpoint and h.count
+                    },
+                }
+            limits = {
+                f"{server} {cls}": {
+                    "limit": round(entry["limit"], 2),
+                    "throttled": entry["throttled"],
+                    "history": [list(point) for point in entry["history"]]
+                }
+                for (server, cls), entry in sorted(self.limits.items())
+            }
+        return {"endpoints": endpoints, "limits": limits}
+
+    def export(self, directory: Optional[str] = None) -> Optional[str]:
+        """Write metrics.prom and metrics.json to a directory.
+
+        Args:
+            directory: Target directory, defaults to ``export_dir``
+
+        Returns:
+            The directory written to, or None if there was nothing to export
+        """
+        directory = directory or self.export_dir
+        if not directory or not self.durations:
+            return None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            _atomic_write(os.path.join(directory, 'metrics.prom'), self.to_prometheus())
+            _atomic_write(os.path.join(directory, 'metrics.json'), json.dumps(self.summary(), indent=2))
+        except OSError as e:
+            self.logger.warning(f"Could not export metrics to {directory}: {str(e)}")
+            return None
+        return directory
+
+    def close(self) -> None:
+        """Close the sink file."""
+        self.set_sink(None)
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 4) if value is not None else None
+
+
+def _atomic_write(path: str, text: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
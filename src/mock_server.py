@@ -0,0 +1,417 @@
+"""Mock OpenWebUI server for tests, load tests and benchmarks.
+
+Implements the endpoints the clients use: ``GET /api/models`` (with ETag
+revalidation), ``POST /api/files/``, ``GET /api/files/{id}``,
+``POST /api/chat/completions`` (plain JSON or server-sent events) and the
+knowledge collection endpoints under ``/api/v1/knowledge``. Latency,
+server errors and 429 throttling can be injected. Request bodies may be
+chunked and gzip/zstd compressed; unsupported encodings get a 415, or
+the generic 400 a stock FastAPI server sends.
+
+    python -m src.mock_server --port 3000 --latency 0.05 --rate-429 0.02
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any, Sequence
+
+from .compression import available_encodings, decompressor
+
+READ_CHUNK = 1024 * 1024
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections are expected under load
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class MockOpenWebUIServer:
+    """Threaded HTTP server imitating the OpenWebUI API.
+
+    Every request sleeps for ``latency`` seconds plus up to ``jitter``;
+    ``max_in_flight`` records the highest number of requests served at once.
+    A fraction ``error_rate`` of requests fails with 500 and a fraction
+    ``rate_429`` with 429 and a ``Retry-After`` header; with ``capacity``,
+    so does every request beyond that many in flight. Completions with
+    ``"stream": true`` are answered as server-sent events, one
+    ``stream_tokens`` entry per event, ``token_delay`` seconds apart.
+
+    Uploaded bodies are kept in ``uploads`` unless ``keep_bodies`` is off,
+    in which case only their sizes are recorded (for large-file benchmarks).
+    Compressed request bodies are decoded if their Content-Encoding is in
+    ``accept_encodings``; others are refused with 415 and an Accept-Encoding
+    header, or with ``generic_400`` the way stock OpenWebUI fails to parse
+    them: a 400 that does not mention the encoding. ``stats["bytes_received"]`` counts bytes on the wire,
+    ``stats["bytes_decoded"]`` after decompression.
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_429: float = 0.0,
+        retry_after: float = 1.0,
+        capacity: Optional[int] = None,
+        token_delay: float = 0.0,
+        stream_tokens: Optional[List[str]] = None,
+        keep_bodies: bool = True,
+        accept_encodings: Optional[Sequence[str]] = None,
+        generic_400: bool = False,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.capacity = capacity
+        self.token_delay = token_delay
+        self.stream_tokens = stream_tokens or ["Summary", ":", " all", " good", "."]
+        self.keep_bodies = keep_bodies
+        self.accept_encodings = list(available_encodings() if accept_encodings is None else accept_encodings)
+        self.generic_400 = generic_400
+        self.models: List[Dict[str, Any]] = [{"id": "stand-in-model"}]
+        self.models_etag = '"models-v1"'
+        self.model_requests: List[Optional[str]] = []
+        self.uploads: Dict[str, Any] = {}
+        self.completions: List[Dict[str, Any]] = []
+        self.knowledge: Dict[str, Dict[str, Any]] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.stats = {"requests": 0, "errors_injected": 0, "throttled": 0, "bytes_received": 0, "bytes_decoded": 0, "rejected_encodings": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _QuietHTTPServer((host, port), self._handler_class())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockOpenWebUIServer':
+        """Serve on a background thread."""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread."""
+        self._httpd.serve_forever()
+
+    def __enter__(self) -> 'MockOpenWebUIServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _injected_failure(self) -> Optional[int]:
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.rate_429:
+            return 429
+        if roll < self.rate_429 + self.error_rate:
+            return 500
+        return None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_stream(self, payload):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                chat_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                for token in server.stream_tokens:
+                    event = {"id": chat_id, "choices": [{"index": 0, "delta": {"content": token}}]}
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+                    if server.token_delay:
+                        time.sleep(server.token_delay)
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _read_raw(self):
+                """Yield the request body as sent, with or without chunked framing."""
+                if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+                    while True:
+                        size = int(self.rfile.readline().split(b';')[0].strip() or b'0', 16)
+                        if size == 0:
+                            # Skip trailers up to the blank line ending the body
+                            while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                                pass
+                            return
+                        while size > 0:
+                            chunk = self.rfile.read(min(size, READ_CHUNK))
+                            if not chunk:
+                                return
+                            size -= len(chunk)
+                            yield chunk
+                        self.rfile.readline()  # CRLF after the chunk data
+                remaining = int(self.headers.get('Content-Length') or 0)
+                while remaining > 0:
+                    chunk = self.rfile.read(min(remaining, READ_CHUNK))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+
+            def _read_body(self, keep: bool = True):
+                """Read and decode the request body.
+
+                Returns:
+                    (body, decoded size); body is None if its encoding is refused
+                """
+                encoding = self.headers.get('Content-Encoding', 'identity').strip().lower()
+                decoder = None
+                if encoding != 'identity':
+                    if encoding in server.accept_encodings:
+                        decoder = decompressor(encoding)
+                parts = []
+                size = 0
+                for chunk in self._read_raw():
+                    with server._lock:
+                        server.stats["bytes_received"] += len(chunk)
+                    if encoding != 'identity' and decoder is None:
+                        continue
+                    if decoder is not None:
+                        chunk = decoder.decompress(chunk)
+                    size += len(chunk)
+                    if keep:
+                        parts.append(chunk)
+                if encoding != 'identity' and decoder is None:
+                    return None, 0
+                with server._lock:
+                    server.stats["bytes_decoded"] += size
+                return b''.join(parts), size
+
+            def _enter(self) -> bool:
+                """Count the request, apply latency and injected failures.
+
+                Returns:
+                    False if a failure response was already sent
+                """
+                with server._lock:
+                    server.stats["requests"] += 1
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    overloaded = bool(server.capacity) and server.in_flight > server.capacity
+                delay = server.latency
+                if server.jitter:
+                    with server._lock:
+                        delay += server._random.random() * server.jitter
+                if delay:
+                    time.sleep(delay)
+
+                status = 429 if overloaded else server._injected_failure()
+                if status == 429:
+                    with server._lock:
+                        server.stats["throttled"] += 1
+                    self._send_json(429, {"detail": "Too Many Requests"}, {'Retry-After': f"{server.retry_after:g}"})
+                    return False
+                if status == 500:
+                    with server._lock:
+                        server.stats["errors_injected"] += 1
+                    self._send_json(500, {"detail": "Injected server error"})
+                    return False
+                return True
+
+            def _leave(self):
+                with server._lock:
+                    server.in_flight -= 1
+
+            def do_GET(self):
+                try:
+                    if not self._enter():
+                        return
+                    if self.path == '/api/models':
+                        with server._lock:
+                            server.model_requests.append(self.headers.get('If-None-Match'))
+                        if self.headers.get('If-None-Match') == server.models_etag:
+                            self.send_response(304)
+                            self.send_header('Content-Length', '0')
+                            self.end_headers()
+                        else:
+                            self._send_json(200, {"data": server.models}, {'ETag': server.models_etag})
+                    elif self.path.startswith('/api/files/'):
+                        file_id = self.path[len('/api/files/'):]
+                        if file_id in server.uploads:
+                            self._send_json(200, {"id": file_id})
+                        else:
+                            self._send_json(404, {"detail": "Not Found"})
+                    elif self.path == '/api/v1/knowledge/':
+                        with server._lock:
+                            listing = [self._knowledge_json(k) for k in server.knowledge.values()]
+                        self._send_json(200, listing)
+                    elif self.path.startswith('/api/v1/knowledge/'):
+                        with server._lock:
+                            collection = server.knowledge.get(self.path[len('/api/v1/knowledge/'):])
+                            payload = self._knowledge_json(collection) if collection else None
+                        if payload:
+                            self._send_json(200, payload)
+                        else:
+                            self._send_json(404, {"detail": "Not Found"})
+                    else:
+                        self._send_json(404, {"detail": "Not Found"})
+                finally:
+                    self._leave()
+
+            def do_POST(self):
+                is_upload = self.path == '/api/files/'
+                body, size = self._read_body(keep=not is_upload or server.keep_bodies)
+                try:
+                    if not self._enter():
+                        return
+                    if body is None:
+                        with server._lock:
+                            server.stats["rejected_encodings"] += 1
+                        if server.generic_400:
+                            detail = "Invalid multipart data." if is_upload else "There was an error parsing the body"
+                            self._send_json(400, {"detail": detail})
+                            return
+                        accepted = ', '.join(server.accept_encodings + ['identity'])
+                        self._send_json(415, {"detail": "Unsupported Content-Encoding"}, {'Accept-Encoding': accepted})
+                        return
+                    if is_upload:
+                        file_id = str(uuid.uuid4())
+                        with server._lock:
+                            server.uploads[file_id] = body if server.keep_bodies else size
+                        self._send_json(200, {"id": file_id})
+                    elif self.path == '/api/chat/completions':
+                        payload = json.loads(body or b'{}')
+                        with server._lock:
+                            server.completions.append(payload)
+                        if payload.get('stream'):
+                            self._send_stream(payload)
+                            return
+                        self._send_json(200, {
+                            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                            "model": payload.get('model'),
+                            "choices": [{"index": 0, "message": {"role": "assistant", "content": ''.join(server.stream_tokens)}}],
+                            "usage": {"completion_tokens": len(server.stream_tokens)}
+                        })
+                    elif self.path.startswith('/api/v1/knowledge/'):
+                        self._knowledge_post(json.loads(body or b'{}'))
+                    else:
+                        self._send_json(404, {"detail": "Not Found"})
+                finally:
+                    self._leave()
+
+            def _knowledge_json(self, collection):
+                return {
+                    "id": collection["id"],
+                    "name": collection["name"],
+                    "description": collection["description"],
+                    "data": {"file_ids": list(collection["file_ids"])},
+                    "files": [{"id": file_id, "meta": {}} for file_id in collection["file_ids"]],
+                }
+
+            def _knowledge_post(self, payload):
+                """create, {id}/file/add and {id}/file/remove."""
+                parts = self.path[len('/api/v1/knowledge/'):].strip('/').split('/')
+                with server._lock:
+                    if parts == ['create']:
+                        collection = {
+                            "id": str(uuid.uuid4()),
+                            "name": payload.get("name"),
+                            "description": payload.get("description", ""),
+                            "file_ids": [],
+                        }
+                        server.knowledge[collection["id"]] = collection
+                        status, answer = 200, self._knowledge_json(collection)
+                    elif len(parts) == 3 and parts[1] == 'file' and parts[0] in server.knowledge:
+                        collection = server.knowledge[parts[0]]
+                        file_id = payload.get("file_id")
+                        if parts[2] == 'add' and file_id in collection["file_ids"]:
+                            # Like OpenWebUI, adding a file twice is an error
+                            status, answer = 400, {"detail": "File already in the collection"}
+                        elif parts[2] == 'add' and file_id in server.uploads:
+                            collection["file_ids"].append(file_id)
+                            status, answer = 200, self._knowledge_json(collection)
+                        elif parts[2] == 'remove' and file_id in collection["file_ids"]:
+                            collection["file_ids"].remove(file_id)
+                            status, answer = 200, self._knowledge_json(collection)
+                        else:
+                            status, answer = 400, {"detail": "Invalid file"}
+                    else:
+                        status, answer = 404, {"detail": "Not Found"}
+                self._send_json(status, answer)
+
+        return Handler
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run a mock OpenWebUI server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3000)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Up to this many extra seconds, uniformly random")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument('--rate-429', type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument('--retry-after', type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument('--capacity', type=int, help="Answer 429 to requests beyond this many in flight")
+    parser.add_argument('--token-delay', type=float, default=0.0, help="Seconds between streamed tokens")
+    parser.add_argument('--models', nargs='*', help="Model ids served by /api/models")
+    args = parser.parse_args(argv)
+
+    server = MockOpenWebUIServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        capacity=args.capacity,
+        token_delay=args.token_delay,
+        keep_bodies=False
+    )
+    if args.models:
+        server.models = [{"id": model} for model in args.models]
+    print(f"Mock OpenWebUI server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""Persistent, revalidating cache of the server's model list."""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Any, Tuple
+
+DEFAULT_MODEL_CACHE_CONFIG: Dict[str, Any] = {
+    'enabled': True,
+    'ttl': 3600,
+    'background_refresh': True,
+}
+
+# Fetch function: takes conditional request headers and returns
+# (models or None when not modified, response validators)
+ModelFetcher = Callable[[Dict[str, str]], Tuple[Optional[List[Dict[str, Any]]], Dict[str, str]]]
+
+
+class ModelCache:
+    """Model list stored on disk with a TTL and conditional revalidation.
+
+    A copy younger than ``ttl`` seconds is returned without touching the
+    network. An older copy is revalidated with ``If-None-Match`` /
+    ``If-Modified-Since`` when the server sent an ETag or Last-Modified.
+    With ``background_refresh`` the stale copy is returned at once and the
+    revalidation runs on a background thread.
+    """
+
+    def __init__(self, path: str, fetch: ModelFetcher, config: Optional[Dict[str, Any]] = None):
+        """Initialize model cache.
+
+        Args:
+            path: JSON file holding the cached list
+            fetch: Function performing the (conditional) /api/models request
+            config: Cache settings, see DEFAULT_MODEL_CACHE_CONFIG
+        """
+        self.path = path
+        self.fetch = fetch
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_MODEL_CACHE_CONFIG, **(config or {})}
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._entry: Optional[Dict[str, Any]] = self._read()
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as f:
+                entry = json.load(f)
+            if isinstance(entry.get('models'), list):
+                return entry
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.warning(f"Failed to write model cache: {str(e)}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def is_fresh(self) -> bool:
+        """Whether a cached copy exists and is younger than the TTL."""
+        entry = self._entry
+        return entry is not None and time.time() - entry['fetched_at'] < float(self.settings['ttl'])
+
+    def get(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Get the model list.
+
+        Args:
+            refresh: Revalidate with the server now, ignoring the TTL
+
+        Returns:
+            List of model information dictionaries
+        """
+        entry = self._entry
+        if not refresh and entry is not None:
+            if self.is_fresh():
+                self.logger.debug("Using cached model list")
+                return entry['models']
+            if self.settings['background_refresh']:
+                self.logger.info("Model list is stale, refreshing in the background")
+                self.refresh_async()
+                return entry['models']
+        return self.refresh()
+
+    def refresh(self) -> List[Dict[str, Any]]:
+        """Revalidate the cached list with the server.
+
+        Returns:
+            The current model list
+        """
+        with self._lock:
+            entry = self._entry
+            headers: Dict[str, str] = {}
+            if entry and entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry and entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+            models, validators = self.fetch(headers)
+            if models is None and entry is not None:
+                self.logger.info("Model list not modified")
+                entry = {**entry, 'fetched_at': time.time()}
+            else:
+                self.logger.info(f"Fetched {len(models or [])} models")
+                entry = {
+                    'fetched_at': time.time(),
+                    'etag': validators.get('etag'),
+                    'last_modified': validators.get('last_modified'),
+                    'models': models or []
+                }
+            self._entry = entry
+            self._write(entry)
+            return entry['models']
+
+    def refresh_async(self) -> threading.Thread:
+        """Start a background revalidation unless one is already running."""
+        if self._refresh_thread is None or not self._refresh_thread.is_alive():
+            self._refresh_thread = threading.Thread(target=self._refresh_quietly, daemon=True)
+            self._refresh_thread.start()
+        return self._refresh_thread
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            self.logger.warning(f"Background model refresh failed: {str(e)}")
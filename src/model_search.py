@@ -0,0 +1,204 @@
+"""Type-ahead search over the model catalog, ranked by usage.
+
+ModelIndex is built once per model list: every word of every model name is
+indexed by its prefixes and its trigrams. A query is split
+into terms. A model matches when each term is a prefix of one of its words,
+a substring of its name, or, failing that, shares enough trigrams with the
+name to count as a typo (``lama`` finds ``llama``). Matches are ranked by
+how well they match, then by how often and how recently each model was
+picked (ModelUsage, kept in ``paths.data_dir/model_usage.json``).
+
+Nothing here imports Tk, so the index is usable and testable without a
+display; see src/model_selector.py for the dialog.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set
+
+# Characters that separate words in model ids such as "meta-llama/llama-3.1:8b"
+_WORD_SPLIT_RE = re.compile(r'[\s\-_/:.@]+')
+
+# Trigram similarity (Dice) a word must reach to match a term as a typo
+TRIGRAM_THRESHOLD = 0.5
+
+# Days after which the recency part of a model's usage score halves
+USAGE_HALF_LIFE_DAYS = 14.0
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ModelUsage:
+    """How often and how recently each model was picked, persisted as JSON."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize usage history.
+
+        Args:
+            path: JSON file the history is kept in; in memory only if omitted
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, float]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, float]]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable model usage history {self.path}: {str(e)}")
+            return {}
+
+    def record(self, model: str) -> None:
+        """Count a pick of ``model`` and save the history."""
+        with self._lock:
+            entry = self.entries.setdefault(model, {"count": 0, "last_used": 0.0})
+            entry["count"] += 1
+            entry["last_used"] = time.time()
+            if not self.path:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def score(self, model: str, now: Optional[float] = None) -> float:
+        """Frecency of a model: grows with picks, decays with time since the last one."""
+        entry = self.entries.get(model)
+        if not entry:
+            return 0.0
+        age_days = max(0.0, ((now or time.time()) - entry.get("last_used", 0.0)) / 86400)
+        return math.log1p(entry.get("count", 0)) + 2 * 0.5 ** (age_days / USAGE_HALF_LIFE_DAYS)
+
+
+class ModelIndex:
+    """Prefix and trigram index over the words of model names."""
+
+    def __init__(self, models: Sequence[str], usage: Optional[ModelUsage] = None):
+        """Build the index.
+
+        Args:
+            models: Model names; duplicates are dropped
+            usage: Usage history used to rank results
+        """
+        self.models: List[str] = list(dict.fromkeys(models))
+        self.lowered = [m.lower() for m in self.models]
+        self._ids = {m: i for i, m in enumerate(self.models)}
+        self.usage = usage
+
+        # Catalogs reuse a small vocabulary, so words are indexed once each
+        self.words: List[str] = []
+        self.word_models: List[Set[int]] = []
+        word_ids: Dict[str, int] = {}
+        for i, name in enumerate(self.lowered):
+            for word in _WORD_SPLIT_RE.split(name):
+                if not word:
+                    continue
+                w = word_ids.get(word)
+                if w is None:
+                    w = word_ids[word] = len(self.words)
+                    self.words.append(word)
+                    self.word_models.append(set())
+                self.word_models[w].add(i)
+        self.prefixes: Dict[str, Set[int]] = defaultdict(set)
+        self.trigrams: Dict[str, Set[int]] = defaultdict(set)
+        self.gram_counts: List[int] = []
+        for w, word in enumerate(self.words):
+            for end in range(1, len(word) + 1):
+                self.prefixes[word[:end]].add(w)
+            grams = _trigrams(word)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.trigrams[gram].add(w)
+        self.rerank()
+
+    def rerank(self) -> None:
+        """Recompute the usage order, e.g. after a pick was recorded."""
+        now = time.time()
+        scores = [self.usage.score(m, now) if self.usage else 0.0 for m in self.models]
+        self._order = sorted(range(len(self.models)), key=lambda i: (-scores[i], self.lowered[i]))
+        self._rank = {i: position for position, i in enumerate(self._order)}
+
+    def position(self, model: str) -> Optional[int]:
+        """Row of ``model`` in the unfiltered, usage-ranked list."""
+        i = self._ids.get(model)
+        return self._rank[i] if i is not None else None
+
+    def _term_scores(self, term: str) -> Dict[int, float]:
+        """Match quality of every model matching one query term."""
+        word_scores: Dict[int, float] = {}
+        for w in self.prefixes.get(term, ()):
+            word_scores[w] = 2.0
+        if len(term) >= 3:
+            grams = _trigrams(term)
+            counts: Dict[int, int] = defaultdict(int)
+            for gram in grams:
+                for w in self.trigrams.get(gram, ()):
+                    counts[w] += 1
+            for w, count in counts.items():
+                if w in word_scores:
+                    continue
+                if term in self.words[w]:
+                    word_scores[w] = 1.5
+                else:
+                    # Dice coefficient of the trigram sets
+                    similarity = 2 * count / (len(grams) + self.gram_counts[w])
+                    if similarity >= TRIGRAM_THRESHOLD:
+                        word_scores[w] = similarity
+
+        scores: Dict[int, float] = {}
+        for w, score in word_scores.items():
+            for i in self.word_models[w]:
+                if score > scores.get(i, 0.0):
+                    scores[i] = score
+        for i in list(scores):
+            name = self.lowered[i]
+            if name == term:
+                scores[i] = 4.0
+            elif name.startswith(term):
+                scores[i] = 3.0
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Models matching every term of ``query``, best first.
+
+        Args:
+            query: Text typed by the user; empty lists every model
+            limit: Return at most this many
+
+        Returns:
+            Model names ranked by match quality, then usage
+        """
+        terms = [t for t in _WORD_SPLIT_RE.split(query.lower().strip()) if t]
+        if not terms:
+            order = self._order
+        else:
+            total: Optional[Dict[int, float]] = None
+            for term in terms:
+                scores = self._term_scores(term)
+                if total is None:
+                    total = scores
+                else:
+                    total = {i: s + scores[i] for i, s in total.items() if i in scores}
+                if not total:
+                    return []
+            order = sorted(total, key=lambda i: (-total[i], self._rank[i]))
+        if limit is not None:
+            order = order[:limit]
+        return [self.models[i] for i in order]
@@ -1,18 +1,86 @@
 """Model selector UI for OpenWebUI automation."""
 
-import tkinter as tk
-import customtkinter as ctk
 from typing import List, Optional, Callable
-from tkinter import ttk
+from src.model_search import ModelIndex, ModelUsage
 from src.utils.error_handler import ModelError
 
+# Rows shown before the list knows its real height
+DEFAULT_ROWS = 20
+
+# How often the status line polls a background task
+STATUS_POLL_MS = 150
+
+
+class ListWindow:
+    """The slice of a long result list that is on screen, and the selected row.
+
+    Only the visible rows are put into the Listbox, so building and
+    filtering the list costs the same for 50 models as for 5,000.
+    """
+
+    def __init__(self, rows: int = DEFAULT_ROWS):
+        self.rows = max(1, rows)
+        self.total = 0
+        self.offset = 0
+        self.cursor = 0
+
+    def reset(self, total: int, cursor: int = 0) -> None:
+        """Show a new result list with ``cursor`` selected."""
+        self.total = total
+        self.offset = 0
+        self.cursor = 0
+        self.move_cursor(cursor)
+
+    def resize(self, rows: int) -> None:
+        """Change the number of visible rows, keeping the selection on screen."""
+        self.rows = max(1, rows)
+        self.scroll(0)
+        self.move_cursor(0)
+
+    def scroll(self, delta: int) -> None:
+        """Move the visible slice by ``delta`` rows."""
+        self.offset = max(0, min(self.offset + delta, self.total - self.rows))
+
+    def moveto(self, fraction: float) -> None:
+        """Scroll so the given fraction of the list is at the top (scrollbar drag)."""
+        self.offset = 0
+        self.scroll(int(round(float(fraction) * self.total)))
+
+    def move_cursor(self, delta: int) -> None:
+        """Move the selection by ``delta`` rows and scroll it into view."""
+        if not self.total:
+            self.cursor = 0
+            return
+        self.cursor = max(0, min(self.cursor + delta, self.total - 1))
+        if self.cursor < self.offset:
+            self.offset = self.cursor
+        elif self.cursor >= self.offset + self.rows:
+            self.offset = self.cursor - self.rows + 1
+
+    def select_row(self, row: int) -> None:
+        """Select the ``row``-th visible row."""
+        self.move_cursor(self.offset + row - self.cursor)
+
+    def visible(self) -> range:
+        """Indexes of the results on screen."""
+        return range(self.offset, min(self.total, self.offset + self.rows))
+
+    def fractions(self):
+        """(first, last) visible fractions, as a Tk scrollbar expects."""
+        if not self.total:
+            return 0.0, 1.0
+        return self.offset / self.total, min(1.0, (self.offset + self.rows) / self.total)
+
+
 class ModelSelector:
     def __init__(
         self,
         models: List[str],
         default_model: str,
         last_used_model: Optional[str],
-        on_select: Callable[[str], None]
+        on_select: Callable[[str], None],
+        usage: Optional[ModelUsage] = None,
+        status=None
     ):
         """Initialize model selector.
         
@@ -21,6 +89,10 @@ class ModelSelector:
             default_model: Default model name
             last_used_model: Last used model name (if any)
             on_select: Callback for model selection
+            usage: Pick history; models are ranked by it and picks are
+                recorded in it
+            status: BackgroundTask (e.g. the upload running meanwhile)
+                whose progress is shown below the list
         """
         if not models:
             raise ModelError("No models available")
@@ -30,6 +102,13 @@ class ModelSelector:
         self.last_used_model = last_used_model
         self.on_select = on_select
         self.selected_model = None
+        self.usage = usage
+        self.status = status
+        self.index = ModelIndex(models, usage)
+        self.results: List[str] = self.index.search('')
+        self.view = ListWindow()
+
+        import customtkinter as ctk
 
         # Create and configure the window
         self.window = ctk.CTk()
@@ -42,8 +121,35 @@ class ModelSelector:
 
         self._create_widgets()
 
+    @classmethod
+    def from_cache(
+        cls,
+        model_cache,
+        default_model: str,
+        last_used_model: Optional[str],
+        on_select: Callable[[str], None],
+        refresh: bool = False,
+        usage: Optional[ModelUsage] = None
+    ) -> 'ModelSelector':
+        """Create a selector listing the models held in a ModelCache.
+        
+        Args:
+            model_cache: ModelCache of the connected server
+            default_model: Default model name
+            last_used_model: Last used model name (if any)
+            on_select: Callback for model selection
+            refresh: Revalidate the cached list with the server first
+            usage: Pick history used to rank the list
+        """
+        models = [m.get('id') or m.get('name') for m in model_cache.get(refresh=refresh)]
+        return cls([m for m in models if m], default_model, last_used_model, on_select, usage=usage)
+
     def _create_widgets(self):
         """Create and arrange UI widgets."""
+        import tkinter as tk
+        from tkinter import ttk
+        import customtkinter as ctk
+
         # Frame for quick actions
         quick_frame = ctk.CTkFrame(self.window)
         quick_frame.pack(fill="x", padx=10, pady=5)
@@ -63,45 +169,60 @@ class ModelSelector:
         # Label for list
         label = ctk.CTkLabel(
             self.window,
-            text="Available Models:",
+            text=f"Available Models ({len(self.index.models)}):",
             font=("Helvetica", 14, "bold")
         )
         label.pack(pady=5)
 
+        # Type-ahead search; arrow keys move the selection in the list
+        self._query = ''
+        search = self.search = ctk.CTkEntry(self.window, placeholder_text="Search models...")
+        search.pack(fill="x", padx=10, pady=5)
+        search.bind('<KeyRelease>', lambda e: self._on_query())
+        search.bind('<Down>', lambda e: self._move(1))
+        search.bind('<Up>', lambda e: self._move(-1))
+        search.bind('<Next>', lambda e: self._move(self.view.rows))
+        search.bind('<Prior>', lambda e: self._move(-self.view.rows))
+        search.bind('<Return>', lambda e: self._select_cursor())
+        search.bind('<Escape>', lambda e: self.window.destroy())
+        search.focus_set()
+
         # Create frame for listbox and scrollbar
         list_frame = ctk.CTkFrame(self.window)
         list_frame.pack(fill="both", expand=True, padx=10, pady=5)
 
-        # Scrollbar
-        scrollbar = ctk.CTkScrollbar(list_frame)
-        scrollbar.pack(side="right", fill="y")
+        # Scrollbar, driven by the list window rather than the listbox
+        self.scrollbar = ctk.CTkScrollbar(list_frame, command=self._on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
 
-        # Listbox for models
+        # Listbox holding only the visible rows
         self.listbox = tk.Listbox(
             list_frame,
-            yscrollcommand=scrollbar.set,
             font=("Helvetica", 12),
             selectmode="single",
-            activestyle="none"
+            activestyle="none",
+            exportselection=False
         )
         self.listbox.pack(side="left", fill="both", expand=True)
 
-        # Configure scrollbar
-        scrollbar.configure(command=self.listbox.yview)
-
-        # Populate listbox
-        for model in self.models:
-            self.listbox.insert(tk.END, model)
+        # Start on the last used model if available
+        self.view.reset(len(self.results), self.index.position(self.last_used_model) or 0)
+        self._render()
 
-        # Highlight last used model if available
-        if self.last_used_model and self.last_used_model in self.models:
-            idx = self.models.index(self.last_used_model)
-            self.listbox.selection_set(idx)
-            self.listbox.see(idx)
-
-        # Bind double-click and return key
+        # Bind double-click, return key, wheel and resizing
         self.listbox.bind('<Double-Button-1>', self._on_double_click)
         self.listbox.bind('<Return>', self._on_double_click)
+        self.listbox.bind('<<ListboxSelect>>', self._on_click)
+        self.listbox.bind('<MouseWheel>', lambda e: self._wheel(-1 if e.delta > 0 else 1))
+        self.listbox.bind('<Button-4>', lambda e: self._wheel(-1))
+        self.listbox.bind('<Button-5>', lambda e: self._wheel(1))
+        self.listbox.bind('<Configure>', self._on_resize)
+
+        # Progress of the work running while the user chooses
+        if self.status is not None:
+            self.status_label = ctk.CTkLabel(self.window, text=self.status.describe(), anchor="w")
+            self.status_label.pack(fill="x", padx=10)
+            self.window.after(STATUS_POLL_MS, self._poll_status)
 
         # Cancel button
         cancel_btn = ctk.CTkButton(
@@ -111,16 +232,88 @@ class ModelSelector:
         )
         cancel_btn.pack(pady=10)
 
+    def _render(self):
+        """Put the visible slice of the results into the listbox."""
+        self.listbox.delete(0, 'end')
+        visible = self.view.visible()
+        for i in visible:
+            self.listbox.insert('end', self.results[i])
+        if self.view.cursor in visible:
+            row = self.view.cursor - self.view.offset
+            self.listbox.selection_set(row)
+            self.listbox.activate(row)
+        self.scrollbar.set(*self.view.fractions())
+
+    def _poll_status(self):
+        """Redraw the status line; runs on the Tk thread, never waits on the task."""
+        import tkinter as tk
+
+        try:
+            self.status_label.configure(text=self.status.describe())
+            if not self.status.done():
+                self.window.after(STATUS_POLL_MS, self._poll_status)
+        except tk.TclError:
+            pass  # The window was closed meanwhile
+
+    def _on_query(self):
+        """Filter the list as the user types."""
+        query = self.search.get()
+        if query == self._query:
+            return
+        self._query = query
+        self.results = self.index.search(query)
+        self.view.reset(len(self.results))
+        self._render()
+
+    def _move(self, delta: int) -> str:
+        self.view.move_cursor(delta)
+        self._render()
+        return "break"
+
+    def _wheel(self, steps: int) -> str:
+        self.view.scroll(steps * 3)
+        self._render()
+        return "break"
+
+    def _on_scroll(self, action, amount, unit=None):
+        """Scrollbar callback: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if action == 'moveto':
+            self.view.moveto(float(amount))
+        else:
+            self.view.scroll(int(amount) * (self.view.rows if unit == 'pages' else 1))
+        self._render()
+
+    def _on_resize(self, event):
+        """Fit the number of rendered rows to the listbox height."""
+        import tkinter.font as tkfont
+
+        line_height = tkfont.Font(font=self.listbox.cget('font')).metrics('linespace') + 1
+        rows = max(1, event.height // line_height)
+        if rows != self.view.rows:
+            self.view.resize(rows)
+            self._render()
+
+    def _on_click(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.view.select_row(selection[0])
+
+    def _select_cursor(self):
+        if self.results:
+            self._handle_selection(self.results[self.view.cursor])
+
     def _on_double_click(self, event):
         """Handle double-click or return key on listbox."""
         selection = self.listbox.curselection()
         if selection:
-            model = self.models[selection[0]]
-            self._handle_selection(model)
+            self.view.select_row(selection[0])
+            self._select_cursor()
 
     def _handle_selection(self, model: str):
         """Handle model selection."""
         self.selected_model = model
+        if self.usage:
+            self.usage.record(model)
         self.on_select(model)
         self.window.destroy()
 
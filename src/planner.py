@@ -0,0 +1,121 @@
+"""Context-fit planning: decide how a transcript is sent before uploading it."""
+
+import logging
+from typing import Dict, List, Optional, Any
+
+from .tokens import TokenEstimator
+
+DEFAULT_PLANNER_CONFIG: Dict[str, Any] = {
+    'enabled': True,
+    'default_context': 8192,
+    'reserve_tokens': 1024,
+    'allow_upgrade': True,
+    'context_windows': {},
+}
+
+SINGLE_SHOT = 'single'
+CHUNKED = 'chunked'
+
+
+def model_context_length(model: Dict[str, Any]) -> Optional[int]:
+    """Read a context window size from /api/models metadata, if the server reports one."""
+    candidates = [
+        model.get('context_length'),
+        model.get('context_window'),
+        model.get('max_context_length'),
+        ((model.get('info') or {}).get('params') or {}).get('num_ctx'),
+        ((model.get('ollama') or {}).get('details') or {}).get('context_length'),
+        ((model.get('top_provider') or {}).get('context_length')),
+    ]
+    for value in candidates:
+        try:
+            if value and int(value) > 0:
+                return int(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+class ContextPlanner:
+    """Choose single-shot or chunked processing from a local token estimate.
+
+    Context sizes come from ``planner.context_windows`` in config.yaml,
+    then from the model metadata returned by /api/models, then from
+    ``planner.default_context``. When a transcript does not fit the chosen
+    model, the planner switches to the smallest model the server lists that
+    does fit (if ``allow_upgrade``), or else plans chunked (map-reduce)
+    processing. Config entries for models the server does not list are
+    never chosen as upgrade targets.
+    """
+
+    def __init__(self, estimator: TokenEstimator, models: List[Dict[str, Any]], config: Optional[Dict[str, Any]] = None):
+        """Initialize planner.
+
+        Args:
+            estimator: Local token estimator
+            models: Model list as returned by OpenWebUIClient.list_models
+            config: Planner settings, see DEFAULT_PLANNER_CONFIG
+        """
+        self.estimator = estimator
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_PLANNER_CONFIG, **(config or {})}
+        self.overrides = {k: int(v) for k, v in (self.settings['context_windows'] or {}).items()}
+        # Upgrade targets: only models the server lists, with a known window
+        self.contexts: Dict[str, int] = {}
+        for model in models:
+            model_id = model.get('id') or model.get('name')
+            if not model_id:
+                continue
+            length = self.overrides.get(model_id) or model_context_length(model)
+            if length:
+                self.contexts[model_id] = length
+
+    def context_for(self, model: str) -> int:
+        """Context window of a model in tokens."""
+        if model in self.overrides:
+            return self.overrides[model]
+        return self.contexts.get(model, int(self.settings['default_context']))
+
+    def plan(self, file_path: str, model: str) -> Dict[str, Any]:
+        """Plan how to process a transcript with a model.
+
+        Args:
+            file_path: Path to transcript file
+            model: Requested model
+
+        Returns:
+            Plan with the model to use, ``strategy`` (single or chunked),
+            estimated ``tokens``, the model's ``context`` and any ``warning``
+        """
+        estimate = self.estimator.estimate_file(file_path)
+        tokens = estimate["tokens"]
+        reserve = int(self.settings['reserve_tokens'])
+        needed = tokens + reserve
+        context = self.context_for(model)
+        plan = {
+            "file": file_path,
+            "model": model,
+            "requested_model": model,
+            "tokens": tokens,
+            "chars_per_token": round(estimate["chars"] / tokens, 3) if tokens else None,
+            "context": context,
+            "strategy": SINGLE_SHOT,
+            "warning": None
+        }
+        if needed <= context:
+            return plan
+
+        if self.settings['allow_upgrade']:
+            fitting = sorted((ctx, name) for name, ctx in self.contexts.items() if ctx >= needed)
+            if fitting:
+                plan["context"], plan["model"] = fitting[0]
+                plan["warning"] = (
+                    f"~{tokens} tokens do not fit {model} ({context}); using {plan['model']} ({plan['context']})"
+                )
+                self.logger.warning(f"{file_path}: {plan['warning']}")
+                return plan
+
+        plan["strategy"] = CHUNKED
+        plan["warning"] = f"~{tokens} tokens do not fit {model} ({context}); processing in chunks"
+        self.logger.warning(f"{file_path}: {plan['warning']}")
+        return plan
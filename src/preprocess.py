@@ -0,0 +1,367 @@
+"""Streaming transcript preprocessing: cut tokens before a file is uploaded.
+
+A pipeline is a chain of normalizers. Each normalizer takes an iterator of
+lines (without line endings) and yields lines, so a transcript is cleaned in
+constant memory however large it is, and a normalizer that needs state (such
+as the last speaker seen) keeps it in generator locals::
+
+    @register_normalizer('music')
+    def drop_music(lines):
+        for line in lines:
+            if line.strip() != '[Music]':
+                yield line
+
+Pipelines are built by name from ``preprocess.normalizers`` in config.yaml.
+Cleaned copies are written to ``paths.data_dir/preprocessed``, keyed by the
+source's content hash and the pipeline, so an unchanged transcript is cleaned
+once and its upload keeps hitting the upload cache.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .tokens import FEATURES, TokenEstimator, count_features, iter_text_blocks
+from .utils.hashing import file_sha256
+
+Normalizer = Callable[[Iterator[str]], Iterator[str]]
+
+NORMALIZERS: Dict[str, Normalizer] = {}
+
+DEFAULT_PREPROCESS_CONFIG: Dict[str, Any] = {
+    'enabled': False,
+    'normalizers': ['timestamps', 'fillers', 'whitespace', 'duplicates', 'speakers'],
+    'processes': 1,
+}
+
+# Bump when a built-in normalizer changes, so cached outputs are rebuilt
+PIPELINE_VERSION = 1
+
+# Characters of text counted for the token estimate at a time
+TALLY_BLOCK = 64 * 1024
+
+
+def register_normalizer(name: str) -> Callable[[Normalizer], Normalizer]:
+    """Register a normalizer under a name usable in ``preprocess.normalizers``."""
+    def decorator(func: Normalizer) -> Normalizer:
+        NORMALIZERS[name] = func
+        return func
+    return decorator
+
+
+_TIME = r'\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d{1,3})?'
+_CUE_TIMING_RE = re.compile(rf'^\s*{_TIME}\s*-->\s*{_TIME}')
+_LEADING_TIME_RE = re.compile(rf'^\s*[\[(]?{_TIME}[\])]?\s*(?:-\s+)?')
+_LABEL_TIME_RE = re.compile(rf'^(?P<label>[^\s:][^:]{{0,40}}?)\s*[\[(]{_TIME}[\])]\s*:')
+_FILLER_RE = re.compile(
+    r"(?<![\w'-])(?:u+m+|u+h+m*|e+r+m+|h+m+|m+-?h+m+|uh-huh)(?![\w'-])[,.!?]?\s*",
+    re.IGNORECASE
+)
+_SPEAKER_RE = re.compile(r"^(?P<label>[A-Z][\w .'-]{0,40}?):\s+(?P<text>\S.*)$")
+_BARE_LABEL_RE = re.compile(r"^\s*[A-Z][\w .'-]{0,40}?:\s*$")
+
+
+@register_normalizer('timestamps')
+def strip_timestamps(lines: Iterator[str]) -> Iterator[str]:
+    """Drop SRT/VTT cue timings and indices, and timestamps before or after speaker labels."""
+    index = None  # A bare number held back until we know it is not a cue index
+    for line in lines:
+        if _CUE_TIMING_RE.match(line):
+            index = None
+            continue
+        if index is not None:
+            yield index
+            index = None
+        stripped = line.strip()
+        if stripped.isdigit():
+            index = line
+            continue
+        if stripped == 'WEBVTT':
+            continue
+        if ':' in line:
+            line = _LEADING_TIME_RE.sub('', line, count=1)
+            line = _LABEL_TIME_RE.sub(r'\g<label>:', line, count=1)
+        yield line
+    if index is not None:
+        yield index
+
+
+@register_normalizer('fillers')
+def strip_fillers(lines: Iterator[str]) -> Iterator[str]:
+    """Remove filler words (um, uh, erm, hmm, mm-hmm); turns left empty are dropped."""
+    for line in lines:
+        cleaned = _FILLER_RE.sub('', line)
+        if cleaned == line or (cleaned.strip() and not _BARE_LABEL_RE.match(cleaned)):
+            yield cleaned
+
+
+@register_normalizer('whitespace')
+def collapse_whitespace(lines: Iterator[str]) -> Iterator[str]:
+    """Collapse runs of spaces and tabs and drop blank lines."""
+    for line in lines:
+        words = line.split()
+        if words:
+            yield ' '.join(words)
+
+
+@register_normalizer('duplicates')
+def drop_duplicates(lines: Iterator[str]) -> Iterator[str]:
+    """Drop lines repeating the line before them (rolling captions, copy-paste)."""
+    previous = None
+    for line in lines:
+        if line != previous:
+            yield line
+        previous = line
+
+
+@register_normalizer('speakers')
+def collapse_speaker_labels(lines: Iterator[str]) -> Iterator[str]:
+    """Drop a speaker label repeated on consecutive turns.
+
+    Continuation lines follow the speaker's first labelled line, so the
+    transcript still reads unambiguously without buffering whole turns.
+    """
+    current = None
+    for line in lines:
+        match = _SPEAKER_RE.match(line)
+        if match:
+            if match.group('label') == current:
+                yield match.group('text')
+                continue
+            current = match.group('label')
+        yield line
+
+
+def iter_lines(file_path: str) -> Iterator[str]:
+    """Read a UTF-8 text file line by line, without line endings."""
+    with open(file_path, 'r', encoding='utf-8', errors='replace', newline=None) as f:
+        for line in f:
+            yield line.rstrip('\n')
+
+
+class _Tally:
+    """Running token features of text seen in pieces, counted in blocks."""
+
+    def __init__(self):
+        self.counts = dict.fromkeys(FEATURES, 0)
+        self._buffer: List[str] = []
+        self._size = 0
+
+    def add(self, text: str) -> None:
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= TALLY_BLOCK:
+            self.flush()
+
+    def flush(self) -> Dict[str, int]:
+        if self._buffer:
+            for name, value in count_features(''.join(self._buffer)).items():
+                self.counts[name] += value
+            self._buffer = []
+            self._size = 0
+        return self.counts
+
+
+class Preprocessor:
+    """Clean transcripts with a normalizer pipeline and report what it saved."""
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        output_dir: Optional[str] = None,
+        estimator: Optional[TokenEstimator] = None
+    ):
+        """Initialize preprocessor.
+
+        Args:
+            config: Preprocess settings, see DEFAULT_PREPROCESS_CONFIG
+            output_dir: Folder for cleaned copies; a temporary folder if omitted
+            estimator: Token estimator for the savings report
+
+        Raises:
+            ValueError: If a configured normalizer is not registered
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_PREPROCESS_CONFIG, **(config or {})}
+        self.names = list(self.settings['normalizers'] or [])
+        unknown = [name for name in self.names if name not in NORMALIZERS]
+        if unknown:
+            raise ValueError(f"Unknown normalizers: {', '.join(unknown)} (known: {', '.join(sorted(NORMALIZERS))})")
+        self.processes = max(1, int(self.settings.get('processes') or os.cpu_count() or 1))
+        self.output_dir = output_dir or tempfile.mkdtemp(prefix='openwebui-preprocess-')
+        self.estimator = estimator or TokenEstimator()
+        self.key = hashlib.sha1(f"{PIPELINE_VERSION}:{','.join(self.names)}".encode()).hexdigest()[:8]
+
+    @classmethod
+    def from_config(cls, config) -> 'Preprocessor':
+        """Create a preprocessor writing to paths.data_dir/preprocessed."""
+        return cls(
+            config.get_preprocess_config(),
+            os.path.join(config.get_data_dir(), 'preprocessed'),
+            TokenEstimator.from_config(config)
+        )
+
+    def close(self) -> None:
+        """Close the estimator's cache."""
+        self.estimator.close()
+
+    def clean(self, lines: Iterable[str]) -> Iterator[str]:
+        """Run lines through the pipeline lazily."""
+        stream = iter(lines)
+        for name in self.names:
+            stream = NORMALIZERS[name](stream)
+        return stream
+
+    def clean_text(self, text: str) -> str:
+        """Run a string through the pipeline."""
+        return ''.join(f"{line}\n" for line in self.clean(text.splitlines()))
+
+    def output_path(self, file_path: str, digest: str) -> str:
+        """Where the cleaned copy of a file with this content is stored.
+
+        The original file name is kept, so the server shows the same name.
+        """
+        return os.path.join(self.output_dir, f"{digest[:16]}-{self.key}", os.path.basename(file_path))
+
+    def process(self, file_path: str) -> Dict[str, Any]:
+        """Write a cleaned copy of a transcript, reusing an earlier one if the content is unchanged.
+
+        Args:
+            file_path: Transcript to clean
+
+        Returns:
+            Report with the cleaned ``output`` path, ``bytes_in``/``bytes_out``/
+            ``bytes_saved``, estimated ``tokens_in``/``tokens_out``/``tokens_saved``
+            and whether the copy was ``cached``
+        """
+        start = time.perf_counter()
+        output = self.output_path(file_path, file_sha256(file_path))
+        report_path = f"{output}.json"
+        if os.path.exists(output) and os.path.exists(report_path):
+            try:
+                with open(report_path, 'r') as f:
+                    report = json.load(f)
+                return {**report, "file": file_path, "output": output, "cached": True}
+            except (OSError, ValueError):
+                pass
+
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        cleaned = _Tally()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for line in self.clean(iter_lines(file_path)):
+                    f.write(line + '\n')
+                    cleaned.add(line + '\n')
+            os.replace(tmp_path, output)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        bytes_in = os.path.getsize(file_path)
+        bytes_out = os.path.getsize(output)
+        source = _Tally()
+        for block in iter_text_blocks(file_path, TALLY_BLOCK):
+            source.add(block)
+        tokens_in = self.estimator.estimate_counts(source.flush())
+        tokens_out = self.estimator.estimate_counts(cleaned.flush())
+        report = {
+            "normalizers": self.names,
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "bytes_saved": bytes_in - bytes_out,
+            "tokens_in": tokens_in,
+            "tokens_out": tokens_out,
+            "tokens_saved": tokens_in - tokens_out,
+            "saved_pct": round(100.0 * (tokens_in - tokens_out) / tokens_in, 1) if tokens_in else 0.0,
+        }
+        with open(report_path, 'w') as f:
+            json.dump(report, f)
+        self.logger.info(
+            f"Preprocessed {file_path}: {bytes_in} -> {bytes_out} bytes, "
+            f"~{tokens_in} -> ~{tokens_out} tokens ({report['saved_pct']}% saved)"
+        )
+        return {
+            **report,
+            "file": file_path,
+            "output": output,
+            "cached": False,
+            "elapsed_s": round(time.perf_counter() - start, 3)
+        }
+
+    def _try_process(self, file_path: str) -> Dict[str, Any]:
+        try:
+            return self.process(file_path)
+        except Exception as e:
+            self.logger.error(f"Failed to preprocess {file_path}: {str(e)}")
+            return {"file": file_path, "output": None, "error": str(e)}
+
+    def process_many(self, file_paths: List[str], processes: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Clean many transcripts, in a process pool when more than one process is configured.
+
+        Normalizers run in the workers by name, so normalizers registered at
+        runtime are only available there when processes are forked (the
+        default on Linux).
+
+        Args:
+            file_paths: Transcripts to clean
+            processes: Worker processes, defaults to preprocess.processes
+
+        Returns:
+            One report per file, in order; failed files have ``error`` set
+        """
+        processes = max(1, int(processes or self.processes))
+        if processes == 1 or len(file_paths) < 2:
+            return [self._try_process(path) for path in file_paths]
+
+        initargs = (self.settings, self.output_dir, self.estimator.coefficients)
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=initargs) as pool:
+            chunksize = max(1, len(file_paths) // (processes * 4))
+            return list(pool.map(_process_in_worker, file_paths, chunksize=chunksize))
+
+
+def summarize_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totals over per-file reports, for batch summaries."""
+    done = [r for r in reports if not r.get("error")]
+    totals = {key: sum(r[key] for r in done) for key in ("bytes_in", "bytes_out", "bytes_saved", "tokens_in", "tokens_out", "tokens_saved")}
+    totals["files"] = len(done)
+    totals["cached"] = sum(1 for r in done if r.get("cached"))
+    totals["saved_pct"] = round(100.0 * totals["tokens_saved"] / totals["tokens_in"], 1) if totals["tokens_in"] else 0.0
+    return totals
+
+
+_worker: Optional[Preprocessor] = None
+
+
+def _init_worker(settings: Dict[str, Any], output_dir: str, coefficients: Dict[str, float]) -> None:
+    global _worker
+    _worker = Preprocessor(settings, output_dir, TokenEstimator(coefficients))
+
+
+def _process_in_worker(file_path: str) -> Dict[str, Any]:
+    return _worker._try_process(file_path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Clean transcripts and report the bytes and tokens saved.")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--processes', type=int, help="Worker processes (default: preprocess.processes)")
+    args = parser.parse_args(argv)
+
+    from .utils.config import Config
+    preprocessor = Preprocessor.from_config(Config())
+    reports = preprocessor.process_many(args.files, args.processes)
+    preprocessor.close()
+    print(json.dumps({"files": reports, "total": summarize_reports(reports)}, indent=2))
+    return 0 if all(not r.get("error") for r in reports) else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,289 @@
+"""Adaptive concurrency and rate limits for requests to OpenWebUI.
+
+Requests are grouped by server and endpoint class (``files``,
+``completions``, ``other``). Each group has
+
+* a concurrency limit adjusted by AIMD: every ``limit`` successful requests
+  (roughly one round trip of the whole window) raise it by ``increase``; a
+  429, a 503 with Retry-After, or a response slower than
+  ``latency_tolerance`` times the usual latency multiplies it by
+  ``backoff``. Only one decrease is applied per window, so a burst of
+  rejections from requests that were already in flight does not collapse
+  the limit to its minimum. Latency is not used for ``files``: the time to
+  an upload's response includes sending its body, so it follows the file
+  size rather than the server's load;
+* a token bucket of ``rates[class]`` requests per second (unlimited by
+  default) that is paused for the time a server asks for in Retry-After.
+
+The limits in force are reported to the metrics registry, so convergence
+can be followed in metrics.json and metrics.prom.
+"""
+
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+FILES = 'files'
+COMPLETIONS = 'completions'
+OTHER = 'other'
+
+# Statuses that mean "slow down" rather than "broken"
+THROTTLE_STATUSES = frozenset([429, 503])
+
+# Classes whose response time grows with the request body, not with load
+LATENCY_BLIND_CLASSES = frozenset([FILES])
+
+DEFAULT_LIMITS_CONFIG: Dict[str, Any] = {
+    'enabled': True,
+    'initial': 4,
+    'min': 1,
+    'max': 64,
+    'increase': 1.0,
+    'backoff': 0.5,
+    'latency_tolerance': 3.0,
+    'rates': {},
+    'max_throttle_retries': 5,
+    'default_retry_after': 1.0,
+    'max_retry_after': 60.0,
+}
+
+
+def endpoint_class(path: str) -> str:
+    """Group an API path is limited in."""
+    if path.startswith('/api/files'):
+        return FILES
+    if path.startswith('/api/chat/completions'):
+        return COMPLETIONS
+    return OTHER
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class TokenBucket:
+    """Requests-per-second limit with bursts, pausable for Retry-After."""
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        """Initialize token bucket.
+
+        Args:
+            rate: Requests per second; None or 0 for no limit
+            burst: Requests that may go out at once, defaults to max(1, rate)
+        """
+        self.rate = float(rate) if rate else None
+        self.capacity = float(burst) if burst else max(1.0, self.rate or 1.0)
+        self.tokens = self.capacity
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Let nothing through for ``seconds`` (from a Retry-After header)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def acquire(self) -> float:
+        """Wait for a token.
+
+        Returns:
+            Seconds waited
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = self.paused_until - now
+                if delay <= 0 and self.rate:
+                    self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return waited
+                    delay = (1 - self.tokens) / self.rate
+                elif delay <= 0:
+                    return waited
+            time.sleep(delay)
+            waited += delay
+
+
+class AIMDLimiter:
+    """Concurrency limit with additive increase and multiplicative decrease."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize limiter.
+
+        Args:
+            config: Limit settings, see DEFAULT_LIMITS_CONFIG
+        """
+        self.settings = {**DEFAULT_LIMITS_CONFIG, **(config or {})}
+        self.min = max(1.0, float(self.settings['min']))
+        self.max = max(self.min, float(self.settings['max']))
+        self.limit = min(self.max, max(self.min, float(self.settings['initial'])))
+        self.increase = float(self.settings['increase'])
+        self.backoff = float(self.settings['backoff'])
+        self.tolerance = float(self.settings['latency_tolerance'] or 0)
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> float:
+        """Wait until fewer than ``limit`` requests are in flight.
+
+        Returns:
+            Start time of the request, to pass to ``update``
+        """
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        return time.monotonic()
+
+    def release(self) -> None:
+        """Count a request as no longer in flight."""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def update(self, started: float, latency: Optional[float], overloaded: bool) -> bool:
+        """Adjust the limit for a finished request.
+
+        Args:
+            started: Value returned by ``acquire``
+            latency: Seconds until the response; None if there was none
+            overloaded: The server asked to slow down
+
+        Returns:
+            True if the limit was lowered
+        """
+        with self._cond:
+            if not overloaded and latency is not None:
+                if self.tolerance and self.baseline and latency > self.tolerance * self.baseline:
+                    overloaded = True
+                # The baseline follows the usual latency slowly, so queueing shows up against it
+                self.baseline = latency if self.baseline is None else 0.9 * self.baseline + 0.1 * latency
+            if overloaded:
+                # Requests sent before the last decrease say nothing about the new limit
+                if started < self._last_decrease:
+                    return False
+                self.limit = max(self.min, self.limit * self.backoff)
+                self._last_decrease = time.monotonic()
+                return True
+            if latency is not None:
+                self.limit = min(self.max, self.limit + self.increase / self.limit)
+                self._cond.notify_all()
+            return False
+
+
+class Slot:
+    """A request admitted by a RequestLimiter."""
+
+    def __init__(self, limiter: 'RequestLimiter', key: Tuple[str, str], started: float):
+        self.limiter = limiter
+        self.key = key
+        self.started = started
+        self._released = False
+
+    def done(self, latency: Optional[float], status: Optional[int] = None, retry_after: Optional[str] = None) -> bool:
+        """Report the outcome of the request.
+
+        Args:
+            latency: Seconds until the response headers, None on a connection error
+            status: Response status
+            retry_after: Retry-After header of the response
+
+        Returns:
+            True if the server throttled the request and it should be sent again
+        """
+        return self.limiter._done(self, latency, status, retry_after)
+
+    def release(self) -> None:
+        """Free the concurrency slot (once the response body has been read)."""
+        if not self._released:
+            self._released = True
+            self.limiter._groups[self.key][0].release()
+
+
+class RequestLimiter:
+    """AIMD concurrency limits and token buckets per server and endpoint class."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, metrics=None):
+        """Initialize request limiter.
+
+        Args:
+            config: Limit settings, see DEFAULT_LIMITS_CONFIG
+            metrics: MetricsRegistry receiving the chosen limits
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_LIMITS_CONFIG, **(config or {})}
+        self.rates = dict(self.settings['rates'] or {})
+        self.max_retries = int(self.settings['max_throttle_retries'])
+        self.metrics = metrics
+        self._groups: Dict[Tuple[str, str], Tuple[AIMDLimiter, TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    def _group(self, key: Tuple[str, str]) -> Tuple[AIMDLimiter, TokenBucket]:
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                settings = {**self.settings, 'latency_tolerance': 0} if key[1] in LATENCY_BLIND_CLASSES else self.settings
+                group = self._groups[key] = (AIMDLimiter(settings), TokenBucket(self.rates.get(key[1])))
+                self._report(key, group[0])
+            return group
+
+    def _report(self, key: Tuple[str, str], limiter: AIMDLimiter, throttled: bool = False) -> None:
+        if self.metrics is not None:
+            self.metrics.observe_limit(key[0], key[1], limiter.limit, throttled=throttled)
+
+    def acquire(self, server: str, path: str) -> Slot:
+        """Wait until a request to ``path`` on ``server`` may be sent.
+
+        Returns:
+            Slot to report the outcome to and release
+        """
+        key = (server, endpoint_class(path))
+        limiter, bucket = self._group(key)
+        bucket.acquire()
+        return Slot(self, key, limiter.acquire())
+
+    def _done(self, slot: Slot, latency: Optional[float], status: Optional[int], retry_after: Optional[str]) -> bool:
+        limiter, bucket = self._groups[slot.key]
+        delay = parse_retry_after(retry_after)
+        throttled = status == 429 or (status in THROTTLE_STATUSES and delay is not None)
+        before = limiter.limit
+        lowered = limiter.update(slot.started, latency, throttled)
+        if throttled:
+            delay = min(float(self.settings['max_retry_after']),
+                        delay if delay is not None else float(self.settings['default_retry_after']))
+            bucket.pause(delay)
+        if lowered:
+            self.logger.info(
+                f"{slot.key[0]} {slot.key[1]}: concurrency limit {before:.1f} -> {limiter.limit:.1f}"
+                + (f", pausing {delay:.1f}s" if throttled else "")
+            )
+        if lowered or throttled or int(limiter.limit) != int(before):
+            self._report(slot.key, limiter, throttled)
+        return throttled
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Current limit and requests in flight per ``server class``."""
+        with self._lock:
+            groups = dict(self._groups)
+        return {
+            f"{server} {cls}": {"limit": round(limiter.limit, 2), "in_flight": limiter.in_flight}
+            for (server, cls), (limiter, _) in sorted(groups.items())
+        }
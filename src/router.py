@@ -0,0 +1,202 @@
+"""Spread requests over several OpenWebUI servers and fail over between them.
+
+``webui.url`` may list more than one server. Each request goes to the
+healthy server with the lowest load score, ``(outstanding + 1) * latency``,
+where latency is an exponentially weighted moving average (EWMA) of recent
+response times. A server that refuses connections, times out or answers 5xx
+is taken out of rotation until a background health check (``GET
+/api/models`` every ``health_interval`` seconds) succeeds again, or for
+``cooldown`` seconds when health checks are off.
+
+Uploaded files only exist on the server that received them, so work that
+spans requests (upload, then chat) is pinned to one server; see
+OpenWebUIClient.pinned.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+DEFAULT_ROUTING_CONFIG: Dict[str, Any] = {
+    'health_interval': 30.0,
+    'health_timeout': 5.0,
+    'ewma_alpha': 0.3,
+    'cooldown': 30.0,
+}
+
+# Probe returning the response time in seconds, raising if the server is unusable
+HealthProbe = Callable[[str], float]
+
+
+class Endpoint:
+    """Load and health of one server."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+        self.healthy = True
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+        self.down_since: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+
+    def score(self) -> float:
+        return (self.outstanding + 1) * (self.latency or 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class EndpointRouter:
+    """Choose a server per request by health, outstanding requests and EWMA latency."""
+
+    def __init__(self, urls: List[str], config: Optional[Dict[str, Any]] = None, probe: Optional[HealthProbe] = None):
+        """Initialize router.
+
+        Args:
+            urls: Server base URLs, in order of preference
+            config: Routing settings, see DEFAULT_ROUTING_CONFIG
+            probe: Health check called with a server URL; without one
+                servers only come back after ``cooldown``
+        """
+        if not urls:
+            raise ValueError("At least one server URL is required")
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_ROUTING_CONFIG, **(config or {})}
+        self.endpoints = [Endpoint(url) for url in dict.fromkeys(u.rstrip('/') for u in urls)]
+        self.alpha = float(self.settings['ewma_alpha'])
+        self.cooldown = float(self.settings['cooldown'])
+        self.health_interval = float(self.settings['health_interval'])
+        self.probe = probe
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._checker: Optional[threading.Thread] = None
+
+    @property
+    def urls(self) -> List[str]:
+        return [e.url for e in self.endpoints]
+
+    def endpoint(self, url: str) -> Endpoint:
+        """Endpoint of a server URL; unknown URLs are added (e.g. from an older job)."""
+        url = url.rstrip('/')
+        with self._lock:
+            for endpoint in self.endpoints:
+                if endpoint.url == url:
+                    return endpoint
+            endpoint = Endpoint(url)
+            self.endpoints.append(endpoint)
+            return endpoint
+
+    def _usable(self, endpoint: Endpoint, now: float) -> bool:
+        return endpoint.healthy or now - (endpoint.down_since or 0.0) >= self.cooldown
+
+    def pick(self, exclude: Iterable[str] = ()) -> Optional[Endpoint]:
+        """Server for the next request.
+
+        Args:
+            exclude: URLs already tried for this request
+
+        Returns:
+            The least loaded healthy server; when none is healthy, the one
+            that failed longest ago; None when every server was excluded
+        """
+        self._start_checker()
+        excluded = set(exclude)
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.url not in excluded]
+            if not candidates:
+                return None
+            usable = [e for e in candidates if self._usable(e, now)]
+            if usable:
+                return min(usable, key=lambda e: (e.score(), e.outstanding))
+            return min(candidates, key=lambda e: e.down_since or 0.0)
+
+    def has_alternative(self, exclude: Iterable[str]) -> bool:
+        """Whether a server outside ``exclude`` is worth trying."""
+        excluded = set(exclude)
+        now = time.monotonic()
+        with self._lock:
+            return any(e.url not in excluded and self._usable(e, now) for e in self.endpoints)
+
+    def is_healthy(self, url: str) -> bool:
+        return self.endpoint(url).healthy
+
+    def acquire(self, endpoint: Endpoint) -> None:
+        """Count a request starting on ``endpoint``."""
+        with self._lock:
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+
+    def release(self, endpoint: Endpoint) -> None:
+        """Count a request on ``endpoint`` as finished."""
+        with self._lock:
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+
+    def observe(self, endpoint: Endpoint, latency: Optional[float], ok: bool) -> None:
+        """Record the outcome of a request or health check.
+
+        Args:
+            endpoint: Server that answered (or did not)
+            latency: Seconds until the response, None if there was none
+            ok: False for connection errors, timeouts and 5xx answers
+        """
+        with self._lock:
+            if latency is not None:
+                endpoint.latency = latency if endpoint.latency is None else (
+                    self.alpha * latency + (1 - self.alpha) * endpoint.latency
+                )
+            was_healthy = endpoint.healthy
+            endpoint.healthy = ok
+            if ok:
+                endpoint.down_since = None
+            else:
+                endpoint.failures += 1
+                endpoint.down_since = time.monotonic()
+        if was_healthy and not ok:
+            self.logger.warning(f"Server {endpoint.url} is unavailable; routing around it")
+        elif ok and not was_healthy:
+            self.logger.info(f"Server {endpoint.url} is back")
+
+    def check(self) -> None:
+        """Probe every server once."""
+        for endpoint in list(self.endpoints):
+            try:
+                latency = self.probe(endpoint.url)
+            except Exception as e:
+                self.logger.debug(f"Health check of {endpoint.url} failed: {str(e)}")
+                self.observe(endpoint, None, ok=False)
+            else:
+                self.observe(endpoint, latency, ok=True)
+
+    def _start_checker(self) -> None:
+        # One server has nothing to fail over to, so it is not probed
+        if self._checker or not self.probe or self.health_interval <= 0 or len(self.endpoints) < 2:
+            return
+        with self._lock:
+            if self._checker:
+                return
+            self._checker = threading.Thread(target=self._check_loop, name="health-check", daemon=True)
+        self._checker.start()
+
+    def _check_loop(self) -> None:
+        while not self._stop.wait(self.health_interval):
+            self.check()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Health, load and latency per server."""
+        with self._lock:
+            return {e.url: e.snapshot() for e in self.endpoints}
+
+    def close(self) -> None:
+        """Stop the health checks."""
+        self._stop.set()
+        if self._checker:
+            self._checker.join(timeout=1.0)
@@ -0,0 +1,215 @@
+"""Constant-memory multipart uploads with progress reporting and retries."""
+
+import logging
+import os
+import sys
+import time
+import uuid
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Any
+
+import requests
+
+from .utils.error_handler import FileAccessError
+
+ProgressCallback = Callable[[int, int], None]
+
+DEFAULT_UPLOAD_CONFIG: Dict[str, Any] = {
+    'chunk_size_kb': 1024,
+    'max_attempts': 3,
+    'backoff_factor': 1.0,
+    'progress': 'auto',
+    'parallel': 4,
+}
+
+
+class FileChangedError(FileAccessError):
+    """Raised when a file's content changes between upload attempts."""
+    pass
+
+
+class MultipartFileStream:
+    """Iterable ``multipart/form-data`` body that reads the file chunk by chunk.
+
+    The body length is known up front, so it is sent with a Content-Length
+    header instead of chunked transfer encoding. Only one chunk is held in
+    memory at a time. A CRC32 is recorded for every chunk; when
+    ``expected_checksums`` from an earlier attempt is given, a mismatching
+    chunk aborts the upload with ``FileChangedError``.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        field_name: str = 'file',
+        content_type: str = 'text/plain',
+        chunk_size: int = 1024 * 1024,
+        progress: Optional[ProgressCallback] = None,
+        expected_checksums: Optional[List[int]] = None
+    ):
+        """Initialize multipart stream.
+
+        Args:
+            file_path: Path to the file to send
+            field_name: Form field name of the file part
+            content_type: Content type of the file part
+            chunk_size: Bytes read from disk per chunk
+            progress: Called with (bytes_sent, total_bytes) after every chunk
+            expected_checksums: Chunk CRC32s from a previous attempt
+        """
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.expected_checksums = expected_checksums
+        self.chunk_checksums: List[int] = []
+        self.bytes_sent = 0
+
+        self.boundary = uuid.uuid4().hex
+        file_name = os.path.basename(file_path).replace('"', '%22')
+        self.preamble = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{file_name}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode('utf-8')
+        self.epilogue = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+        self.file_size = os.path.getsize(file_path)
+
+    @property
+    def content_type(self) -> str:
+        """Content-Type header for the request."""
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self) -> int:
+        return len(self.preamble) + self.file_size + len(self.epilogue)
+
+    def _sent(self, size: int) -> None:
+        self.bytes_sent += size
+        if self.progress:
+            self.progress(self.bytes_sent, len(self))
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.chunk_checksums = []
+        self.bytes_sent = 0
+
+        yield self.preamble
+        self._sent(len(self.preamble))
+
+        remaining = self.file_size
+        with open(self.file_path, 'rb') as f:
+            while remaining > 0:
+                chunk = f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    raise FileChangedError(f"File shrank during upload: {self.file_path}")
+                checksum = zlib.crc32(chunk)
+                index = len(self.chunk_checksums)
+                if self.expected_checksums is not None and index < len(self.expected_checksums) \
+                        and self.expected_checksums[index] != checksum:
+                    raise FileChangedError(f"File changed between upload attempts at chunk {index}: {self.file_path}")
+                self.chunk_checksums.append(checksum)
+                remaining -= len(chunk)
+                yield chunk
+                self._sent(len(chunk))
+
+        yield self.epilogue
+        self._sent(len(self.epilogue))
+
+
+class ProgressBar:
+    """Single-line upload progress bar written to stderr."""
+
+    def __init__(self, label: str, width: int = 30, stream=None):
+        self.label = label
+        self.width = width
+        self.stream = stream or sys.stderr
+        self.start = time.perf_counter()
+        self._last_draw = 0.0
+
+    def __call__(self, sent: int, total: int) -> None:
+        now = time.perf_counter()
+        if sent < total and now - self._last_draw < 0.1:
+            return
+        self._last_draw = now
+        fraction = sent / total if total else 1.0
+        filled = int(self.width * fraction)
+        rate = sent / max(now - self.start, 1e-6) / (1024 * 1024)
+        self.stream.write(
+            f"\r{self.label} [{'#' * filled}{' ' * (self.width - filled)}] "
+            f"{fraction:6.1%} {sent / (1024 * 1024):.1f}/{total / (1024 * 1024):.1f} MB {rate:.1f} MB/s"
+        )
+        if sent >= total:
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+class StreamingUploader:
+    """Send files to ``/api/files/`` as streamed multipart bodies.
+
+    ``/api/files/`` has no ranged or resumable upload endpoint, so a failed
+    attempt is restarted from the beginning after an exponential backoff.
+    The chunk checksums of the failed attempt are carried over to check that
+    the file did not change in between; a changed file is not retried.
+    """
+
+    def __init__(self, transport, config: Optional[Dict[str, Any]] = None):
+        """Initialize uploader.
+
+        Args:
+            transport: HTTPTransport used to send the request
+            config: Upload settings, see DEFAULT_UPLOAD_CONFIG
+        """
+        self.transport = transport
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_UPLOAD_CONFIG, **(config or {})}
+
+    def _progress_for(self, file_path: str, progress: Optional[ProgressCallback]) -> Optional[ProgressCallback]:
+        if progress is not None:
+            return progress
+        mode = self.settings['progress']
+        if mode is True or (mode == 'auto' and sys.stderr.isatty()):
+            return ProgressBar(os.path.basename(file_path))
+        return None
+
+    def upload(self, url: str, headers: Dict[str, str], file_path: str, progress: Optional[ProgressCallback] = None):
+        """Upload a file, retrying failed attempts.
+
+        Args:
+            url: Upload endpoint URL
+            headers: Request headers (auth); Content-Type is set here
+            file_path: Path to the file to upload
+            progress: Called with (bytes_sent, total_bytes); defaults to a
+                progress bar when stderr is a terminal
+
+        Returns:
+            The response of the last attempt
+        """
+        max_attempts = max(1, int(self.settings['max_attempts']))
+        backoff = float(self.settings['backoff_factor'])
+        chunk_size = int(self.settings['chunk_size_kb']) * 1024
+        progress = self._progress_for(file_path, progress)
+        expected_checksums = None
+
+        for attempt in range(1, max_attempts + 1):
+            stream = MultipartFileStream(
+                file_path,
+                chunk_size=chunk_size,
+                progress=progress,
+                expected_checksums=expected_checksums
+            )
+            request_headers = {**headers, 'Content-Type': stream.content_type}
+            try:
+                response = self.transport.post(url, headers=request_headers, data=stream)
+                if response.status_code < 500 or attempt == max_attempts:
+                    return response
+                error = f"HTTP {response.status_code}"
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == max_attempts:
+                    raise
+                error = str(e)
+
+            expected_checksums = stream.chunk_checksums
+            delay = backoff * (2 ** (attempt - 1))
+            self.logger.warning(
+                f"Upload attempt {attempt}/{max_attempts} of {file_path} failed after "
+                f"{stream.bytes_sent} bytes ({error}); retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
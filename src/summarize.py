@@ -0,0 +1,180 @@
+"""Map-reduce summarization of transcripts longer than a model's context."""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any
+
+DEFAULT_SUMMARIZE_CONFIG: Dict[str, Any] = {
+    'chunk_tokens': 3000,
+    'overlap_tokens': 200,
+    'parallelism': 4,
+    'fan_in': 4,
+    'chars_per_token': 4.0,
+    'map_prompt': (
+        "This is part {index} of {total} of a meeting transcript. Summarize it: "
+        "topics discussed, decisions, action items and owners.\n\n{text}"
+    ),
+    'reduce_prompt': (
+        "These are summaries of consecutive parts of one meeting. Merge them into "
+        "a single summary without repeating points: topics, decisions, action "
+        "items and owners.\n\n{text}"
+    ),
+}
+
+
+def chunk_text(text: str, max_chars: int, overlap_chars: int = 0) -> List[str]:
+    """Split text into chunks of at most ``max_chars`` on line boundaries.
+
+    Each chunk after the first starts with the trailing lines of the previous
+    chunk, up to ``overlap_chars``, so a statement cut at a boundary is seen
+    whole by at least one chunk. Lines longer than ``max_chars`` are split.
+
+    Args:
+        text: Text to split
+        max_chars: Maximum characters per chunk
+        overlap_chars: Characters repeated from the end of the previous chunk
+
+    Returns:
+        List of chunks
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+    overlap_chars = max(0, min(overlap_chars, max_chars // 2))
+
+    lines: List[str] = []
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            lines.append(line[:max_chars])
+            line = line[max_chars:]
+        lines.append(line)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    new_lines = 0
+    for line in lines:
+        if size + len(line) > max_chars and new_lines:
+            chunks.append(''.join(current))
+            # Carry the tail of this chunk into the next one
+            carried: List[str] = []
+            carried_size = 0
+            for previous in reversed(current):
+                if carried_size + len(previous) > overlap_chars or carried_size + len(previous) + len(line) > max_chars:
+                    break
+                carried.insert(0, previous)
+                carried_size += len(previous)
+            current, size, new_lines = carried, carried_size, 0
+        current.append(line)
+        size += len(line)
+        new_lines += 1
+    if new_lines:
+        chunks.append(''.join(current))
+    return chunks
+
+
+class MapReduceSummarizer:
+    """Summarize a long transcript with concurrent completion calls.
+
+    The transcript is split into overlapping chunks that fit the model's
+    context; every chunk is summarized in parallel ("map"). The partial
+    summaries are then merged ``fan_in`` at a time, level by level, until a
+    single summary is left ("reduce").
+    """
+
+    def __init__(self, client, model: str, config: Optional[Dict[str, Any]] = None):
+        """Initialize summarizer.
+
+        Args:
+            client: OpenWebUIClient used for the completion calls
+            model: Model to use
+            config: Settings, see DEFAULT_SUMMARIZE_CONFIG
+        """
+        self.client = client
+        self.model = model
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_SUMMARIZE_CONFIG, **(config or {})}
+
+    def split(self, text: str) -> List[str]:
+        """Split text into context-sized chunks using the configured sizes."""
+        chars_per_token = float(self.settings['chars_per_token'])
+        return chunk_text(
+            text,
+            int(int(self.settings['chunk_tokens']) * chars_per_token),
+            int(int(self.settings['overlap_tokens']) * chars_per_token)
+        )
+
+    def _complete(self, prompt: str) -> str:
+        return self.client.complete(self.model, [{"role": "user", "content": prompt}])
+
+    def summarize_text(self, text: str) -> Dict[str, Any]:
+        """Summarize text with map-reduce.
+
+        Args:
+            text: Transcript text
+
+        Returns:
+            Final summary with chunk/call counts and wall-clock time
+        """
+        start = time.perf_counter()
+        chunks = self.split(text)
+        parallelism = max(1, int(self.settings['parallelism']))
+        fan_in = max(2, int(self.settings['fan_in']))
+        map_prompt = self.settings['map_prompt']
+        reduce_prompt = self.settings['reduce_prompt']
+
+        with ThreadPoolExecutor(max_workers=parallelism) as pool:
+            summaries = list(pool.map(
+                lambda item: self._complete(map_prompt.format(index=item[0] + 1, total=len(chunks), text=item[1])),
+                enumerate(chunks)
+            ))
+            map_time = time.perf_counter() - start
+            self.logger.info(f"Map: summarized {len(chunks)} chunks in {map_time:.2f}s")
+
+            levels = 0
+            reduce_calls = 0
+            while len(summaries) > 1:
+                groups = [summaries[i:i + fan_in] for i in range(0, len(summaries), fan_in)]
+                summaries = list(pool.map(
+                    lambda group: group[0] if len(group) == 1 else self._complete(
+                        reduce_prompt.format(text="\n\n---\n\n".join(group))
+                    ),
+                    groups
+                ))
+                levels += 1
+                reduce_calls += sum(1 for g in groups if len(g) > 1)
+                self.logger.info(f"Reduce level {levels}: {len(groups)} groups -> {len(summaries)} summaries")
+
+        wall_time = time.perf_counter() - start
+        return {
+            "summary": summaries[0] if summaries else "",
+            "chunks": len(chunks),
+            "map_calls": len(chunks),
+            "reduce_calls": reduce_calls,
+            "reduce_levels": levels,
+            "map_time_s": round(map_time, 3),
+            "wall_time_s": round(wall_time, 3)
+        }
+
+    def summarize_file(self, file_path: str) -> Dict[str, Any]:
+        """Summarize a transcript file with map-reduce."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        result = self.summarize_text(text)
+        result["file"] = file_path
+        return result
+
+    def single_shot(self, file_path: str, prompt: Optional[str] = None) -> Dict[str, Any]:
+        """Run the existing single-call path (upload + one completion) for comparison.
+
+        Args:
+            file_path: Path to transcript file
+            prompt: User message sent with the attached file
+
+        Returns:
+            create_chat result with its wall-clock time
+        """
+        start = time.perf_counter()
+        result = self.client.create_chat(self.model, file_path, prompt=prompt or "Summarize this meeting transcript.")
+        result["wall_time_s"] = round(time.perf_counter() - start, 3)
+        return result
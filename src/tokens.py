@@ -0,0 +1,270 @@
+"""Fast local token estimation, calibrated offline against a reference tokenizer.
+
+The estimator counts a handful of text features with regular expressions over
+large blocks (no per-character Python loop) and combines them linearly::
+
+    tokens ~= sum(coefficient[f] * count[f] for f in FEATURES)
+
+Default coefficients approximate BPE tokenizers of the cl100k family on
+English transcripts. ``python -m src.tokens calibrate FILE...`` fits them to
+a reference tokenizer (tiktoken, if installed) and stores them in
+``paths.data_dir/token_estimator.json``.
+"""
+
+import argparse
+import codecs
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from .utils.hashing import file_sha256
+
+FEATURES = ('words', 'word_chars', 'digits', 'punctuation', 'non_ascii', 'newlines')
+
+DEFAULT_COEFFICIENTS: Dict[str, float] = {
+    'words': 0.55,
+    'word_chars': 0.16,
+    'digits': 0.34,
+    'punctuation': 0.9,
+    'non_ascii': 0.8,
+    'newlines': 0.3,
+}
+
+_WORD_RE = re.compile(r'[^\W\d_]+')
+_DIGIT_RE = re.compile(r'\d')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+BLOCK_SIZE = 1024 * 1024
+
+
+def count_features(text: str) -> Dict[str, int]:
+    """Count the estimator features of a block of text."""
+    words = _WORD_RE.findall(text)
+    return {
+        'words': len(words),
+        'word_chars': sum(map(len, words)),
+        'digits': len(_DIGIT_RE.findall(text)),
+        'punctuation': len(_PUNCT_RE.findall(text)),
+        'non_ascii': len(_NON_ASCII_RE.findall(text)),
+        'newlines': text.count('\n'),
+    }
+
+
+def iter_text_blocks(file_path: str, block_size: int = BLOCK_SIZE) -> Iterable[str]:
+    """Read a UTF-8 file in blocks that end on whitespace, so no word is split."""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    carry = ''
+    with open(file_path, 'rb') as f:
+        for raw in iter(lambda: f.read(block_size), b''):
+            text = carry + decoder.decode(raw)
+            cut = max(text.rfind(' '), text.rfind('\n'))
+            if cut < 0:
+                carry = text
+                continue
+            carry = text[cut + 1:]
+            yield text[:cut + 1]
+    carry += decoder.decode(b'', final=True)
+    if carry:
+        yield carry
+
+
+class TokenEstimator:
+    """Linear feature model estimating token counts of text and files."""
+
+    def __init__(self, coefficients: Optional[Dict[str, float]] = None, cache_path: Optional[str] = None):
+        """Initialize token estimator.
+
+        Args:
+            coefficients: Per-feature weights, defaults to DEFAULT_COEFFICIENTS
+            cache_path: SQLite file caching file estimates by content hash
+        """
+        self.logger = logging.getLogger(__name__)
+        self.coefficients = {**DEFAULT_COEFFICIENTS, **(coefficients or {})}
+        self.version = ','.join(f"{self.coefficients[f]:.6g}" for f in FEATURES)
+        self._lock = threading.Lock()
+        self._conn = None
+        if cache_path:
+            os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+            self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    """CREATE TABLE IF NOT EXISTS token_estimates (
+                        sha256 TEXT NOT NULL,
+                        version TEXT NOT NULL,
+                        tokens INTEGER NOT NULL,
+                        chars INTEGER NOT NULL,
+                        PRIMARY KEY (sha256, version)
+                    )"""
+                )
+
+    @classmethod
+    def from_config(cls, config) -> 'TokenEstimator':
+        """Create an estimator with calibrated coefficients and a cache in paths.data_dir."""
+        data_dir = config.get_data_dir()
+        coefficients = None
+        calibration_path = os.path.join(data_dir, 'token_estimator.json')
+        if os.path.exists(calibration_path):
+            with open(calibration_path, 'r') as f:
+                coefficients = json.load(f).get('coefficients')
+        return cls(coefficients, os.path.join(data_dir, 'token_cache.sqlite3'))
+
+    def _combine(self, counts: Dict[str, int]) -> int:
+        return max(0, int(round(sum(self.coefficients[f] * counts[f] for f in FEATURES))))
+
+    def estimate_text(self, text: str) -> int:
+        """Estimate the token count of a string."""
+        return self._combine(count_features(text))
+
+    def estimate_counts(self, counts: Dict[str, int]) -> int:
+        """Estimate a token count from features accumulated with count_features."""
+        return self._combine(counts)
+
+    def estimate_file(self, file_path: str) -> Dict[str, int]:
+        """Estimate the token count of a file, using the hash-keyed cache.
+
+        Returns:
+            ``tokens`` and ``chars`` of the file
+        """
+        digest = file_sha256(file_path) if self._conn else None
+        if digest:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT tokens, chars FROM token_estimates WHERE sha256 = ? AND version = ?",
+                    (digest, self.version)
+                ).fetchone()
+            if row:
+                return {"tokens": row[0], "chars": row[1]}
+
+        totals = dict.fromkeys(FEATURES, 0)
+        chars = 0
+        for block in iter_text_blocks(file_path):
+            chars += len(block)
+            for name, value in count_features(block).items():
+                totals[name] += value
+        result = {"tokens": self._combine(totals), "chars": chars}
+
+        if digest:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO token_estimates VALUES (?, ?, ?, ?)",
+                    (digest, self.version, result["tokens"], result["chars"])
+                )
+        return result
+
+    def close(self) -> None:
+        """Close the estimate cache."""
+        if self._conn:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    """Solve a small linear system with Gaussian elimination and partial pivoting."""
+    n = len(vector)
+    rows = [matrix[i][:] + [vector[i]] for i in range(n)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        if abs(rows[col][col]) < 1e-12:
+            continue
+        for r in range(n):
+            if r != col:
+                factor = rows[r][col] / rows[col][col]
+                rows[r] = [a - factor * b for a, b in zip(rows[r], rows[col])]
+    return [rows[i][n] / rows[i][i] if abs(rows[i][i]) >= 1e-12 else 0.0 for i in range(n)]
+
+
+def calibrate(
+    samples: Sequence[str],
+    reference: Callable[[str], int],
+    ridge: float = 1e-6
+) -> Dict[str, float]:
+    """Fit coefficients to a reference tokenizer with ridge least squares.
+
+    Args:
+        samples: Representative texts (e.g. lines or paragraphs of transcripts)
+        reference: Returns the exact token count of a text
+        ridge: Regularization pulling sparse features towards the defaults
+
+    Returns:
+        Fitted coefficients per feature
+    """
+    n = len(FEATURES)
+    xtx = [[0.0] * n for _ in range(n)]
+    xty = [0.0] * n
+    for text in samples:
+        counts = count_features(text)
+        x = [float(counts[f]) for f in FEATURES]
+        y = float(reference(text))
+        for i in range(n):
+            xty[i] += x[i] * y
+            for j in range(n):
+                xtx[i][j] += x[i] * x[j]
+    scale = max(xtx[i][i] for i in range(n)) or 1.0
+    for i, name in enumerate(FEATURES):
+        xtx[i][i] += ridge * scale
+        xty[i] += ridge * scale * DEFAULT_COEFFICIENTS[name]
+    return dict(zip(FEATURES, _solve(xtx, xty)))
+
+
+def _tiktoken_reference(encoding: str) -> Callable[[str], int]:
+    try:
+        import tiktoken
+    except ImportError:
+        raise SystemExit("Calibration needs a reference tokenizer: pip install tiktoken")
+    enc = tiktoken.get_encoding(encoding)
+    return lambda text: len(enc.encode(text, disallowed_special=()))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Estimate or calibrate transcript token counts.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    est = sub.add_parser('estimate', help="Estimate token counts of files")
+    est.add_argument('files', nargs='+')
+    cal = sub.add_parser('calibrate', help="Fit coefficients against tiktoken and save them")
+    cal.add_argument('files', nargs='+')
+    cal.add_argument('--encoding', default='cl100k_base')
+    args = parser.parse_args(argv)
+
+    from .utils.config import Config
+    config = Config()
+
+    if args.command == 'estimate':
+        estimator = TokenEstimator.from_config(config)
+        for path in args.files:
+            print(f"{estimator.estimate_file(path)['tokens']:>10}  {path}")
+        estimator.close()
+        return 0
+
+    reference = _tiktoken_reference(args.encoding)
+    samples: List[str] = []
+    for path in args.files:
+        for block in iter_text_blocks(path, block_size=4096):
+            samples.append(block)
+    coefficients = calibrate(samples, reference)
+
+    fitted = TokenEstimator(coefficients)
+    actual = sum(reference(s) for s in samples)
+    estimated = sum(fitted.estimate_text(s) for s in samples)
+    output_path = os.path.join(config.get_data_dir(), 'token_estimator.json')
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump({"encoding": args.encoding, "coefficients": coefficients}, f, indent=2)
+    print(json.dumps({
+        "coefficients": coefficients,
+        "reference_tokens": actual,
+        "estimated_tokens": estimated,
+        "error_pct": round(100.0 * (estimated - actual) / max(actual, 1), 2),
+        "saved_to": output_path
+    }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,354 @@
+"""Pooled HTTP transport for the OpenWebUI client."""
+
+import json
+import logging
+import socket
+import time
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.retry import Retry
+
+from .compression import CompressedStream, CompressionPolicy, compress_bytes
+from .metrics import MetricsRegistry, current_record, endpoint_label, new_record, tracking
+
+# Methods that can be safely retried without side effects on the server
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+
+# Methods whose request bodies may be compressed
+BODY_METHODS = frozenset(['POST', 'PUT', 'PATCH'])
+
+DEFAULT_TRANSPORT_CONFIG: Dict[str, Any] = {
+    'pool_connections': 4,
+    'pool_maxsize': 10,
+    'pool_block': True,
+    'max_retries': 3,
+    'backoff_factor': 0.5,
+    'retry_statuses': [502, 503, 504],
+    'connect_timeout': 5.0,
+    'read_timeout': 120.0,
+    'max_concurrency': 16,
+}
+
+
+def _add_phase(phase: str, seconds: float) -> None:
+    record = current_record()
+    if record is not None:
+        record["phases"][phase] += seconds
+
+
+class _TimedConnectionMixin:
+    """Report DNS, connect, send and wait timings to the current request record."""
+
+    _socket_setup_s = 0.0
+
+    def _new_conn(self):
+        if current_record() is None:
+            return super()._new_conn()
+        started = time.perf_counter()
+        host = self._dns_host
+        try:
+            infos = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror:
+            # Let urllib3 raise its usual NameResolutionError
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        _add_phase('dns', resolved - started)
+
+        # Connect to the resolved addresses in order, as create_connection would
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        try:
+            for i, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (NewConnectionError, ConnectTimeoutError):
+                    if i == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+            connected = time.perf_counter()
+            _add_phase('connect', connected - resolved)
+            self._socket_setup_s = connected - started
+        return sock
+
+    def request(self, *args: Any, **kwargs: Any) -> None:
+        record = current_record()
+        if record is not None:
+            record["attempts"] += 1
+        started = time.perf_counter()
+        try:
+            return super().request(*args, **kwargs)
+        finally:
+            _add_phase('send', time.perf_counter() - started)
+
+    def getresponse(self):
+        started = time.perf_counter()
+        try:
+            return super().getresponse()
+        finally:
+            record = current_record()
+            if record is not None:
+                now = time.perf_counter()
+                record["phases"]["wait"] += now - started
+                record["headers_at"] = now
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self) -> None:
+        self._socket_setup_s = 0.0
+        started = time.perf_counter()
+        super().connect()
+        if current_record() is not None:
+            _add_phase('tls', max(0.0, time.perf_counter() - started - self._socket_setup_s))
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool
+        }
+
+
+def _body_length(body: Any) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, CompressedStream):
+        return body.wire_bytes
+    if isinstance(body, (bytes, bytearray, str)):
+        return len(body)
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+
+class HTTPTransport:
+    """Shared keep-alive session with a bounded connection pool.
+
+    All requests made by a client go through one ``requests.Session`` so TCP
+    and TLS connections are reused between calls. ``pool_maxsize`` caps the
+    number of connections kept per host, ``pool_connections`` the number of
+    hosts kept in the pool. Idempotent methods are retried with exponential
+    backoff on connection errors and on ``retry_statuses``.
+
+    With a ``metrics`` registry, every request is recorded with its status,
+    bytes, retries and phase timings (see src/metrics.py). Streamed responses
+    are recorded when they are closed.
+
+    With a ``compression`` policy, JSON and streamed bodies of POST/PUT/PATCH
+    requests are compressed for servers that accept it (see
+    src/compression.py). A request refused because of its encoding (see
+    CompressionPolicy.refuses_encoding) is sent again uncompressed.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        compression: Optional[CompressionPolicy] = None
+    ):
+        """Initialize transport.
+
+        Args:
+            config: Transport settings, see DEFAULT_TRANSPORT_CONFIG
+            metrics: Registry receiving per-request records
+            compression: Policy choosing request body encodings per server
+        """
+        self.logger = logging.getLogger(__name__)
+        self.metrics = metrics
+        self.compression = compression
+        self.settings = {**DEFAULT_TRANSPORT_CONFIG, **(config or {})}
+        self.timeout: Tuple[float, float] = (
+            float(self.settings['connect_timeout']),
+            float(self.settings['read_timeout'])
+        )
+
+        retry = Retry(
+            total=int(self.settings['max_retries']),
+            connect=int(self.settings['max_retries']),
+            read=int(self.settings['max_retries']),
+            status=int(self.settings['max_retries']),
+            backoff_factor=float(self.settings['backoff_factor']),
+            status_forcelist=list(self.settings['retry_statuses']),
+            allowed_methods=IDEMPOTENT_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter_class = _TimedHTTPAdapter if metrics is not None else HTTPAdapter
+        self.adapter = adapter_class(
+            pool_connections=int(self.settings['pool_connections']),
+            pool_maxsize=int(self.settings['pool_maxsize']),
+            pool_block=bool(self.settings['pool_block']),
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.headers['Connection'] = 'keep-alive'
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a request through the pooled session.
+
+        Args:
+            method: HTTP method (GET, POST, etc)
+            url: Absolute request URL
+            **kwargs: Passed through to ``requests.Session.request``
+
+        Returns:
+            The response object
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        encoding = None
+        if self.compression is not None and method.upper() in BODY_METHODS:
+            encoding = self.compression.encoding_for(url)
+        compressed = self._compressed(encoding, kwargs) if encoding else None
+        if compressed is None:
+            return self._send(method, url, **kwargs)
+
+        response = self._send(method, url, **compressed)
+        status = response.status_code
+        if status < 400:
+            self.compression.accepted(url, encoding)
+            return response
+        if not self.compression.refuses_encoding(status):
+            return response
+
+        accept_encoding = response.headers.get('Accept-Encoding')
+        response.close()
+        self.logger.info(f"{method} {url} with {encoding} body answered {status}; resending uncompressed")
+        response = self._send(method, url, **kwargs)
+        # A 400 that persists without compression was not about the encoding
+        if status == 415 or response.status_code != status:
+            self.compression.rejected(url, encoding, accept_encoding)
+        return response
+
+    def _compressed(self, encoding: str, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Request arguments with the body compressed, or None if it should be sent as is.
+
+        JSON and byte bodies are compressed in memory; sized iterables such as
+        MultipartFileStream are compressed as they are sent. Bodies smaller
+        than the policy's ``min_size`` and ``files=`` uploads are left alone.
+        """
+        headers = dict(kwargs.get('headers') or {})
+        if kwargs.get('files') or any(k.lower() == 'content-encoding' for k in headers):
+            return None
+        body = kwargs.get('data')
+        level = self.compression.level
+
+        if body is None and kwargs.get('json') is not None:
+            raw = json.dumps(kwargs['json'], allow_nan=False).encode('utf-8')
+            if not any(k.lower() == 'content-type' for k in headers):
+                headers['Content-Type'] = 'application/json'
+        elif isinstance(body, (bytes, str)):
+            raw = body.encode('utf-8') if isinstance(body, str) else body
+        elif body is not None and hasattr(body, '__iter__') and hasattr(body, '__len__'):
+            if len(body) < self.compression.min_size:
+                return None
+            headers['Content-Encoding'] = encoding
+            stream = CompressedStream(body, encoding, level, on_done=self.compression.record)
+            return {**kwargs, 'headers': headers, 'data': stream}
+        else:
+            return None
+
+        if len(raw) < self.compression.min_size:
+            return None
+        data = compress_bytes(raw, encoding, level)
+        self.compression.record(len(raw), len(data))
+        headers['Content-Encoding'] = encoding
+        return {**kwargs, 'headers': headers, 'data': data, 'json': None}
+
+    def _send(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send one request, recording it in the metrics registry if there is one."""
+        if self.metrics is None:
+            return self.session.request(method, url, **kwargs)
+
+        record = new_record(method, endpoint_label(urlsplit(url).path))
+        started = time.perf_counter()
+        with tracking(record):
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                record["error"] = type(e).__name__
+                self._finish(record, started, None)
+                raise
+
+        if kwargs.get('stream'):
+            # The body is read later; count it as it is iterated and record
+            # the call once the caller closes the response
+            close = response.close
+            iter_content = response.iter_content
+            finished = []
+
+            def counting_iter_content(*args: Any, **kw: Any):
+                for chunk in iter_content(*args, **kw):
+                    record["bytes_received"] += len(chunk)
+                    yield chunk
+
+            def close_and_record() -> None:
+                close()
+                if not finished:
+                    finished.append(True)
+                    self._finish(record, started, response)
+
+            response.iter_content = counting_iter_content
+            response.close = close_and_record
+        else:
+            self._finish(record, started, response)
+        return response
+
+    def _finish(self, record: Dict[str, Any], started: float, response: Optional[requests.Response]) -> None:
+        now = time.perf_counter()
+        record["duration_s"] = now - started
+        record["retries"] = max(0, record["attempts"] - 1)
+        headers_at = record.pop("headers_at", None)
+        if headers_at is not None:
+            record["phases"]["download"] = now - headers_at
+        if response is not None:
+            record["status"] = response.status_code
+            record["bytes_sent"] = _body_length(response.request.body)
+            if not record["bytes_received"]:
+                try:
+                    record["bytes_received"] = int(response.raw.tell())
+                except (AttributeError, TypeError, ValueError):
+                    pass
+        self.metrics.observe(record)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request."""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a POST request."""
+        return self.request('POST', url, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> 'HTTPTransport':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
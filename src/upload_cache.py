@@ -0,0 +1,140 @@
+"""Content-addressed index of uploaded files."""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Any
+
+DEFAULT_UPLOAD_CACHE_CONFIG: Dict[str, Any] = {
+    'enabled': True,
+    'ttl_days': 30,
+    'max_entries': 10000,
+    'verify_interval': 3600,
+}
+
+
+class UploadCache:
+    """Persistent map of (server, content hash) to the uploaded ``file_id``.
+
+    Entries expire ``ttl_days`` after upload and the least recently used
+    entries are evicted beyond ``max_entries``. An entry is re-checked
+    against the server at most every ``verify_interval`` seconds.
+    """
+
+    def __init__(self, db_path: str, config: Optional[Dict[str, Any]] = None):
+        """Initialize upload cache.
+
+        Args:
+            db_path: Path of the SQLite index file
+            config: Cache settings, see DEFAULT_UPLOAD_CACHE_CONFIG
+        """
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_UPLOAD_CACHE_CONFIG, **(config or {})}
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS uploads (
+                    server TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    file_id TEXT NOT NULL,
+                    file_name TEXT,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    verified_at REAL NOT NULL,
+                    PRIMARY KEY (server, sha256)
+                )"""
+            )
+        self.evict()
+
+    def lookup(self, server: str, sha256: str) -> Optional[Dict[str, Any]]:
+        """Find a live entry for the given content.
+
+        Args:
+            server: Base URL of the OpenWebUI server
+            sha256: Hex digest of the file content
+
+        Returns:
+            Entry with ``file_id`` and ``needs_verify``, or None
+        """
+        now = time.time()
+        expires_before = now - float(self.settings['ttl_days']) * 86400
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_id, created_at, verified_at FROM uploads WHERE server = ? AND sha256 = ?",
+                (server, sha256)
+            ).fetchone()
+        if row is None or row[1] < expires_before:
+            return None
+        return {
+            "file_id": row[0],
+            "needs_verify": now - row[2] >= float(self.settings['verify_interval'])
+        }
+
+    def store(self, server: str, sha256: str, size: int, file_id: str, file_name: str) -> None:
+        """Record a completed upload."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (server, sha256, size, file_id, file_name, now, now, now)
+            )
+        self.evict()
+
+    def touch(self, server: str, sha256: str, verified: bool = False) -> None:
+        """Mark an entry as used, and optionally as just verified."""
+        now = time.time()
+        with self._lock, self._conn:
+            if verified:
+                self._conn.execute(
+                    "UPDATE uploads SET last_used = ?, verified_at = ? WHERE server = ? AND sha256 = ?",
+                    (now, now, server, sha256)
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE uploads SET last_used = ? WHERE server = ? AND sha256 = ?",
+                    (now, server, sha256)
+                )
+
+    def invalidate(self, server: str, sha256: str) -> None:
+        """Drop an entry, e.g. after the server lost the file."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM uploads WHERE server = ? AND sha256 = ?", (server, sha256))
+
+    def evict(self) -> None:
+        """Remove expired entries and trim the index to max_entries."""
+        expires_before = time.time() - float(self.settings['ttl_days']) * 86400
+        max_entries = int(self.settings['max_entries'])
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM uploads WHERE created_at < ?", (expires_before,))
+            self._conn.execute(
+                """DELETE FROM uploads WHERE rowid IN (
+                    SELECT rowid FROM uploads ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )""",
+                (max_entries,)
+            )
+
+    def record(self, hit: bool) -> None:
+        """Count a hit or miss."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters for this process."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        """Close the index."""
+        with self._lock:
+            self._conn.close()
@@ -1,32 +1,521 @@
-"""Configuration management for OpenWebUI automation."""
+"""Configuration management for OpenWebUI automation.
 
+``config.yaml`` is parsed once per process into an immutable
+``ConfigSnapshot`` held by a shared ``ConfigStore``. The store re-reads the
+file when its mtime or size changes, expands ``${VAR}`` and
+``${VAR:-default}`` from the environment, and batches changes into one
+debounced atomic write (temp file + rename, under a lock file). ``Config`` is
+the accessor used throughout the code base.
+"""
+
+import atexit
+import logging
 import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any
+
 import yaml
-import logging
-from typing import Optional, Dict, Any
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+ENV_PATTERN = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}')
+
+
+def expand_env(value: Any) -> Any:
+    """Replace ``${VAR}`` and ``${VAR:-default}`` in strings, recursively.
+
+    Unset variables without a default expand to an empty string.
+    """
+    if isinstance(value, str):
+        return ENV_PATTERN.sub(lambda m: os.environ.get(m.group(1), m.group(2) or ''), value)
+    if isinstance(value, dict):
+        return {k: expand_env(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [expand_env(v) for v in value]
+    return value
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+def _lookup(data: Mapping, key: str, default: Any = None) -> Any:
+    node: Any = data
+    for part in key.split('.'):
+        if not isinstance(node, Mapping) or part not in node:
+            return default
+        node = node[part]
+    return node
+
+
+def _assign(data: Dict[str, Any], key: str, value: Any) -> None:
+    parts = key.split('.')
+    node = data
+    for part in parts[:-1]:
+        if not isinstance(node.get(part), dict):
+            node[part] = {}
+        node = node[part]
+    node[parts[-1]] = value
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Immutable view of config.yaml at one point in time.
+
+    ``raw`` is the file as parsed, with ``${VAR}`` placeholders intact;
+    ``data`` has them expanded. Both are read-only mappings.
+    """
+
+    path: str
+    mtime_ns: int
+    size: int
+    raw: Mapping[str, Any]
+    data: Mapping[str, Any]
+
+    @classmethod
+    def parse(cls, path: str, text: str, mtime_ns: int, size: int) -> 'ConfigSnapshot':
+        raw = yaml.safe_load(text) or {}
+        return cls(path, mtime_ns, size, _freeze(raw), _freeze(expand_env(raw)))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value at a dotted key such as ``webui.transport.read_timeout``."""
+        return _lookup(self.data, key, default)
+
+    def section(self, name: str) -> Dict[str, Any]:
+        """Mutable copy of a top-level section."""
+        return _thaw(self.data.get(name) or {})
+
+    @property
+    def webui_url(self) -> str:
+        url = self.get('webui.url', '')
+        return str(url if isinstance(url, str) else (list(url) or [''])[0])
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self.get('webui.api_key') or None
+
+    @property
+    def default_model(self) -> Optional[str]:
+        return self.get('models.default')
+
+    @property
+    def last_used_model(self) -> Optional[str]:
+        return self.get('models.last_used')
+
+    @property
+    def transcript_folder(self) -> str:
+        return str(self.get('paths.transcript_folder', ''))
+
+
+def _yaml_scalar(value: Any) -> Optional[str]:
+    """Single-line YAML for a scalar, or None for values that need a block."""
+    if isinstance(value, (dict, list)):
+        return None
+    text = yaml.safe_dump(value, default_flow_style=True, width=1 << 20)
+    text = text.rstrip('\n')
+    if text.endswith('\n...'):
+        text = text[:-4]
+    return None if '\n' in text else text
+
+
+_KEY_RE = re.compile(r'''^("[^"]*"|'[^']*'|[^\s#'"][^:#]*?):(?=\s|$)''')
+_COMMENT_RE = re.compile(r'(\s+#.*)$')
+
+
+def replace_scalar(text: str, key: str, value: Any) -> Optional[str]:
+    """Change one scalar in block-style YAML, keeping comments and layout.
+
+    Args:
+        text: YAML document
+        key: Dotted key of an existing scalar
+        value: New scalar value
+
+    Returns:
+        The updated document, or None if the key is not a scalar line that
+        can be edited in place
+    """
+    rendered = _yaml_scalar(value)
+    if rendered is None:
+        return None
+    target = key.split('.')
+    stack: List[tuple] = []
+    lines = text.splitlines(keepends=True)
+    for index, line in enumerate(lines):
+        stripped = line.lstrip(' ')
+        if not stripped.strip() or stripped.startswith('#') or stripped.startswith('-'):
+            continue
+        indent = len(line) - len(stripped)
+        match = _KEY_RE.match(stripped)
+        if not match:
+            continue
+        name = match.group(1).strip('\'"')
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        path = [k for _, k in stack] + [name]
+        if path == target:
+            body = stripped[match.end():].rstrip('\r\n')
+            comment = _COMMENT_RE.search(body)
+            existing = body[:comment.start()] if comment else body
+            if not existing.strip() or existing.strip()[0] in '|>':
+                return None
+            ending = line[len(line.rstrip('\r\n')):]
+            lines[index] = f"{' ' * indent}{match.group(1)}: {rendered}{comment.group(1) if comment else ''}{ending}"
+            return ''.join(lines)
+        stack.append((indent, name))
+    return None
+
+
+class ConfigStore:
+    """Shared, self-refreshing holder of one config file.
+
+    ``snapshot()`` returns the current ConfigSnapshot, re-parsing the file
+    only when its mtime or size changed (checked at most every
+    ``check_interval`` seconds). ``set()`` applies a change in memory at once
+    and schedules a write ``write_delay`` seconds later, so a burst of
+    changes costs one write. Writes re-read the file under a lock file,
+    apply all pending changes (in place where possible, keeping comments)
+    and replace the file atomically.
+    """
+
+    _stores: Dict[str, 'ConfigStore'] = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, path: str, write_delay: float = 1.0, check_interval: float = 1.0):
+        """Initialize store.
+
+        Args:
+            path: Path of the YAML file
+            write_delay: Seconds changes are batched before being written
+            check_interval: Seconds between mtime checks
+        """
+        self.path = os.path.abspath(path)
+        self.write_delay = write_delay
+        self.check_interval = check_interval
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._pending: Dict[str, Any] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._checked_at = 0.0
+        self._snapshot = self._read()
+        atexit.register(self.flush)
+
+    @classmethod
+    def for_path(cls, path: str) -> 'ConfigStore':
+        """Process-wide store of a file, created on first use."""
+        path = os.path.abspath(path)
+        with cls._stores_lock:
+            store = cls._stores.get(path)
+            if store is None:
+                store = cls._stores[path] = cls(path)
+            return store
+
+    def _read(self) -> ConfigSnapshot:
+        with open(self.path, 'r') as f:
+            text = f.read()
+            st = os.fstat(f.fileno())
+        self._checked_at = time.monotonic()
+        return self._with_pending(ConfigSnapshot.parse(self.path, text, st.st_mtime_ns, st.st_size))
+
+    def _with_pending(self, snapshot: ConfigSnapshot) -> ConfigSnapshot:
+        if not self._pending:
+            return snapshot
+        raw = _thaw(snapshot.raw)
+        for key, value in self._pending.items():
+            _assign(raw, key, value)
+        return ConfigSnapshot(snapshot.path, snapshot.mtime_ns, snapshot.size, _freeze(raw), _freeze(expand_env(raw)))
+
+    def snapshot(self) -> ConfigSnapshot:
+        """Current configuration, reloaded if the file changed on disk."""
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return self._snapshot
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                return self._snapshot
+            if (st.st_mtime_ns, st.st_size) != (self._snapshot.mtime_ns, self._snapshot.size):
+                try:
+                    self._snapshot = self._read()
+                    self.logger.info(f"Reloaded {self.path}")
+                except (OSError, yaml.YAMLError) as e:
+                    self.logger.warning(f"Keeping previous config, could not reload {self.path}: {str(e)}")
+            return self._snapshot
+
+    def set(self, key: str, value: Any) -> None:
+        """Change a value; it is written to disk after ``write_delay`` seconds.
+
+        Args:
+            key: Dotted key, e.g. ``models.last_used``
+            value: New value (YAML-serializable)
+        """
+        with self._lock:
+            self._pending[key] = value
+            snapshot = self._snapshot
+            raw = _thaw(snapshot.raw)
+            _assign(raw, key, value)
+            self._snapshot = ConfigSnapshot(
+                snapshot.path, snapshot.mtime_ns, snapshot.size, _freeze(raw), _freeze(expand_env(raw))
+            )
+            if self._timer is None:
+                self._timer = threading.Timer(self.write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            try:
+                self._write(pending)
+            except (OSError, yaml.YAMLError) as e:
+                # Keep the changes for the next attempt
+                self._pending = {**pending, **self._pending}
+                self.logger.error(f"Failed to save config: {str(e)}")
+
+    def _write(self, pending: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.path)
+        with open(self.path + '.lock', 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            # Start from what is on disk now so edits by others are kept
+            with open(self.path, 'r') as f:
+                text = f.read()
+            for key, value in pending.items():
+                updated = replace_scalar(text, key, value)
+                if updated is None:
+                    data = yaml.safe_load(text) or {}
+                    _assign(data, key, value)
+                    updated = yaml.safe_dump(data, default_flow_style=False, sort_keys=False)
+                text = updated
+
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.config-', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if os.path.exists(self.path):
+                    os.chmod(tmp_path, os.stat(self.path).st_mode & 0o777)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            st = os.stat(self.path)
+        self._snapshot = self._with_pending(ConfigSnapshot.parse(self.path, text, st.st_mtime_ns, st.st_size))
+        self._checked_at = time.monotonic()
+        self.logger.debug(f"Saved {len(pending)} config change(s) to {self.path}")
+
 
 class Config:
-    """Configuration manager."""
-    
-    def __init__(self):
-        """Initialize configuration."""
-        self.config = self._load_config()
-        self.webui_url = self.config['webui']['url']
-        
-    def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from yaml file."""
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config.yaml')
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
-        
+    """Configuration accessor.
+
+    Reads go to the shared ConfigStore's current snapshot, so every Config
+    in a process shares one parse of config.yaml and sees reloads. Values
+    set with ``override`` apply to this instance only and are never saved;
+    values set with ``set`` are saved to config.yaml.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize configuration.
+
+        Args:
+            path: Config file, defaults to config.yaml in the project root
+        """
+        self.base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.store = ConfigStore.for_path(path or os.path.join(self.base_dir, 'config.yaml'))
+        self._overrides: Dict[str, Any] = {}
+        self._view_of: Optional[ConfigSnapshot] = None
+        self._view: Mapping[str, Any] = MappingProxyType({})
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """Current snapshot of the file, without overrides."""
+        return self.store.snapshot()
+
+    @property
+    def config(self) -> Mapping[str, Any]:
+        """Read-only settings with this instance's overrides applied."""
+        snapshot = self.store.snapshot()
+        if snapshot is not self._view_of:
+            data = _thaw(snapshot.data)
+            for key, value in self._overrides.items():
+                _assign(data, key, value)
+            self._view, self._view_of = _freeze(data), snapshot
+        return self._view
+
+    def override(self, key: str, value: Any) -> None:
+        """Replace a value for this instance only (not saved).
+
+        Args:
+            key: Dotted key; a section name replaces the whole section
+            value: New value
+        """
+        self._overrides[key] = value
+        self._view_of = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value at a dotted key, as a mutable copy."""
+        return _thaw(_lookup(self.config, key, default))
+
+    def _section(self, name: str) -> Dict[str, Any]:
+        return _thaw(self.config.get(name) or {})
+
+    def set(self, key: str, value: Any) -> None:
+        """Change a value and save it to config.yaml (debounced)."""
+        self._overrides.pop(key, None)
+        self._view_of = None
+        self.store.set(key, value)
+
+    def flush(self) -> None:
+        """Write pending changes to config.yaml now."""
+        self.store.flush()
+
+    @property
+    def webui_url(self) -> str:
+        return self.config['webui']['url']
+
+    @webui_url.setter
+    def webui_url(self, url: str) -> None:
+        self.override('webui.url', url)
+
+    def get_webui_urls(self) -> List[str]:
+        """Get every configured OpenWebUI base URL; ``webui.url`` may be a string or a list."""
+        url = self.webui_url
+        urls = [url] if isinstance(url, str) else list(url or [])
+        return [str(u).rstrip('/') for u in urls]
+
     def get_webui_url(self) -> str:
-        """Get OpenWebUI base URL."""
-        return self.webui_url.rstrip('/')
-        
+        """Get OpenWebUI base URL (the first one when several are listed)."""
+        return self.get_webui_urls()[0]
+
+    def get_api_key(self) -> Optional[str]:
+        """Get API key (``webui.api_key`` with environment variables expanded)."""
+        return self.get('webui.api_key') or None
+
+    def get_transcript_folder(self) -> str:
+        """Get configured transcript folder path."""
+        return os.path.expanduser(self.config['paths']['transcript_folder'])
+
+    def get_data_dir(self) -> str:
+        """Get directory for local state (caches, indexes), relative to the project root."""
+        path = os.path.expanduser(self.config['paths'].get('data_dir', './data'))
+        return os.path.normpath(os.path.join(self.base_dir, path))
+
+    def get_upload_cache_config(self) -> Dict[str, Any]:
+        """Get upload cache settings."""
+        return self._section('upload_cache')
+
+    def get_completion_cache_config(self) -> Dict[str, Any]:
+        """Get completion result cache settings."""
+        return self._section('completion_cache')
+
+    def get_model_cache_config(self) -> Dict[str, Any]:
+        """Get model list cache settings."""
+        return self._section('model_cache')
+
+    def get_default_model(self) -> str:
+        """Get default model name."""
+        return self.config['models']['default']
+
+    def get_last_used_model(self) -> Optional[str]:
+        """Get last used model name."""
+        return self.get('models.last_used')
+
+    def set_last_used_model(self, model: str) -> None:
+        """Remember the last used model in config.yaml."""
+        self.set('models.last_used', model)
+
+    def get_chat_config(self) -> Dict[str, Any]:
+        """Get chat settings (prompt, streaming)."""
+        return self._section('chat')
+
+    def get_summarize_config(self) -> Dict[str, Any]:
+        """Get map-reduce summarization settings."""
+        return self._section('summarize')
+
+    def get_planner_config(self) -> Dict[str, Any]:
+        """Get context-fit planner settings."""
+        return self._section('planner')
+
+    def get_batch_config(self) -> Dict[str, Any]:
+        """Get headless batch settings."""
+        return self._section('batch')
+
+    def get_jobs_config(self) -> Dict[str, Any]:
+        """Get job queue settings (attempts, backoff, leases)."""
+        return self._section('jobs')
+
+    def get_watch_config(self) -> Dict[str, Any]:
+        """Get watch-folder daemon settings (backend, debounce, retries)."""
+        return self._section('watch')
+
+    def get_knowledge_config(self) -> Dict[str, Any]:
+        """Get knowledge collection sync settings (collection, pattern, workers)."""
+        return self._section('knowledge')
+
+    def get_preprocess_config(self) -> Dict[str, Any]:
+        """Get transcript preprocessing settings (normalizers, processes)."""
+        return self._section('preprocess')
+
+    def get_upload_config(self) -> Dict[str, Any]:
+        """Get streaming upload settings (chunk size, retries, progress)."""
+        return self._section('upload')
+
+    def get_transport_config(self) -> Dict[str, Any]:
+        """Get HTTP transport settings (connection pool, retries, timeouts)."""
+        return dict(self.get('webui.transport') or {})
+
+    def get_routing_config(self) -> Dict[str, Any]:
+        """Get multi-server routing settings (health checks, latency smoothing)."""
+        return dict(self.get('webui.routing') or {})
+
+    def get_limits_config(self) -> Dict[str, Any]:
+        """Get adaptive concurrency and rate limit settings."""
+        return dict(self.get('webui.limits') or {})
+
+    def get_compression_config(self) -> Dict[str, Any]:
+        """Get request body compression settings (encoding, per-server overrides)."""
+        return dict(self.get('webui.compression') or {})
+
+    def get_metrics_config(self) -> Dict[str, Any]:
+        """Get request metrics settings (export directory, sink file, buckets)."""
+        return self._section('metrics')
+
     def get_log_config(self) -> Dict[str, Any]:
-        """Get logging configuration."""
-        return {
-            'level': logging.INFO,
-            'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            'datefmt': '%Y-%m-%d %H:%M:%S'
-        }
+        """Get logging settings for setup_logging, with the log file relative to the project root.
+
+        The file is ``paths.log_file`` unless ``logging.file`` is set; a
+        ``logging.file`` of null disables it.
+        """
+        settings = self._section('logging')
+        path = settings['file'] if 'file' in settings else self.get('paths.log_file', 'logs/automation.log')
+        if path:
+            settings['file'] = os.path.normpath(os.path.join(self.base_dir, os.path.expanduser(path)))
+        return settings
@@ -1,13 +1,11 @@
 """Error handling utility for OpenWebUI automation."""
 
-import tkinter as tk
-from tkinter import messagebox
+import logging
 from typing import Optional, Callable
-from .logger import Logger
 
 class ErrorHandler:
     def __init__(self):
-        self.logger = Logger()
+        self.logger = logging.getLogger(__name__)
 
     def handle_error(
         self,
@@ -27,6 +25,10 @@ class ErrorHandler:
         error_message = message or str(error)
         self.logger.error(f"{title}: {error_message}")
         
+        # Tk is only imported when a dialog is actually shown
+        import tkinter as tk
+        from tkinter import messagebox
+
         # Ensure we have a root window for the dialog
         root = tk.Tk()
         root.withdraw()  # Hide the root window
@@ -53,7 +55,10 @@ class ErrorHandler:
             title: Title for the warning dialog
         """
         self.logger.warning(f"{title}: {message}")
-        
+
+        import tkinter as tk
+        from tkinter import messagebox
+
         root = tk.Tk()
         root.withdraw()
         
@@ -1,9 +1,7 @@
 """File picker dialog for transcript files."""
 
 import os
-import tkinter as tk
-from tkinter import filedialog
-from typing import Optional
+from typing import List, Optional
 import logging
 
 class FilePicker:
@@ -20,6 +18,9 @@ class FilePicker:
             Selected file path or None if cancelled
         """
         try:
+            import tkinter as tk
+            from tkinter import filedialog
+
             root = tk.Tk()
             root.withdraw()  # Hide the main window
             
@@ -42,6 +43,38 @@ class FilePicker:
             self.logger.error(f"Error picking file: {str(e)}")
             return None
             
+    def pick_files(self) -> List[str]:
+        """Show file picker dialog allowing several files to be selected.
+        
+        Returns:
+            Selected file paths; empty if cancelled
+        """
+        try:
+            import tkinter as tk
+            from tkinter import filedialog
+
+            root = tk.Tk()
+            root.withdraw()  # Hide the main window
+            
+            file_paths = filedialog.askopenfilenames(
+                title="Select Transcript Files",
+                filetypes=[
+                    ("Text Files", "*.txt"),
+                    ("All Files", "*.*")
+                ]
+            )
+            
+            if not file_paths:
+                self.logger.info("File selection cancelled")
+                return []
+                
+            self.logger.info(f"Selected {len(file_paths)} file(s): {', '.join(file_paths)}")
+            return list(file_paths)
+            
+        except Exception as e:
+            self.logger.error(f"Error picking files: {str(e)}")
+            return []
+            
     def read_file_content(self, file_path: str) -> Optional[str]:
         """Read content from selected file.
         
@@ -0,0 +1,22 @@
+"""Content hashing helpers."""
+
+import hashlib
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """Hash a file's content without loading it into memory.
+
+    Args:
+        file_path: Path to the file to hash
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        Hex SHA-256 digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,65 +1,231 @@
-"""Logging utility for OpenWebUI automation."""
+"""Logging setup for OpenWebUI automation.
 
-import os
+Log calls only put the record on an in-memory queue; a listener thread
+formats it and writes it to the log file (one JSON object per line) and,
+for the command-line tools, to stderr. Rotation, by size or time, happens on
+that thread too, so a slow or network-mounted log directory never blocks a
+worker in the middle of a request. When the queue is full, records are
+dropped and counted instead of waiting.
+
+Records carry the fields of the surrounding ``log_context`` (file, job id,
+request id, ...) plus any ``extra`` passed to the call, e.g. the endpoint
+and duration of an API request. DEBUG records can be sampled with
+``logging.sample`` to keep high-volume request logging affordable.
+
+Call ``setup_logging(config.get_log_config())`` once per process.
+"""
+
+import atexit
+import contextvars
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
-from typing import Dict, Any
-
-class Logger:
-    _instance = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(Logger, cls).__new__(cls)
-            cls._instance.logger = None
-        return cls._instance
-
-    def setup(self, config: Dict[str, Any]) -> None:
-        """Setup logger with configuration.
-        
-        Args:
-            config: Logging configuration from config.yaml
-        """
-        if self.logger is not None:
-            return
-
-        self.logger = logging.getLogger('OpenWebUIAutomation')
-        self.logger.setLevel(getattr(logging, config['level']))
-
-        # Create logs directory if it doesn't exist
-        log_file = os.path.join(os.path.dirname(__file__), '../../logs/automation.log')
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-
-        # Setup rotating file handler
-        file_handler = RotatingFileHandler(
-            log_file,
-            maxBytes=config['max_size_mb'] * 1024 * 1024,
-            backupCount=config['backup_count']
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+DEFAULT_LOG_CONFIG: Dict[str, Any] = {
+    'level': 'INFO',
+    'file': 'logs/automation.log',
+    'format': 'json',
+    'max_size_mb': 10,
+    'backup_count': 3,
+    'when': None,
+    'sample': {},
+    'queue_size': 10000,
+}
+
+# Record attributes copied into JSON output when set
+CONTEXT_FIELDS = ('request_id', 'job_id', 'file', 'endpoint', 'method', 'status', 'duration_ms', 'server')
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_context: contextvars.ContextVar = contextvars.ContextVar('log_context', default={})
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional['NonBlockingQueueHandler'] = None
+_setup_lock = threading.Lock()
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Add fields to every record logged by this thread inside the block."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current log_context onto records as they are logged."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a share of records at chatty levels, e.g. {'DEBUG': 0.1}.
+
+    Sampling is deterministic: with a rate of 0.1 every tenth record per
+    logger and level is kept. WARNING and above are never sampled.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.intervals = {}
+        for level, rate in (rates or {}).items():
+            levelno = logging.getLevelName(str(level).upper())
+            if isinstance(levelno, int) and levelno < logging.WARNING and rate is not None and float(rate) < 1:
+                self.intervals[levelno] = max(1, round(1 / float(rate))) if float(rate) > 0 else 0
+        self._counts: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        interval = self.intervals.get(record.levelno)
+        if interval is None:
+            return True
+        if interval == 0:
+            return False
+        key = (record.name, record.levelno)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % interval == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record with the context fields that are set."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the message arguments now (they may change later) but leave
+        # formatting, including tracebacks, to the listener's handlers
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _file_handler(settings: Dict[str, Any]) -> logging.Handler:
+    path = settings['file']
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if settings.get('when'):
+        handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=settings['when'], backupCount=int(settings['backup_count']), encoding='utf-8'
         )
-        
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=int(float(settings['max_size_mb']) * 1024 * 1024),
+            backupCount=int(settings['backup_count']),
+            encoding='utf-8'
         )
-        file_handler.setFormatter(formatter)
-        
-        self.logger.addHandler(file_handler)
-
-    def info(self, message: str) -> None:
-        """Log info message."""
-        if self.logger:
-            self.logger.info(message)
-
-    def error(self, message: str) -> None:
-        """Log error message."""
-        if self.logger:
-            self.logger.error(message)
-
-    def warning(self, message: str) -> None:
-        """Log warning message."""
-        if self.logger:
-            self.logger.warning(message)
-
-    def debug(self, message: str) -> None:
-        """Log debug message."""
-        if self.logger:
-            self.logger.debug(message)
+    handler.setFormatter(JsonFormatter() if settings['format'] == 'json' else logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def setup_logging(config: Optional[Dict[str, Any]] = None, console: Optional[TextIO] = None) -> NonBlockingQueueHandler:
+    """Route all logging through a queue to a listener thread.
+
+    Replaces any handlers on the root logger, so calling it again (e.g. with
+    another level) reconfigures logging instead of duplicating output.
+
+    Args:
+        config: Logging settings, see DEFAULT_LOG_CONFIG; ``file`` None
+            disables the log file
+        console: Stream that also receives human-readable records, e.g.
+            sys.stderr for command-line tools
+
+    Returns:
+        The queue handler installed on the root logger
+    """
+    global _listener, _handler
+    settings = {**DEFAULT_LOG_CONFIG, **(config or {})}
+    level = settings['level']
+    level = logging.getLevelName(level.upper()) if isinstance(level, str) else int(level)
+
+    handlers = []
+    if settings['file']:
+        handlers.append(_file_handler(settings))
+    if console is not None:
+        stream_handler = logging.StreamHandler(console)
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(stream_handler)
+
+    with _setup_lock:
+        shutdown_logging()
+        log_queue: queue.Queue = queue.Queue(maxsize=int(settings['queue_size']))
+        handler = NonBlockingQueueHandler(log_queue)
+        handler.addFilter(SamplingFilter(settings['sample']))
+        handler.addFilter(ContextFilter())
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _handler = handler
+    return handler
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the listener thread."""
+    global _listener, _handler
+    listener, handler = _listener, _handler
+    _listener = _handler = None
+    if listener is None:
+        return
+    logging.getLogger().removeHandler(handler)
+    listener.stop()
+    for target in listener.handlers:
+        target.close()
+    if handler.dropped:
+        print(f"logging: dropped {handler.dropped} records while the queue was full", file=sys.stderr)
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,447 @@
+"""Watch-folder daemon: process new transcripts as they appear.
+
+The daemon watches ``paths.transcript_folder`` with inotify on Linux, or by
+polling elsewhere. It waits until a file has stopped changing, then runs it
+through upload and chat with ``BatchRunner.process_file``. Processed files
+are recorded in ``paths.data_dir/watch_state.sqlite3`` with their size,
+mtime and content hash, so a restart only handles files that are new or
+changed since the last run.
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import logging
+import os
+import select
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Set, Tuple
+
+from .batch import BatchRunner
+from .utils.config import Config
+from .utils.hashing import file_sha256
+
+DEFAULT_WATCH_CONFIG: Dict[str, Any] = {
+    'backend': 'auto',
+    'debounce_seconds': 5.0,
+    'poll_interval': 2.0,
+    'max_attempts': 3,
+}
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')
+
+StatSignature = Tuple[int, int]
+
+
+def stat_signature(path: str) -> Optional[StatSignature]:
+    """(size, mtime_ns) of a file, or None if it is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def scan_folder(folder: str, pattern: str) -> Dict[str, StatSignature]:
+    """Stat every file in ``folder`` whose name matches ``pattern``."""
+    found = {}
+    try:
+        entries = list(os.scandir(folder))
+    except OSError:
+        return found
+    for entry in entries:
+        if fnmatch.fnmatch(entry.name, pattern):
+            try:
+                if entry.is_file():
+                    st = entry.stat()
+                    found[entry.path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                continue
+    return found
+
+
+class PollingWatcher:
+    """Detect changed files by re-scanning the folder every ``interval`` seconds."""
+
+    def __init__(self, folder: str, pattern: str, interval: float = 2.0):
+        self.folder = folder
+        self.pattern = pattern
+        self.interval = interval
+        self._seen = scan_folder(folder, pattern)
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """Wait up to ``timeout`` seconds and return paths that changed."""
+        time.sleep(min(timeout, self.interval))
+        current = scan_folder(self.folder, self.pattern)
+        changed = {path for path, sig in current.items() if self._seen.get(path) != sig}
+        self._seen = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watch on one folder, via ctypes.
+
+    ``wait`` returns None when the kernel queue overflowed and events were
+    lost; the caller should rescan the folder.
+    """
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+
+    def __init__(self, folder: str, pattern: str):
+        libc = _libc()
+        if libc is None:
+            raise OSError("inotify is not available")
+        self.folder = folder
+        self.pattern = pattern
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(folder), self.MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {folder}")
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """Wait up to ``timeout`` seconds for events and return the paths they name."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: Set[str] = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if name:
+                name = os.fsdecode(name)
+                if fnmatch.fnmatch(name, self.pattern):
+                    changed.add(os.path.join(self.folder, name))
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def _libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def make_watcher(folder: str, pattern: str, backend: str = 'auto', poll_interval: float = 2.0):
+    """Create an inotify watcher where possible, else a polling one.
+
+    Args:
+        folder: Folder to watch (not recursive)
+        pattern: File name pattern, e.g. ``*.txt``
+        backend: ``auto``, ``inotify`` or ``polling``
+        poll_interval: Seconds between scans of the polling watcher
+    """
+    if backend in ('auto', 'inotify'):
+        try:
+            return InotifyWatcher(folder, pattern)
+        except OSError as e:
+            if backend == 'inotify':
+                raise
+            logging.getLogger(__name__).info(f"inotify unavailable ({e}); polling {folder} instead")
+    return PollingWatcher(folder, pattern, poll_interval)
+
+
+class Debouncer:
+    """Hold changed files back until they have stopped changing.
+
+    A file is ready once no event has been seen for ``delay`` seconds and
+    its size and mtime are the same as at the last event.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._pending: Dict[str, Tuple[float, Optional[StatSignature]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def touch(self, path: str) -> None:
+        """Note a change to ``path``."""
+        self._pending[path] = (time.monotonic(), stat_signature(path))
+
+    def ready(self) -> List[str]:
+        """Remove and return the files that have settled."""
+        now = time.monotonic()
+        settled = []
+        for path, (changed_at, signature) in list(self._pending.items()):
+            if now - changed_at < self.delay:
+                continue
+            current = stat_signature(path)
+            if current is None:
+                del self._pending[path]
+            elif current != signature:
+                self._pending[path] = (now, current)
+            else:
+                del self._pending[path]
+                settled.append(path)
+        return sorted(settled)
+
+
+class ProcessedIndex:
+    """SQLite record of the transcripts the daemon has handled."""
+
+    def __init__(self, db_path: str):
+        """Initialize index.
+
+        Args:
+            db_path: Path of the SQLite file
+        """
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS processed_files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    file_id TEXT,
+                    chat_id TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """Stored entry of a file, or None."""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM processed_files WHERE path = ?", (path,))
+            row = cursor.fetchone()
+            names = [d[0] for d in cursor.description]
+        return dict(zip(names, row)) if row else None
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """All stored entries by path."""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM processed_files")
+            names = [d[0] for d in cursor.description]
+            return {row[0]: dict(zip(names, row)) for row in cursor.fetchall()}
+
+    def record(self, path: str, signature: StatSignature, sha256: Optional[str], entry: Dict[str, Any]) -> None:
+        """Store the outcome of processing a file."""
+        previous = self.get(path)
+        attempts = 0 if entry["success"] else (previous or {}).get('attempts', 0) + 1
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO processed_files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path, signature[0], signature[1], sha256,
+                    'done' if entry["success"] else 'failed', attempts,
+                    entry.get("file_id"), entry.get("chat_id"), entry.get("error"), time.time()
+                )
+            )
+
+    def update_signature(self, path: str, signature: StatSignature) -> None:
+        """Store a new size/mtime for a file whose content did not change."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE processed_files SET size = ?, mtime_ns = ? WHERE path = ?",
+                (signature[0], signature[1], path)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class WatchDaemon:
+    """Long-running loop feeding new transcripts to a BatchRunner.
+
+    On start, the folder is compared with the processed-file index by size
+    and mtime; only new or changed files are hashed, and only files whose
+    content is new are processed. After that, watcher events are debounced
+    and settled files are processed on the runner's worker pool. Failed
+    files are retried on the next start or change, up to
+    ``watch.max_attempts`` times.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        model: str,
+        runner: Optional[BatchRunner] = None,
+        folder: Optional[str] = None,
+        pattern: Optional[str] = None,
+        backend: Optional[str] = None,
+        debounce: Optional[float] = None
+    ):
+        """Initialize daemon.
+
+        Args:
+            config: Loaded configuration
+            model: Model to use for every chat
+            runner: Runner doing upload and chat, created from ``config`` if omitted
+            folder: Folder to watch, defaults to paths.transcript_folder
+            pattern: File name pattern, defaults to batch.pattern
+            backend: ``auto``, ``inotify`` or ``polling``, defaults to watch.backend
+            debounce: Seconds a file must stay unchanged, defaults to watch.debounce_seconds
+        """
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.settings = {**DEFAULT_WATCH_CONFIG, **config.get_watch_config()}
+        self.model = model
+        self.runner = runner or BatchRunner(config)
+        self.folder = os.path.abspath(folder or config.get_transcript_folder())
+        self.pattern = pattern or self.runner.pattern
+        self.backend = backend or self.settings['backend']
+        self.debouncer = Debouncer(float(self.settings['debounce_seconds'] if debounce is None else debounce))
+        self.index = ProcessedIndex(os.path.join(config.get_data_dir(), 'watch_state.sqlite3'))
+        self.processed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._in_flight: Dict[str, Future] = {}
+
+    def stop(self) -> None:
+        """Ask the loop to finish after in-flight files."""
+        self._stop.set()
+
+    def close(self) -> None:
+        """Release the runner and the index."""
+        self.runner.close()
+        self.index.close()
+
+    def _is_new(self, path: str, signature: StatSignature, entry: Optional[Dict[str, Any]]) -> bool:
+        """Whether a file has to be processed given its stored entry.
+
+        A processed file whose size or mtime changed but whose content hash
+        did not is only re-stamped.
+        """
+        if entry is None:
+            return True
+        changed = (entry['size'], entry['mtime_ns']) != signature
+        if entry['status'] == 'failed':
+            return changed or entry['attempts'] < int(self.settings['max_attempts'])
+        if not changed:
+            return False
+        try:
+            if entry['sha256'] and file_sha256(path) == entry['sha256']:
+                self.index.update_signature(path, signature)
+                return False
+        except OSError:
+            return False
+        return True
+
+    def reconcile(self) -> List[str]:
+        """Find files that are new or changed since the index was last updated.
+
+        Only files whose size or mtime differ from the index are hashed.
+
+        Returns:
+            Paths to process
+        """
+        started = time.perf_counter()
+        current = scan_folder(self.folder, self.pattern)
+        known = self.index.entries()
+        delta = [path for path, signature in sorted(current.items()) if self._is_new(path, signature, known.get(path))]
+        self.logger.info(
+            f"Reconciled {self.folder}: {len(current)} files, {len(delta)} new or changed "
+            f"({time.perf_counter() - started:.2f}s)"
+        )
+        return delta
+
+    def _process(self, path: str) -> Dict[str, Any]:
+        signature = stat_signature(path)
+        if signature is None:
+            return {"file": path, "success": False, "error": "File disappeared"}
+        try:
+            digest = file_sha256(path)
+        except OSError as e:
+            return {"file": path, "success": False, "error": str(e)}
+        entry = self.runner.process_file(self.model, path)
+        self.index.record(path, signature, digest, entry)
+        with self._lock:
+            if entry["success"]:
+                self.processed += 1
+            else:
+                self.failed += 1
+        return entry
+
+    def _submit_ready(self, pool: ThreadPoolExecutor) -> None:
+        for path, future in list(self._in_flight.items()):
+            if future.done():
+                del self._in_flight[path]
+        for path in self.debouncer.ready():
+            if path in self._in_flight:
+                # Changed again while processing; look at it once the current run is done
+                self.debouncer.touch(path)
+                continue
+            signature = stat_signature(path)
+            if signature is None or not self._is_new(path, signature, self.index.get(path)):
+                continue
+            self.logger.info(f"New transcript: {path}")
+            self._in_flight[path] = pool.submit(self._process, path)
+
+    def run(self, once: bool = False) -> Dict[str, int]:
+        """Reconcile, then watch the folder until ``stop`` is called.
+
+        Args:
+            once: Process the startup delta and return instead of watching
+
+        Returns:
+            Counts of processed and failed files
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        self.runner.prepare()
+        watcher = make_watcher(self.folder, self.pattern, self.backend, float(self.settings['poll_interval']))
+        self.logger.info(f"Watching {self.folder} for {self.pattern} ({type(watcher).__name__})")
+        timeout = max(0.05, min(float(self.settings['poll_interval']), self.debouncer.delay / 2 or 0.05))
+
+        with ThreadPoolExecutor(max_workers=max(1, self.runner.workers)) as pool:
+            try:
+                for path in self.reconcile():
+                    if once:
+                        self._in_flight[path] = pool.submit(self._process, path)
+                    else:
+                        self.debouncer.touch(path)
+                while not once and not self._stop.is_set():
+                    changed = watcher.wait(timeout)
+                    if changed is None:
+                        self.logger.warning("Watch events were lost; rescanning")
+                        changed = set(self.reconcile())
+                    for path in changed:
+                        self.debouncer.touch(path)
+                    self._submit_ready(pool)
+            finally:
+                watcher.close()
+        return {"processed": self.processed, "failed": self.failed}
@@ -1,21 +1,45 @@
 """OpenWebUI API client for automation."""
 
 import requests
+import hashlib
 import json
 import os
-from typing import Dict, List, Optional, Any
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, Sequence, Tuple, Union
 from .utils.error_handler import ConnectionError, AuthenticationError, ModelError, OpenWebUIError
 import logging
 from .utils.config import Config
+from .utils.logger import log_context
+from .transport import HTTPTransport
+from .router import EndpointRouter
+from .rate_limit import RequestLimiter
+from .compression import CompressionPolicy
+from .metrics import MetricsRegistry
+from .chat_stream import ChatStream, TokenCallback
+from .streaming_upload import StreamingUploader, ProgressCallback
+from .model_cache import ModelCache
+from .upload_cache import UploadCache
+from .completion_cache import CompletionCache, completion_key
+from .utils.hashing import file_sha256
 
 class OpenWebUIClient:
-    def __init__(self, config: Config):
-        """Initialize WebUI client with configuration."""
+    def __init__(self, config: Config, metrics: Optional[MetricsRegistry] = None):
+        """Initialize WebUI client with configuration.
+        
+        Args:
+            config: Loaded configuration
+            metrics: Registry for per-request metrics; defaults to the
+                process-wide registry when ``metrics.enabled`` is set
+        """
         self.config = config
         self.logger = logging.getLogger(__name__)
         
-        # Get API key from environment
-        self.api_key = os.getenv('OPENWEBUI_API_KEY')
+        # webui.api_key, usually ${OPENWEBUI_API_KEY}, expanded from the environment
+        self.api_key = self.config.get_api_key() or os.getenv('OPENWEBUI_API_KEY')
         if not self.api_key:
             raise ValueError("OPENWEBUI_API_KEY environment variable is required")
             
@@ -25,6 +49,76 @@ class OpenWebUIClient:
             "Content-Type": "application/json"
         }
 
+        if metrics is None and self.config.get_metrics_config().get('enabled', True):
+            metrics = MetricsRegistry.shared(self.config)
+        self.metrics = metrics
+
+        # Request bodies are compressed for servers that accept it
+        self.compression = CompressionPolicy(
+            self.config.get_compression_config(),
+            os.path.join(self.config.get_data_dir(), 'compression.json')
+        )
+
+        # Shared keep-alive session used by every request
+        self.transport = HTTPTransport(
+            self.config.get_transport_config(),
+            metrics=self.metrics,
+            compression=self.compression
+        )
+        self.uploader = StreamingUploader(self.transport, self.config.get_upload_config())
+
+        # Requests are spread over every server listed in webui.url
+        self.router = EndpointRouter(
+            self.config.get_webui_urls(),
+            self.config.get_routing_config(),
+            probe=self._probe
+        )
+        self._pin = threading.local()
+
+        # Adaptive concurrency and rate limits per server and endpoint class
+        limits_config = self.config.get_limits_config()
+        self.limiter: Optional[RequestLimiter] = None
+        if limits_config.get('enabled', True):
+            self.limiter = RequestLimiter(limits_config, metrics=self.metrics)
+
+        # Content-addressed index of earlier uploads
+        cache_config = self.config.get_upload_cache_config()
+        self.upload_cache: Optional[UploadCache] = None
+        if cache_config.get('enabled', True):
+            cache_path = os.path.join(self.config.get_data_dir(), 'upload_cache.sqlite3')
+            self.upload_cache = UploadCache(cache_path, cache_config)
+
+        # Completion results keyed by model, messages and attached content
+        completion_cache_config = self.config.get_completion_cache_config()
+        self.completion_cache: Optional[CompletionCache] = None
+        if completion_cache_config.get('enabled', True):
+            cache_path = os.path.join(self.config.get_data_dir(), 'completion_cache.sqlite3')
+            self.completion_cache = CompletionCache(cache_path, completion_cache_config)
+
+        # Persistent model list, keyed by server
+        model_cache_config = self.config.get_model_cache_config()
+        self.model_cache: Optional[ModelCache] = None
+        if model_cache_config.get('enabled', True):
+            server_key = hashlib.sha1(self.config.get_webui_url().encode()).hexdigest()[:12]
+            cache_path = os.path.join(self.config.get_data_dir(), f'models_{server_key}.json')
+            self.model_cache = ModelCache(cache_path, self._fetch_models, model_cache_config)
+
+    def close(self) -> None:
+        """Release pooled connections and local indexes."""
+        self.router.close()
+        self.transport.close()
+        if self.upload_cache:
+            self.logger.info(f"Upload cache stats: {self.upload_cache.stats()}")
+            self.upload_cache.close()
+        if self.completion_cache:
+            self.completion_cache.close()
+
+    def __enter__(self) -> 'OpenWebUIClient':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
     def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, files: Optional[Dict] = None, json: Optional[Dict] = None) -> Dict[str, Any]:
         """Make HTTP request to OpenWebUI API.
         
@@ -38,24 +132,23 @@ class OpenWebUIClient:
         Returns:
             Response data as dictionary
         """
-        url = f"{self.config.get_webui_url()}{endpoint}"
-        
         try:
             if method == 'GET':
-                response = requests.get(url, headers=self.headers)
+                kwargs = {"headers": self.headers}
             elif method == 'POST':
                 if files:
                     # For file uploads, don't include Content-Type header
                     headers = self.headers.copy()
                     headers.pop('Content-Type', None)
-                    response = requests.post(url, headers=headers, data=data, files=files)
+                    kwargs = {"headers": headers, "data": data, "files": files}
                 elif json:
-                    response = requests.post(url, headers=self.headers, json=json)
+                    kwargs = {"headers": self.headers, "json": json}
                 else:
-                    response = requests.post(url, headers=self.headers, json=data)
+                    kwargs = {"headers": self.headers, "json": data}
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
-                
+
+            response = self._routed(endpoint, lambda url: self.transport.request(method, url, **kwargs))
             response.raise_for_status()
             return response.json()
             
@@ -63,6 +156,141 @@ class OpenWebUIClient:
             self.logger.error(f"API request failed: {str(e)}")
             raise OpenWebUIError(f"API request failed: {str(e)}")
             
+    @contextmanager
+    def pinned(self, server: Optional[str] = None, exclude: Iterable[str] = ()) -> Iterator[str]:
+        """Send every request made by this thread inside the block to one server.
+        
+        Files only exist on the server they were uploaded to, so an upload
+        and the chats using it have to go to the same one. A nested block
+        keeps the outer server.
+        
+        Args:
+            server: Base URL to use; the router picks one if omitted
+            exclude: Servers the router must not pick
+            
+        Yields:
+            Base URL of the server
+        """
+        current = getattr(self._pin, 'endpoint', None)
+        if current is not None:
+            yield current.url
+            return
+        endpoint = self.router.endpoint(server) if server else self.router.pick(exclude)
+        if endpoint is None:
+            raise ConnectionError("No OpenWebUI server left to try")
+        self._pin.endpoint = endpoint
+        try:
+            yield endpoint.url
+        finally:
+            self._pin.endpoint = None
+
+    def _routed(self, path: str, send: Callable[[str], requests.Response], stream: bool = False) -> requests.Response:
+        """Send a request to the pinned server, or to the least loaded healthy one.
+        
+        Connection errors, timeouts and 5xx answers take the server out of
+        rotation. Unpinned requests are then sent to the next server; pinned
+        ones fail. With the request limiter, the request first waits for a
+        concurrency slot and rate token; a 429 (or 503 with Retry-After) is
+        sent again to the same server once the Retry-After delay has passed.
+        
+        Args:
+            path: API path, appended to the server's base URL
+            send: Sends the request to the absolute URL it is given
+            stream: The body is read later; the server counts as busy until
+                the response is closed
+            
+        Returns:
+            The response object
+        """
+        pinned = getattr(self._pin, 'endpoint', None)
+        tried: List[str] = []
+        throttled = 0
+        while True:
+            endpoint = pinned or self.router.pick(tried)
+            slot = self.limiter.acquire(endpoint.url, path) if self.limiter else None
+            self.router.acquire(endpoint)
+            started = time.perf_counter()
+            try:
+                response = send(endpoint.url + path)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if slot:
+                    slot.done(None)
+                    slot.release()
+                self.router.release(endpoint)
+                self.router.observe(endpoint, None, ok=False)
+                tried.append(endpoint.url)
+                if pinned or not self.router.has_alternative(tried):
+                    raise
+                self.logger.warning(f"{endpoint.url} is unreachable; sending {path} to another server")
+                continue
+            except Exception:
+                if slot:
+                    slot.release()
+                self.router.release(endpoint)
+                raise
+
+            latency = time.perf_counter() - started
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"{path} answered {response.status_code}", extra={
+                    "request_id": uuid.uuid4().hex[:12],
+                    "endpoint": path,
+                    "status": response.status_code,
+                    "duration_ms": round(latency * 1000, 1),
+                    "server": endpoint.url,
+                })
+            if slot and slot.done(latency, response.status_code, response.headers.get('Retry-After')) \
+                    and throttled < self.limiter.max_retries:
+                # The server is busy, not broken: wait as asked and try it again
+                throttled += 1
+                response.close()
+                slot.release()
+                self.router.release(endpoint)
+                self.logger.info(f"{endpoint.url} throttled {path} ({response.status_code}); retry {throttled}")
+                continue
+
+            ok = response.status_code < 500
+            self.router.observe(endpoint, latency, ok)
+            if not ok and not pinned and self.router.has_alternative(tried + [endpoint.url]):
+                response.close()
+                if slot:
+                    slot.release()
+                self.router.release(endpoint)
+                tried.append(endpoint.url)
+                self.logger.warning(f"{endpoint.url} answered {response.status_code}; sending {path} to another server")
+                continue
+
+            if stream:
+                close = response.close
+                released = []
+
+                def close_and_release() -> None:
+                    close()
+                    if not released:
+                        released.append(True)
+                        if slot:
+                            slot.release()
+                        self.router.release(endpoint)
+
+                response.close = close_and_release
+            else:
+                if slot:
+                    slot.release()
+                self.router.release(endpoint)
+            return response
+
+    def _probe(self, url: str) -> float:
+        """Health check of one server: time a GET /api/models."""
+        started = time.perf_counter()
+        response = self.transport.get(
+            f"{url}/api/models",
+            headers=self.headers,
+            timeout=float(self.router.settings['health_timeout'])
+        )
+        response.close()
+        if response.status_code >= 500:
+            raise OpenWebUIError(f"Health check answered {response.status_code}")
+        return time.perf_counter() - started
+
     def check_auth_required(self) -> bool:
         """Check if authentication is required.
         
@@ -77,53 +305,176 @@ class OpenWebUIClient:
         except Exception:
             return True
 
-    def list_models(self) -> List[Dict[str, Any]]:
+    def _fetch_models(self, conditional_headers: Dict[str, str]) -> Tuple[Optional[List[Dict[str, Any]]], Dict[str, str]]:
+        """Fetch /api/models, optionally as a conditional request.
+        
+        Args:
+            conditional_headers: If-None-Match / If-Modified-Since headers
+            
+        Returns:
+            (models, validators); models is None when the server answered
+            304 Not Modified
+        """
+        try:
+            response = self._routed(
+                '/api/models',
+                lambda url: self.transport.get(url, headers={**self.headers, **conditional_headers})
+            )
+            if response.status_code == 304:
+                return None, {}
+            response.raise_for_status()
+            data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.logger.error(f"API request failed: {str(e)}")
+            raise OpenWebUIError(f"API request failed: {str(e)}")
+
+        if not data or not isinstance(data, dict):
+            raise OpenWebUIError("Invalid response format")
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        return data.get('data', []), validators
+
+    def list_models(self, refresh: bool = False) -> List[Dict[str, Any]]:
         """List available models.
         
+        Served from the model cache when it is enabled; see ModelCache.
+        
+        Args:
+            refresh: Revalidate with the server even if the cached list is fresh
+            
         Returns:
             List of model information dictionaries
         """
         try:
-            response = self._make_request('GET', '/api/models')  # Using correct OpenWebUI endpoint
-            if not response or not isinstance(response, dict):
-                raise OpenWebUIError("Invalid response format")
-                
-            return response.get('data', [])
+            if self.model_cache:
+                return self.model_cache.get(refresh=refresh)
+            models, _ = self._fetch_models({})
+            return models or []
             
         except Exception as e:
             self.logger.error(f"Failed to list models: {str(e)}")
             return []
             
-    def upload_document(self, file_path: str) -> Dict[str, Any]:
+    def file_exists(self, file_id: str) -> bool:
+        """Check whether the server still has an uploaded file.
+        
+        Args:
+            file_id: ID returned by the upload API
+            
+        Returns:
+            True if the file can be fetched, False otherwise
+        """
+        try:
+            response = self._routed(
+                f"/api/files/{file_id}",
+                lambda url: self.transport.get(url, headers=self.headers)
+            )
+            return response.status_code == 200
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"Could not verify file {file_id}: {str(e)}")
+            return False
+
+    def _cached_upload(self, server: str, digest: str, file_path: str) -> Optional[str]:
+        """Look up a previous upload of the same content.
+        
+        Returns:
+            The cached file ID, or None on a cache miss
+        """
+        entry = self.upload_cache.lookup(server, digest)
+        if entry and entry["needs_verify"]:
+            if self.file_exists(entry["file_id"]):
+                self.upload_cache.touch(server, digest, verified=True)
+            else:
+                self.logger.info(f"Cached file {entry['file_id']} is gone from the server")
+                self.upload_cache.invalidate(server, digest)
+                entry = None
+        elif entry:
+            self.upload_cache.touch(server, digest)
+
+        self.upload_cache.record(hit=entry is not None)
+        stats = self.upload_cache.stats()
+        if entry:
+            self.logger.info(
+                f"Upload cache hit for {file_path} (file_id={entry['file_id']}, "
+                f"hits={stats['hits']}, misses={stats['misses']})"
+            )
+            return entry["file_id"]
+        self.logger.info(f"Upload cache miss for {file_path} (hits={stats['hits']}, misses={stats['misses']})")
+        return None
+
+    def upload_document(
+        self,
+        file_path: str,
+        use_cache: bool = True,
+        progress: Optional[ProgressCallback] = None,
+        server: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Upload a document to OpenWebUI's document storage.
         
+        The file is streamed from disk in chunks, so memory use does not
+        grow with file size. Identical content already uploaded to the same
+        server is not sent again; the cached ``file_id`` is returned with
+        ``cached`` set.
+        
         Args:
             file_path: Path to the file to upload
+            use_cache: Consult the upload cache before uploading
+            progress: Called with (bytes_sent, total_bytes) while uploading
+            server: Server to upload to; the pinned server or the router's
+                pick if omitted
             
         Returns:
-            Response from the upload API
+            Response from the upload API, with the ``server`` that holds the file
         """
+        with self.pinned(server) as server:
+            result = self._upload_document(server, file_path, use_cache, progress)
+        result["server"] = server
+        return result
+
+    def _upload_document(
+        self,
+        server: str,
+        file_path: str,
+        use_cache: bool,
+        progress: Optional[ProgressCallback]
+    ) -> Dict[str, Any]:
+        """Upload to the pinned ``server``; see upload_document."""
+        digest = None
+
+        try:
+            if use_cache and self.upload_cache:
+                digest = file_sha256(file_path)
+                cached_id = self._cached_upload(server, digest, file_path)
+                if cached_id:
+                    return {
+                        "success": True,
+                        "file_id": cached_id,
+                        "cached": True,
+                        "response": None
+                    }
+        except OSError as e:
+            self.logger.error(f"Failed to upload document: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
         self.logger.info(f"Uploading document: {file_path}")
         
         try:
-            # Upload file
             file_name = os.path.basename(file_path)
-            files = {
-                'file': (file_name, open(file_path, 'rb'), 'text/plain')
-            }
             headers = self.headers.copy()
-            headers.pop('Content-Type', None)  # Let requests set the correct content type for multipart
             headers['Accept'] = 'application/json'
-            
-            # Upload the file using OpenWebUI endpoint
-            upload_url = f"{self.config.get_webui_url()}/api/files/"
-            upload_response = requests.post(
-                upload_url,
-                headers=headers,
-                files=files
+
+            # Stream the file from disk; Content-Type is set by the uploader
+            upload_response = self._routed(
+                '/api/files/',
+                lambda url: self.uploader.upload(url, headers, file_path, progress=progress)
             )
             
-            self.logger.debug(f"Upload response: {upload_response.text}")
+            self.logger.debug(f"Upload answered {upload_response.status_code} ({len(upload_response.content)} bytes)")
             
             if upload_response.status_code != 200:
                 raise OpenWebUIError(f"Upload failed: {upload_response.text}")
@@ -133,10 +484,14 @@ class OpenWebUIClient:
             if not file_id:
                 raise OpenWebUIError("No file ID in response")
                 
+            if digest:
+                self.upload_cache.store(server, digest, os.path.getsize(file_path), file_id, file_name)
+
             self.logger.info("Document uploaded successfully")
             return {
                 "success": True,
                 "file_id": file_id,
+                "cached": False,
                 "response": upload_response.json()
             }
             
@@ -147,38 +502,348 @@ class OpenWebUIClient:
                 "error": str(e)
             }
             
-    def create_chat(
+    def upload_documents(
+        self,
+        file_paths: Sequence[str],
+        use_cache: bool = True,
+        progress: Optional[ProgressCallback] = None,
+        server: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Upload several documents to one server concurrently.
+        
+        At most ``upload.parallel`` files are sent at once (the request
+        limiter may allow fewer), so the total time approaches that of the
+        slowest file rather than the sum. A failed file does not stop the
+        others.
+        
+        Args:
+            file_paths: Paths of the files to upload
+            use_cache: Consult the upload cache before uploading
+            progress: Called with (bytes_sent, total_bytes) summed over all files
+            server: Server to upload to; the pinned server or the router's
+                pick if omitted
+            
+        Returns:
+            One upload_document result per file, in order, each with its
+            ``path`` and ``upload_s``
+        """
+        paths = list(file_paths)
+        sizes = []
+        for path in paths:
+            try:
+                sizes.append(os.path.getsize(path))
+            except OSError:
+                sizes.append(0)
+        # Until a file's upload starts, its size stands in for its body length
+        sent = [0] * len(paths)
+        lock = threading.Lock()
+
+        def upload(i: int, target: str) -> Dict[str, Any]:
+            def report(done: int, total: int) -> None:
+                with lock:
+                    sent[i], sizes[i] = done, total
+                    progress(sum(sent), sum(sizes))
+
+            started = time.perf_counter()
+            with log_context(file=paths[i]):
+                result = self.upload_document(paths[i], use_cache=use_cache, progress=report if progress else None, server=target)
+            result["path"] = paths[i]
+            result["upload_s"] = round(time.perf_counter() - started, 3)
+            return result
+
+        with self.pinned(server) as server:
+            workers = max(1, min(len(paths), int(self.uploader.settings['parallel'])))
+            if workers == 1:
+                return [upload(i, server) for i in range(len(paths))]
+            # Pins are per thread, so every upload names the server explicitly
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload') as pool:
+                return list(pool.map(lambda i: upload(i, server), range(len(paths))))
+
+    def list_knowledge(self) -> List[Dict[str, Any]]:
+        """List the knowledge collections the API key can see.
+        
+        Returns:
+            Collection dictionaries (id, name, description, ...)
+        """
+        result = self._make_request('GET', '/api/v1/knowledge/')
+        if isinstance(result, dict):
+            return result.get('items') or result.get('data') or []
+        return result or []
+
+    def get_knowledge(self, knowledge_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch one knowledge collection with its files.
+        
+        Args:
+            knowledge_id: ID of the collection
+            
+        Returns:
+            The collection, or None if the server does not have it
+        """
+        try:
+            response = self._routed(
+                f"/api/v1/knowledge/{knowledge_id}",
+                lambda url: self.transport.get(url, headers=self.headers)
+            )
+            if response.status_code == 404:
+                response.close()
+                return None
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"API request failed: {str(e)}")
+            raise OpenWebUIError(f"API request failed: {str(e)}")
+
+    @staticmethod
+    def knowledge_file_ids(collection: Dict[str, Any]) -> List[str]:
+        """IDs of the files in a collection returned by get_knowledge."""
+        files = collection.get('files')
+        if files is not None:
+            return [f['id'] for f in files if f.get('id')]
+        return list((collection.get('data') or {}).get('file_ids') or [])
+
+    def create_knowledge(self, name: str, description: str = '') -> Dict[str, Any]:
+        """Create a knowledge collection.
+        
+        Args:
+            name: Collection name shown in OpenWebUI
+            description: Collection description
+            
+        Returns:
+            The new collection
+        """
+        return self._make_request('POST', '/api/v1/knowledge/create', json={"name": name, "description": description})
+
+    def _knowledge_file(self, action: str, knowledge_id: str, file_id: str) -> Dict[str, Any]:
+        try:
+            self._make_request('POST', f'/api/v1/knowledge/{knowledge_id}/file/{action}', json={"file_id": file_id})
+            return {"success": True, "file_id": file_id}
+        except OpenWebUIError as e:
+            return {"success": False, "file_id": file_id, "error": str(e)}
+
+    def add_knowledge_file(self, knowledge_id: str, file_id: str) -> Dict[str, Any]:
+        """Add an uploaded file to a knowledge collection.
+        
+        Args:
+            knowledge_id: ID of the collection
+            file_id: ID returned by upload_document
+            
+        Returns:
+            ``success`` and, on failure, ``error``
+        """
+        return self._knowledge_file('add', knowledge_id, file_id)
+
+    def remove_knowledge_file(self, knowledge_id: str, file_id: str) -> Dict[str, Any]:
+        """Remove a file from a knowledge collection.
+        
+        Args:
+            knowledge_id: ID of the collection
+            file_id: ID of the file in the collection
+            
+        Returns:
+            ``success`` and, on failure, ``error``
+        """
+        return self._knowledge_file('remove', knowledge_id, file_id)
+
+    def _cache_lookup(self, key: Optional[str], use_cache: bool) -> Optional[Dict[str, Any]]:
+        """Consult the completion cache unless it is off or bypassed."""
+        if key is None:
+            return None
+        if not use_cache:
+            self.completion_cache.bypassed()
+            return None
+        return self.completion_cache.get(key)
+
+    def complete(self, model: str, messages: List[Dict[str, Any]], use_cache: bool = True) -> str:
+        """Run a chat completion without attachments and return the reply text.
+        
+        Args:
+            model: Model to use
+            messages: Chat messages in OpenAI format
+            use_cache: Return a stored reply to the same request if there is
+                one; when False the reply is fetched and stored again
+            
+        Returns:
+            Content of the first choice
+        """
+        key = None
+        if self.completion_cache:
+            key = completion_key(model, messages)
+            cached = self._cache_lookup(key, use_cache)
+            if cached:
+                return cached["content"]
+
+        response = self._make_request('POST', '/api/chat/completions', json={
+            "model": model,
+            "messages": messages
+        })
+        try:
+            content = response["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError):
+            raise OpenWebUIError("Invalid completion response format")
+        if key:
+            self.completion_cache.put(key, model, {"content": content})
+        return content
+
+    def stream_chat(
         self,
         model: str,
-        file_path: str
+        messages: List[Dict[str, Any]],
+        file_ids: Optional[List[str]] = None,
+        on_token: Optional[TokenCallback] = None
+    ) -> ChatStream:
+        """Start a streamed chat completion.
+        
+        Args:
+            model: Model to use for chat
+            messages: Chat messages in OpenAI format
+            file_ids: Uploaded files to attach
+            on_token: Called with every content delta as it arrives
+            
+        Returns:
+            ChatStream yielding tokens; its ``stats`` hold time to first
+            token and tokens/sec once consumed
+        """
+        chat_data = {
+            "model": model,
+            "messages": messages,
+            "stream": True
+        }
+        if file_ids:
+            chat_data["file_ids"] = list(file_ids)
+
+        headers = self.headers.copy()
+        headers['Accept'] = 'text/event-stream'
+
+        started = time.perf_counter()
+        try:
+            response = self._routed(
+                '/api/chat/completions',
+                lambda url: self.transport.post(url, headers=headers, json=chat_data, stream=True),
+                stream=True
+            )
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"API request failed: {str(e)}")
+            raise OpenWebUIError(f"API request failed: {str(e)}")
+        try:
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            response.close()
+            self.logger.error(f"API request failed: {str(e)}")
+            raise OpenWebUIError(f"API request failed: {str(e)}")
+
+        return ChatStream(response, on_token=on_token, started=started)
+
+    @staticmethod
+    def _chat_messages(prompt: Optional[str]) -> List[Dict[str, Any]]:
+        return [{"role": "user", "content": prompt}] if prompt else []
+
+    def _cached_chat(self, entry: Dict[str, Any], stream: bool, on_token: Optional[TokenCallback]) -> Dict[str, Any]:
+        """Chat result rebuilt from a completion cache entry."""
+        result = {**entry, "success": True, "completion_cached": True}
+        if stream:
+            content = entry["response"]["choices"][0]["message"]["content"] or ""
+            if on_token and content:
+                on_token(content)
+            result["content"] = content
+            result["stats"] = {"cached": True}
+        return result
+
+    def _store_chat(self, key: Optional[str], model: str, result: Dict[str, Any]) -> None:
+        if key and result.get("success"):
+            self.completion_cache.put(key, model, {
+                "server": result.get("server"),
+                "file_id": result.get("file_id"),
+                "file_ids": result.get("file_ids"),
+                "chat_id": result.get("chat_id"),
+                "response": result.get("response")
+            })
+
+    def chat_with_files(
+        self,
+        model: str,
+        file_ids: List[str],
+        prompt: Optional[str] = None,
+        stream: bool = False,
+        on_token: Optional[TokenCallback] = None,
+        use_cache: bool = True,
+        server: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Create new chat with file reference.
+        """Create new chat referencing files that are already uploaded.
         
         Args:
             model: Model to use for chat
-            file_path: Path to transcript file
+            file_ids: IDs returned by upload_document
+            prompt: Optional user message sent along with the files
+            stream: Stream the reply token by token instead of waiting for
+                the full response body
+            on_token: Called with every token in streaming mode
+            use_cache: Return a stored reply to the same model, prompt and
+                files if there is one; when False the reply is fetched and
+                stored again
+            server: Server holding the files (``server`` from
+                upload_document); the pinned server or the router's pick if
+                omitted
             
         Returns:
-            Chat session information
+            Chat session information; in streaming mode also the reply
+            ``content`` and timing ``stats``. ``completion_cached`` is set
+            when the reply came from the completion cache.
         """
+        with self.pinned(server) as server:
+            key = None
+            if self.completion_cache:
+                # File IDs stand in for content: an uploaded file never changes
+                key = completion_key(model, self._chat_messages(prompt), list(file_ids))
+                cached = self._cache_lookup(key, use_cache)
+                if cached:
+                    return self._cached_chat(cached, stream, on_token)
+            result = self._chat(model, file_ids, prompt, stream, on_token)
+            result["server"] = server
+        self._store_chat(key, model, result)
+        return result
+
+    def _chat(
+        self,
+        model: str,
+        file_ids: List[str],
+        prompt: Optional[str],
+        stream: bool,
+        on_token: Optional[TokenCallback]
+    ) -> Dict[str, Any]:
+        """Send the chat completion for chat_with_files and create_chat."""
         try:
-            # First upload the document
-            upload_result = self.upload_document(file_path)
-            if not upload_result["success"]:
-                return upload_result
-                
+            messages = self._chat_messages(prompt)
+
+            if stream:
+                chat_stream = self.stream_chat(model, messages, file_ids, on_token=on_token)
+                content = chat_stream.consume()
+                return {
+                    "success": True,
+                    "file_id": file_ids[0] if file_ids else None,
+                    "file_ids": list(file_ids),
+                    "chat_id": chat_stream.chat_id,
+                    "content": content,
+                    "stats": chat_stream.stats,
+                    "response": {
+                        "id": chat_stream.chat_id,
+                        "model": model,
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]
+                    }
+                }
+
             # Create a new chat using OpenWebUI endpoint
             chat_data = {
                 "model": model,
-                "messages": [],  # Empty initial messages
-                "file_ids": [upload_result["file_id"]]
+                "messages": messages,
+                "file_ids": list(file_ids)
             }
             
             chat_response = self._make_request('POST', '/api/chat/completions', json=chat_data)
             
             return {
                 "success": True,
-                "file_id": upload_result["file_id"],
+                "file_id": file_ids[0] if file_ids else None,
+                "file_ids": list(file_ids),
                 "chat_id": chat_response.get("id"),
                 "response": chat_response
             }
@@ -189,3 +854,89 @@ class OpenWebUIClient:
                 "success": False,
                 "error": str(e)
             }
+
+    def create_chat(
+        self,
+        model: str,
+        file_path: Union[str, Sequence[str]],
+        prompt: Optional[str] = None,
+        stream: bool = False,
+        on_token: Optional[TokenCallback] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """Create new chat with file reference.
+        
+        Several files are uploaded concurrently (see upload_documents) and
+        all attached to the one chat. Files that fail to upload are listed
+        in ``failed``; the chat goes ahead with the rest, and fails only if
+        none was uploaded.
+        
+        With the completion cache enabled, a stored reply to the same model,
+        prompt and file content is returned without uploading anything.
+        
+        The uploads and the chat go to the same server. If that server fails
+        in between, the files are uploaded again to the next healthy one.
+        
+        Args:
+            model: Model to use for chat
+            file_path: Path to transcript file, or a list of paths
+            prompt: Optional user message sent along with the files
+            stream: Stream the reply token by token instead of waiting for
+                the full response body
+            on_token: Called with every token in streaming mode
+            use_cache: Consult the completion cache; when False the reply
+                is fetched and stored again
+            
+        Returns:
+            Chat session information with ``file_ids`` and a per-file
+            ``files`` list (path, success, file_id, error, upload_s); in
+            streaming mode also the reply ``content`` and timing ``stats``.
+            ``completion_cached`` is set when the reply came from the
+            completion cache. ``server`` is the server that answered.
+        """
+        paths = [file_path] if isinstance(file_path, str) else list(file_path)
+        if not paths:
+            return {"success": False, "error": "No files to attach"}
+
+        key = None
+        if self.completion_cache:
+            try:
+                digests = [file_sha256(path) for path in paths]
+            except OSError as e:
+                self.logger.error(f"Failed to create chat: {str(e)}")
+                return {"success": False, "error": str(e)}
+            key = completion_key(model, self._chat_messages(prompt), digests)
+            cached = self._cache_lookup(key, use_cache)
+            if cached:
+                return self._cached_chat(cached, stream, on_token)
+
+        outer = getattr(self._pin, 'endpoint', None)
+        tried: List[str] = []
+        while True:
+            with self.pinned(exclude=tried) as server:
+                # First upload the documents
+                uploads = self.upload_documents(paths, server=server)
+                file_ids = [u["file_id"] for u in uploads if u["success"]]
+                failed = [u for u in uploads if not u["success"]]
+                if file_ids:
+                    result = self._chat(model, file_ids, prompt, stream, on_token)
+                else:
+                    result = {"success": False, "error": failed[0]["error"]}
+                result["server"] = server
+            tried.append(server)
+            if result["success"] or outer or self.router.is_healthy(server) or not self.router.has_alternative(tried):
+                break
+            self.logger.warning(f"{server} failed while processing {len(paths)} file(s); starting over on another server")
+
+        result["file_ids"] = file_ids
+        result["files"] = [
+            {k: u.get(k) for k in ("path", "success", "file_id", "cached", "error", "upload_s")} for u in uploads
+        ]
+        if failed:
+            result["failed"] = [u["path"] for u in failed]
+            if result["success"]:
+                self.logger.warning(f"Chat created without {len(failed)} of {len(paths)} files that failed to upload")
+        # A chat missing some of its files is not the answer to the full request
+        if not failed:
+            self._store_chat(key, model, result)
+        return result
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Sync entry point: mirror the transcript folder into an OpenWebUI knowledge collection."""
+
+import argparse
+import json
+import os
+import sys
+from dotenv import load_dotenv
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
+
+# Load environment variables from .env file
+load_dotenv()
+
+from src.knowledge_sync import KnowledgeSync
+from src.utils.config import Config
+from src.utils.logger import setup_logging
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Upload new and changed transcripts to a knowledge collection and remove deleted ones.")
+    parser.add_argument('--folder', help="Folder to sync (default: paths.transcript_folder)")
+    parser.add_argument('--collection', help="Knowledge collection name (default: knowledge.collection)")
+    parser.add_argument('--pattern', help="File name pattern (default: knowledge.pattern, then batch.pattern)")
+    parser.add_argument('--workers', type=int, help="Files uploaded in parallel (default: knowledge.workers)")
+    parser.add_argument('--dry-run', action='store_true', help="Only list what would be uploaded and removed")
+    parser.add_argument('--output', help="Write the JSON summary to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    config = Config()
+    # Human-readable logs go to stderr so stdout stays machine-readable;
+    # the JSON log file is written by a background thread
+    setup_logging(config.get_log_config(), console=sys.stderr)
+    sync = KnowledgeSync(
+        config,
+        folder=args.folder,
+        collection=args.collection,
+        pattern=args.pattern,
+        workers=args.workers
+    )
+    try:
+        summary = sync.run(dry_run=args.dry_run)
+    finally:
+        sync.close()
+
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0 if summary.get("failed", 0) == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
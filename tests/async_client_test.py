@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Run AsyncOpenWebUIClient against the local mock server."""
+
+import asyncio
+import os
+import threading
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+import src.async_webui_client as async_webui_client
+from src.async_webui_client import AsyncOpenWebUIClient
+from src.mock_server import MockOpenWebUIServer
+from src.utils.config import Config
+
+
+def _config(url):
+    config = Config()
+    config.webui_url = url
+    return config
+
+
+def test_list_models():
+    with MockOpenWebUIServer() as server:
+        async def run():
+            async with AsyncOpenWebUIClient(_config(server.url)) as client:
+                return await client.list_models()
+
+        assert asyncio.run(run()) == [{"id": "stand-in-model"}]
+
+
+def test_concurrent_chats_are_bounded(tmp_path):
+    paths = []
+    for i in range(20):
+        path = tmp_path / f"meeting_{i}.txt"
+        path.write_text(f"Transcript {i}\n")
+        paths.append(str(path))
+
+    with MockOpenWebUIServer(latency=0.1) as server:
+        async def run():
+            async with AsyncOpenWebUIClient(_config(server.url), max_concurrency=8) as client:
+                return await client.create_chats("stand-in-model", paths)
+
+        results = asyncio.run(run())
+
+        assert all(r["success"] for r in results)
+        assert len({r["file_id"] for r in results}) == len(paths)
+        # Every chat carries the file uploaded for it
+        sent = [c["file_ids"] for c in server.completions]
+        assert len(sent) == len(paths)
+        for i, result in enumerate(results):
+            assert sent.count([result["file_id"]]) == 1
+            body = server.uploads[result["file_id"]].decode()
+            assert f'filename="meeting_{i}.txt"' in body and f"Transcript {i}\n" in body
+        # Requests overlap, but never more than the limit
+        assert 1 < server.max_in_flight <= 8
+        assert server.stats["requests"] == 2 * len(paths)
+
+
+def test_files_are_read_only_when_an_upload_slot_is_free(tmp_path, monkeypatch):
+    paths = []
+    for i in range(30):
+        path = tmp_path / f"meeting_{i}.txt"
+        path.write_text(f"Transcript {i}\n" * 1000)
+        paths.append(str(path))
+    held = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+    read_bytes = async_webui_client._read_bytes
+
+    def counting_read(file_path):
+        with lock:
+            held["now"] += 1
+            held["peak"] = max(held["peak"], held["now"])
+        return read_bytes(file_path)
+
+    monkeypatch.setattr(async_webui_client, '_read_bytes', counting_read)
+
+    with MockOpenWebUIServer(latency=0.05) as server:
+        async def run():
+            async with AsyncOpenWebUIClient(_config(server.url), max_concurrency=3) as client:
+                make_request = client._make_request
+
+                async def release_after_upload(method, endpoint, **kwargs):
+                    try:
+                        return await make_request(method, endpoint, **kwargs)
+                    finally:
+                        if endpoint == '/api/files/':
+                            with lock:
+                                held["now"] -= 1
+
+                client._make_request = release_after_upload
+                return await client.upload_documents(paths)
+
+        results = asyncio.run(run())
+
+    assert all(r["success"] for r in results) and len(server.uploads) == 30
+    # Files in memory never exceed the concurrency limit
+    assert held["peak"] <= 3
+
+
+def test_upload_failure_is_reported(tmp_path):
+    with MockOpenWebUIServer() as server:
+        async def run():
+            async with AsyncOpenWebUIClient(_config(server.url)) as client:
+                return await client.upload_document(str(tmp_path / "missing.txt"))
+
+        result = asyncio.run(run())
+        assert result["success"] is False
+        assert "error" in result
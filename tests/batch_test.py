@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""BatchRunner and batch.py against the mock server: worker pool, failures, CLI and JSON summary."""
+
+import json
+import os
+import sys
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import batch as batch_cli
+from src.batch import BatchRunner
+from src.mock_server import MockOpenWebUIServer
+from src.utils.config import Config
+from src.utils.logger import shutdown_logging
+
+
+def _config(url):
+    config = Config()
+    config.webui_url = url
+    config.override('logging', {'file': None})
+    config.override('upload', {'progress': False, 'max_attempts': 1})
+    config.override('completion_cache', {'enabled': False})
+    config.override('planner', {'enabled': False})
+    return config
+
+
+def _transcripts(folder, count):
+    folder.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        (folder / f"meeting-{i:02d}.txt").write_text(f"Speaker {i}: weekly review\n")
+    (folder / "notes.md").write_text("not a transcript")
+    return folder
+
+
+def test_files_are_processed_over_the_worker_pool(tmp_path):
+    folder = _transcripts(tmp_path / "transcripts", 8)
+    with MockOpenWebUIServer(latency=0.1) as server:
+        runner = BatchRunner(_config(server.url), workers=4, preprocess=False)
+        files = runner.collect_files(folder=str(folder))
+        summary = runner.run("stand-in-model", files)
+        runner.close()
+
+    assert [os.path.basename(f) for f in files] == [f"meeting-{i:02d}.txt" for i in range(8)]
+    assert (summary["total"], summary["succeeded"], summary["failed"], summary["workers"]) == (8, 8, 0, 4)
+    assert [entry["file"] for entry in summary["files"]] == files
+    for entry in summary["files"]:
+        assert entry["file_id"] in server.uploads and entry["chat"]["choices"] and entry["error"] is None
+    # Each worker has one request in flight at a time
+    assert 1 < server.max_in_flight <= 4
+
+
+def test_failures_are_reported_per_file(tmp_path):
+    folder = _transcripts(tmp_path / "transcripts", 3)
+    with MockOpenWebUIServer(error_rate=1.0) as server:
+        runner = BatchRunner(_config(server.url), workers=2, preprocess=False)
+        summary = runner.run("stand-in-model", runner.collect_files(folder=str(folder)) + [str(folder / "gone.txt")])
+        runner.close()
+
+    assert summary["succeeded"] == 0 and summary["failed"] == 4
+    assert all(not entry["success"] and entry["error"] and entry["chat"] is None for entry in summary["files"])
+    assert "Injected server error" in summary["files"][0]["error"]
+    assert "No such file" in summary["files"][-1]["error"]
+    assert not server.completions
+
+
+def test_parse_args():
+    args = batch_cli.parse_args([])
+    assert args.pattern is None and args.workers is None and args.preprocess is None
+    assert args.use_cache and not args.map_reduce and not args.combine and args.stream is None
+
+    args = batch_cli.parse_args(['2024/*.txt', '--workers', '3', '--no-preprocess', '--no-completion-cache', '--stream'])
+    assert args.pattern == '2024/*.txt' and args.workers == 3
+    assert args.preprocess is False and args.use_cache is False and args.stream is True
+    assert batch_cli.parse_args(['--preprocess']).preprocess is True
+
+
+def _main(monkeypatch, server, argv):
+    monkeypatch.setattr(batch_cli, 'Config', lambda: _config(server.url))
+    try:
+        return batch_cli.main(argv)
+    finally:
+        shutdown_logging()
+
+
+def test_cli_writes_json_summary(tmp_path, monkeypatch, capsys):
+    folder = _transcripts(tmp_path / "transcripts", 3)
+    output = tmp_path / "summary.json"
+    with MockOpenWebUIServer() as server:
+        code = _main(monkeypatch, server, [
+            '--folder', str(folder), '--model', 'stand-in-model', '--workers', '2',
+            '--no-preprocess', '--output', str(output)
+        ])
+        assert code == 0 and capsys.readouterr().out == ""
+        summary = json.loads(output.read_text())
+        assert summary["model"] == "stand-in-model" and summary["workers"] == 2
+        assert summary["succeeded"] == 3 and len(server.completions) == 3
+
+        # Without --output the summary is the only thing on stdout
+        code = _main(monkeypatch, server, ['meeting-0*.txt', '--folder', str(folder), '--model', 'stand-in-model', '--no-preprocess', '--combine'])
+        combined = json.loads(capsys.readouterr().out)
+        assert code == 0 and combined["combined"] and combined["chat"]["success"]
+        assert len(combined["chat"]["file_ids"]) == 3
+
+
+def test_cli_exit_code_reports_failures(tmp_path, monkeypatch, capsys):
+    folder = _transcripts(tmp_path / "transcripts", 2)
+    with MockOpenWebUIServer(error_rate=1.0) as server:
+        code = _main(monkeypatch, server, ['--folder', str(folder), '--model', 'stand-in-model', '--no-preprocess'])
+    summary = json.loads(capsys.readouterr().out)
+    assert code == 1 and summary["failed"] == 2
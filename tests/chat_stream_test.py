@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Streamed chat completions: SSE parsing and time-to-first-token stats."""
+
+import os
+import time
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.mock_server import MockOpenWebUIServer
+from src.chat_stream import iter_sse_data
+from src.utils.config import Config
+from src.webui_client import OpenWebUIClient
+
+
+def test_sse_parser_handles_split_chunks():
+    body = (
+        b": keep-alive\n\n"
+        b"data: {\"a\": 1}\r\n\r\n"
+        b"event: message\ndata: line one\ndata: line two\n\n"
+        b"data: [DONE]\n\n"
+    )
+    # Feed one byte at a time to exercise every split point
+    events = list(iter_sse_data(body[i:i + 1] for i in range(len(body))))
+    assert events == ['{"a": 1}', "line one\nline two", "[DONE]"]
+
+
+def test_stream_chat_yields_tokens_as_they_arrive():
+    with MockOpenWebUIServer(token_delay=0.1) as server:
+        config = Config()
+        config.webui_url = server.url
+        with OpenWebUIClient(config) as client:
+            arrivals = []
+            stream = client.stream_chat("stand-in-model", [{"role": "user", "content": "hi"}])
+            for token in stream:
+                arrivals.append(time.perf_counter())
+
+        assert stream.content == "Summary: all good."
+        # The first token must not wait for the rest of the body
+        assert arrivals[-1] - arrivals[0] >= 0.3
+        assert stream.stats["ttft_s"] < 0.3
+        assert stream.stats["completion_tokens"] == 5
+        assert server.completions[-1]["stream"] is True
+
+
+def test_create_chat_streams_to_callback(tmp_path):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_text("Alice: hello\n")
+
+    with MockOpenWebUIServer() as server:
+        config = Config()
+        config.webui_url = server.url
+        config.override('upload_cache', {'enabled': False})
+        with OpenWebUIClient(config) as client:
+            tokens = []
+            result = client.create_chat("stand-in-model", str(transcript), prompt="Summarize", stream=True, on_token=tokens.append)
+
+        assert result["success"]
+        assert "".join(tokens) == result["content"] == "Summary: all good."
+        assert result["stats"]["ttft_s"] is not None
+        request = server.completions[-1]
+        assert request["file_ids"] == [result["file_id"]]
+        assert request["messages"] == [{"role": "user", "content": "Summarize"}]
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Completion cache: instant repeats, persistence, bypass, expiry and eviction."""
+
+import os
+import time
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.completion_cache import CompletionCache, completion_key
+from src.mock_server import MockOpenWebUIServer
+from src.utils.config import Config
+from src.webui_client import OpenWebUIClient
+
+
+def _client(url):
+    config = Config()
+    config.webui_url = url
+    config.override('upload', {'progress': False})
+    return OpenWebUIClient(config)
+
+
+def test_repeated_chat_is_served_from_cache(tmp_path):
+    path = tmp_path / "meeting.txt"
+    path.write_text("Alice: The budget is approved.\n")
+    with MockOpenWebUIServer() as server:
+        with _client(server.url) as client:
+            first = client.create_chat("stand-in-model", str(path), prompt="Summarize")
+            second = client.create_chat("stand-in-model", str(path), prompt="  Summarize\r\n")
+            tokens = []
+            streamed = client.create_chat("stand-in-model", str(path), prompt="Summarize", stream=True, on_token=tokens.append)
+            stats = client.completion_cache.stats()
+
+        assert first["success"] and not first.get("completion_cached")
+        assert second["completion_cached"] and second["response"] == first["response"]
+        assert streamed["completion_cached"] and "".join(tokens) == streamed["content"]
+        assert len(server.completions) == 1 and len(server.uploads) == 1
+        assert stats["memory_hits"] == 2 and stats["misses"] == 1
+
+        # A new process reads the reply back from disk
+        with _client(server.url) as client:
+            again = client.create_chat("stand-in-model", str(path), prompt="Summarize")
+            assert client.completion_cache.stats()["disk_hits"] == 1
+        assert again["completion_cached"] and len(server.completions) == 1
+
+        # Changed content or a bypass goes to the server
+        path.write_text("Alice: The budget is rejected.\n")
+        with _client(server.url) as client:
+            assert not client.create_chat("stand-in-model", str(path), prompt="Summarize").get("completion_cached")
+            assert not client.create_chat("stand-in-model", str(path), prompt="Summarize", use_cache=False).get("completion_cached")
+            assert client.completion_cache.stats()["bypassed"] == 1
+        assert len(server.completions) == 3
+
+
+def test_complete_is_cached(tmp_path):
+    with MockOpenWebUIServer() as server:
+        with _client(server.url) as client:
+            messages = [{"role": "user", "content": "Summarize: budget approved"}]
+            assert client.complete("stand-in-model", messages) == client.complete("stand-in-model", messages)
+        assert len(server.completions) == 1
+
+
+def test_ttl_expiry(tmp_path):
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), {'ttl': 0.05})
+    key = completion_key("m", [{"role": "user", "content": "hi"}])
+    cache.put(key, "m", {"content": "hello"})
+    assert cache.get(key) == {"content": "hello"}
+    time.sleep(0.1)
+    assert cache.get(key) is None
+    assert cache.evict() == 1
+    cache.close()
+
+
+def test_size_eviction_drops_least_recently_used(tmp_path):
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), {'max_disk_mb': 0.002, 'memory_entries': 0})
+    reply = {"content": "x" * 800}
+    for key in ("a", "b"):
+        cache.put(key, "m", reply)
+    assert cache.get("a") == reply  # b is now the least recently used
+    cache.put("c", "m", reply)
+    assert cache.get("b") is None
+    assert cache.get("a") == reply and cache.get("c") == reply
+    assert cache.stats()["evicted"] == 1
+    cache.close()
+
+
+def test_key_does_not_depend_on_server_order(tmp_path):
+    path = tmp_path / "meeting.txt"
+    path.write_text("Alice: The budget is approved.\n")
+    messages = [{"role": "user", "content": "Summarize: budget approved"}]
+    with MockOpenWebUIServer() as first, MockOpenWebUIServer() as second:
+        with _client([first.url, second.url]) as client:
+            answered = client.create_chat("stand-in-model", str(path), prompt="Summarize")
+            client.complete("stand-in-model", messages)
+            by_id = client.chat_with_files("stand-in-model", answered["file_ids"], prompt="Summarize", server=answered["server"])
+
+        # Same requests with the servers listed the other way round
+        with _client([second.url, first.url]) as client:
+            assert client.create_chat("stand-in-model", str(path), prompt="Summarize")["completion_cached"]
+            client.complete("stand-in-model", messages)
+
+        assert not answered.get("completion_cached") and not by_id.get("completion_cached")
+        assert len(first.completions) + len(second.completions) == 3
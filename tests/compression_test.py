@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Compressed request bodies, fallback and per-server settings."""
+
+import json
+import os
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.compression import GZIP, IDENTITY, CompressionPolicy, parse_accept_encoding
+from src.mock_server import MockOpenWebUIServer
+from src.transport import HTTPTransport
+from src.utils.config import Config
+from src.webui_client import OpenWebUIClient
+
+TRANSCRIPT = "[00:01:02] Speaker 2: Let's review the action items from last week.\n" * 400
+
+
+def _client(url, compression):
+    config = Config()
+    config.webui_url = url
+    config.override('upload', {'progress': False})
+    config.override('upload_cache', {'enabled': False})
+    config.override('webui.compression', compression)
+    return OpenWebUIClient(config)
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("identity;q=0.1, gzip, zstd;q=0.5, br;q=0") == ['gzip', 'zstd', 'identity']
+    assert parse_accept_encoding(None) == []
+
+
+def test_uploads_and_json_bodies_are_compressed(tmp_path):
+    path = tmp_path / "meeting.txt"
+    path.write_text(TRANSCRIPT)
+    with MockOpenWebUIServer() as server:
+        with _client(server.url, {'encoding': GZIP}) as client:
+            result = client.create_chat("stand-in-model", str(path), prompt="Summarize")
+            assert result["success"]
+            long_prompt = [{"role": "user", "content": TRANSCRIPT}]
+            client.complete("stand-in-model", long_prompt)
+            stats = client.compression.stats()
+
+        body = server.uploads[result["file_id"]]
+        assert TRANSCRIPT.encode() in body
+        assert server.completions[-1]["messages"] == long_prompt
+        # The upload and the long completion; the short chat request is sent as is
+        assert stats["compressed"] == 2 and stats["fallbacks"] == 0
+        assert stats["wire_bytes"] * 5 < stats["raw_bytes"]
+        assert server.stats["bytes_received"] * 3 < server.stats["bytes_decoded"]
+
+
+def test_refused_encoding_falls_back_and_is_remembered(tmp_path):
+    path = tmp_path / "meeting.txt"
+    path.write_text(TRANSCRIPT)
+    with MockOpenWebUIServer(accept_encodings=[]) as server:
+        with _client(server.url, {'encoding': 'auto'}) as client:
+            first = client.upload_document(str(path))
+            second = client.upload_document(str(path))
+            state_path = client.compression.state_path
+        assert first["success"] and second["success"]
+        assert server.stats["rejected_encodings"] == 1
+        assert TRANSCRIPT.encode() in server.uploads[second["file_id"]]
+
+        # A new client starts from what was learned
+        with open(state_path) as f:
+            assert json.load(f)[server.url]["encoding"] == IDENTITY
+        with _client(server.url, {'encoding': 'auto'}) as client:
+            assert client.compression.encoding_for(server.url + "/api/files/") is None
+
+
+def test_415_can_offer_another_encoding(tmp_path):
+    policy = CompressionPolicy({'encoding': 'auto'}, str(tmp_path / "compression.json"))
+    url = "http://example.test:3000/api/files/"
+    assert policy.rejected(url, 'zstd', "gzip;q=0.8, identity") == GZIP
+    assert policy.encoding_for(url) == GZIP
+    assert policy.rejected(url, GZIP, "identity") == IDENTITY
+    assert policy.encoding_for(url) is None
+
+
+def test_per_server_settings():
+    policy = CompressionPolicy({'encoding': GZIP, 'servers': {'http://slow.test:3000/': 'none'}})
+    assert policy.encoding_for("http://slow.test:3000/api/files/") is None
+    assert policy.encoding_for("http://fast.test:3000/api/files/") == GZIP
+
+
+def test_fallback_statuses_exclude_auth_and_not_found():
+    policy = CompressionPolicy({'encoding': GZIP, 'fallback_statuses': [400, 401, 403, 404, 415, 422]})
+    assert all(policy.refuses_encoding(status) for status in (400, 415, 422))
+    assert not any(policy.refuses_encoding(status) for status in (401, 403, 404, 500))
+
+
+def test_compression_is_off_by_default():
+    assert CompressionPolicy().encoding_for("http://192.168.0.40:3000/api/files/") is None
+
+
+def test_generic_400_falls_back_and_is_remembered(tmp_path):
+    path = tmp_path / "meeting.txt"
+    path.write_text(TRANSCRIPT)
+    long_prompt = [{"role": "user", "content": TRANSCRIPT}]
+    with MockOpenWebUIServer(accept_encodings=[], generic_400=True) as server:
+        with _client(server.url, {'encoding': 'auto'}) as client:
+            upload = client.upload_document(str(path))
+            reply = client.complete("stand-in-model", long_prompt)
+            chat = client.create_chat("stand-in-model", str(path), prompt="Summarize")
+            stats = client.compression.stats()
+            learned = client.compression.encoding_for(server.url + "/api/files/")
+
+    assert upload["success"] and chat["success"] and reply == "Summary: all good."
+    assert TRANSCRIPT.encode() in server.uploads[upload["file_id"]]
+    assert server.completions[0]["messages"] == long_prompt
+    # Only the first compressed body was refused; after that the server is known
+    assert server.stats["rejected_encodings"] == 1 and stats["fallbacks"] == 1
+    assert learned is None
+
+
+def test_not_found_is_not_resent_uncompressed():
+    policy = CompressionPolicy({'encoding': GZIP, 'fallback_statuses': [400, 404, 415]})
+    with MockOpenWebUIServer() as server:
+        transport = HTTPTransport(compression=policy)
+        response = transport.request('POST', f"{server.url}/api/missing", json={"text": TRANSCRIPT})
+        transport.close()
+    assert response.status_code == 404
+    assert server.stats["requests"] == 1 and policy.stats()["fallbacks"] == 0
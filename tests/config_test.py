@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Config snapshots, reloading, env expansion and debounced atomic writes."""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+import yaml
+
+from src.utils.config import Config, ConfigStore, expand_env, replace_scalar
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = """\
+models:
+  default: gpt-3.5-turbo  # Used when nothing else is chosen
+  last_used: gpt-4
+paths:
+  data_dir: ${TEST_DATA_DIR:-./data}
+  transcript_folder: ~/transcripts
+webui:
+  api_key: ${TEST_API_KEY}  # Loaded from the environment
+  url: http://localhost:3000/
+"""
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(SAMPLE)
+    return path
+
+
+def _store(path, **kwargs):
+    return ConfigStore(str(path), **{'write_delay': 0.05, 'check_interval': 0.0, **kwargs})
+
+
+def test_env_expansion(monkeypatch):
+    monkeypatch.setenv('TEST_API_KEY', 'secret')
+    monkeypatch.delenv('TEST_DATA_DIR', raising=False)
+    assert expand_env({"a": ["${TEST_API_KEY}", "x-${TEST_DATA_DIR:-def}-y", "${TEST_DATA_DIR}"]}) == {
+        "a": ["secret", "x-def-y", ""]
+    }
+
+
+def test_snapshot_is_immutable_and_expanded(config_file, monkeypatch):
+    monkeypatch.setenv('TEST_API_KEY', 'secret')
+    snapshot = _store(config_file).snapshot()
+    assert snapshot.api_key == 'secret'
+    assert snapshot.raw['webui']['api_key'] == '${TEST_API_KEY}'
+    assert snapshot.get('paths.data_dir') == './data'
+    with pytest.raises(TypeError):
+        snapshot.data['models']['default'] = 'other'
+    # Callers get copies they can change freely
+    section = snapshot.section('models')
+    section['default'] = 'other'
+    assert snapshot.default_model == 'gpt-3.5-turbo'
+
+
+def test_reload_on_file_change(config_file):
+    store = _store(config_file)
+    first = store.snapshot()
+    assert store.snapshot() is first
+
+    config_file.write_text(SAMPLE.replace('gpt-4', 'llama-3-70b'))
+    os.utime(config_file, ns=(first.mtime_ns + 10**9, first.mtime_ns + 10**9))
+    assert store.snapshot().last_used_model == 'llama-3-70b'
+
+
+def test_writes_are_batched_atomic_and_keep_comments(config_file, monkeypatch):
+    store = _store(config_file, write_delay=0.2)
+    writes = []
+    original = store._write
+    monkeypatch.setattr(store, '_write', lambda pending: writes.append(dict(pending)) or original(pending))
+
+    for model in ('a', 'b', 'c'):
+        store.set('models.last_used', model)
+    store.set('models.default', 'd')
+    # Visible at once, not on disk yet
+    assert store.snapshot().last_used_model == 'c'
+    assert 'last_used: gpt-4' in config_file.read_text()
+
+    time.sleep(0.4)
+    assert writes == [{'models.last_used': 'c', 'models.default': 'd'}]
+    text = config_file.read_text()
+    assert "  default: d  # Used when nothing else is chosen\n" in text
+    assert "  last_used: c\n" in text
+    assert "api_key: ${TEST_API_KEY}  # Loaded from the environment" in text
+    assert not [p for p in os.listdir(config_file.parent) if p.endswith('.tmp')]
+
+
+def test_non_scalar_values_fall_back_to_full_dump(config_file):
+    store = _store(config_file)
+    store.set('webui.transport', {'pool_maxsize': 20})
+    store.flush()
+    data = yaml.safe_load(config_file.read_text())
+    assert data['webui']['transport'] == {'pool_maxsize': 20}
+    assert data['webui']['api_key'] == '${TEST_API_KEY}'
+
+
+def test_concurrent_writers_do_not_lose_updates(config_file):
+    script = (
+        "import sys; sys.path.insert(0, sys.argv[1]); from src.utils.config import ConfigStore; "
+        "store = ConfigStore(sys.argv[2], write_delay=0); "
+        "[store.set(f'counters.{sys.argv[3]}', i) or store.flush() for i in range(20)]"
+    )
+    procs = [
+        subprocess.Popen([sys.executable, '-c', script, ROOT, str(config_file), name])
+        for name in ('a', 'b', 'c')
+    ]
+    for proc in procs:
+        assert proc.wait(timeout=60) == 0
+
+    data = yaml.safe_load(config_file.read_text())
+    assert data['counters'] == {'a': 19, 'b': 19, 'c': 19}
+    assert data['models']['default'] == 'gpt-3.5-turbo'
+
+
+def test_overrides_are_per_instance_and_not_saved(config_file):
+    config = Config(str(config_file))
+    config.webui_url = 'http://127.0.0.1:9999'
+    config.override('upload', {'progress': False})
+    assert config.get_webui_url() == 'http://127.0.0.1:9999'
+    assert config.get_upload_config() == {'progress': False}
+    assert Config(str(config_file)).get_webui_url() == 'http://localhost:3000'
+
+    config.set_last_used_model('mistral')
+    config.flush()
+    assert 'last_used: mistral' in config_file.read_text()
+    assert 'progress' not in config_file.read_text()
+
+
+def test_log_file_comes_from_paths_unless_overridden(config_file):
+    config = Config(str(config_file))
+    assert config.get_log_config()['file'].endswith(os.path.join('logs', 'automation.log'))
+
+    config.override('paths.log_file', 'var/app.log')
+    assert config.get_log_config()['file'] == os.path.join(config.base_dir, 'var', 'app.log')
+    config.override('logging', {'file': 'other.log'})
+    assert config.get_log_config()['file'] == os.path.join(config.base_dir, 'other.log')
+    config.override('logging', {'file': None})
+    assert config.get_log_config()['file'] is None
+
+
+def test_replace_scalar_only_touches_the_target():
+    text = "a:\n  b: 1\n  c:\n    b: 2\nb: 3\n"
+    assert replace_scalar(text, 'a.c.b', 5) == "a:\n  b: 1\n  c:\n    b: 5\nb: 3\n"
+    assert replace_scalar(text, 'a.c', 5) is None
+    assert replace_scalar(text, 'a.missing', 5) is None
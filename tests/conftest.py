@@ -0,0 +1,17 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+from src.utils.config import Config
+
+
+@pytest.fixture(autouse=True)
+def isolated_data_dir(tmp_path, monkeypatch):
+    """Keep caches and indexes written during tests out of the project's data dir."""
+    original = Config.__init__
+
+    def init(self, *args, **kwargs):
+        original(self, *args, **kwargs)
+        self.override('paths.data_dir', str(tmp_path / 'data'))
+
+    monkeypatch.setattr(Config, '__init__', init)
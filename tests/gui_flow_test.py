@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""GUI workflow: prefetch and upload overlap with the dialogs; background task status."""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.background import BackgroundTask
+from src.main import OpenWebUIAutomation
+from src.mock_server import MockOpenWebUIServer
+from src.utils.config import Config
+from src.utils.logger import shutdown_logging
+
+
+def test_background_task_reports_progress_and_failure():
+    release = threading.Event()
+
+    def upload(task):
+        task.stage("Uploading transcript")
+        task.progress(512 * 1024, 2 * 1024 * 1024)
+        release.wait(5)
+        return {"success": True, "file_id": "f1"}
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        task = BackgroundTask("Upload", pool, upload)
+        while "%" not in task.describe():
+            time.sleep(0.01)
+        assert task.describe() == "Uploading transcript... 25% of 2.0 MB" and not task.done()
+        release.set()
+        assert task.result(5)["file_id"] == "f1"
+        assert task.describe() == "Upload finished"
+
+        failed = BackgroundTask("Upload", pool, lambda task: {"success": False, "error": "HTTP 413"})
+        failed.result(5)
+        assert failed.describe() == "Upload failed: HTTP 413"
+
+
+def test_upload_runs_while_model_is_chosen(tmp_path, monkeypatch):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_text("Speaker 1: hello\n" * 200)
+    opened = []
+    monkeypatch.setattr('src.main.webbrowser.open', opened.append)
+
+    with MockOpenWebUIServer(latency=0.3) as server:
+        config = Config()
+        config.webui_url = server.url
+        config.override('logging', {'file': None})
+        config.override('completion_cache', {'enabled': False})
+        config.override('planner', {'enabled': False})
+        automation = OpenWebUIAutomation(config=config)
+        seen = {}
+
+        def select_model(models, status=None):
+            seen["models"] = [m["id"] for m in models]
+            seen["upload_running"] = not status.done()
+            return "stand-in-model"
+
+        automation.file_picker.pick_files = lambda: [str(transcript)]
+        automation._select_model = select_model
+        try:
+            automation.run()
+        finally:
+            automation.client.close()
+            shutdown_logging()
+
+    assert seen["models"] == ["stand-in-model"]
+    assert seen["upload_running"]
+    assert len(server.uploads) == 1 and len(server.completions) == 1
+    assert opened == [f"{server.url}/?model=stand-in-model"]
+
+
+def test_plan_runs_while_upload_is_in_flight(tmp_path, monkeypatch):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_text("Speaker 1: we reviewed the quarterly numbers\n" * 400)
+    opened = []
+    monkeypatch.setattr('src.main.webbrowser.open', opened.append)
+
+    with MockOpenWebUIServer() as server:
+        server.models = [{"id": "stand-in-model", "context_length": 2048}, {"id": "long-model", "context_length": 32768}]
+        config = Config()
+        config.webui_url = server.url
+        config.override('logging', {'file': None})
+        config.override('completion_cache', {'enabled': False})
+        automation = OpenWebUIAutomation(config=config)
+        planned = threading.Event()
+        upload_waited = []
+        plan, upload_documents = automation._plan, automation.client.upload_documents
+
+        def record_plan(file_path, model):
+            planned.set()
+            return plan(file_path, model)
+
+        def gated_upload(*args, **kwargs):
+            # The upload cannot finish before the plan; with the old order this times out
+            upload_waited.append(planned.wait(5))
+            return upload_documents(*args, **kwargs)
+
+        automation.file_picker.pick_files = lambda: [str(transcript)]
+        automation._select_model = lambda models, status=None: "stand-in-model"
+        automation._plan = record_plan
+        automation.client.upload_documents = gated_upload
+        try:
+            automation.run()
+        finally:
+            automation.client.close()
+            shutdown_logging()
+
+    assert upload_waited == [True]
+    assert server.completions[0]["model"] == "long-model"
+    assert opened == [f"{server.url}/?model=long-model"]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Durable job queue: states, backoff, dead-lettering and crash recovery."""
+
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.job_queue import CHAT, DEAD, DONE, PENDING, UPLOAD, JobQueue, JobRunner
+from src.mock_server import MockOpenWebUIServer
+from src.utils.config import Config
+from src.webui_client import OpenWebUIClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_backoff_and_dead_letter(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), {'max_attempts': 2, 'backoff_base': 0.2})
+    assert queue.enqueue(UPLOAD, "a", {"file": "a.txt"}) is not None
+    assert queue.enqueue(UPLOAD, "a", {"file": "a.txt"}) is None
+
+    job = queue.claim()
+    assert queue.claim() is None
+    assert queue.fail(job, "boom") == PENDING
+    # Backing off: not due yet
+    assert queue.claim() is None
+    assert 0 < queue.next_due_in() <= 0.2
+
+    time.sleep(0.25)
+    job = queue.claim()
+    assert job["attempts"] == 1
+    assert queue.fail(job, "boom again") == DEAD
+    status = queue.status()
+    assert status["depth"] == 0
+    assert status["dead"][0]["error"] == "boom again"
+
+    assert queue.retry_dead() == 1
+    assert queue.claim()["attempts"] == 0
+    queue.close()
+
+
+def test_crashed_process_jobs_are_recovered(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(db_path)
+    queue.enqueue(UPLOAD, "a", {"file": "a.txt"})
+
+    # A worker claims the job and dies without finishing it
+    script = (
+        "import os, sys; sys.path.insert(0, sys.argv[1]); from src.job_queue import JobQueue; "
+        "JobQueue(sys.argv[2]).claim(); os._exit(1)"
+    )
+    subprocess.run([sys.executable, '-c', script, ROOT, db_path], check=False)
+    assert queue.status()["states"]["running"] == 1
+    assert queue.claim() is None
+
+    assert queue.recover() == 1
+    job = queue.claim()
+    assert job["key"] == "a" and job["attempts"] == 0
+    queue.close()
+
+
+def test_runner_resumes_and_retries(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"meeting_{i}.txt"
+        path.write_text(f"Speaker {i}: hello\n")
+        paths.append(str(path))
+    missing = str(tmp_path / "gone.txt")
+
+    with MockOpenWebUIServer(error_rate=0.3, seed=7) as server:
+        config = Config()
+        config.webui_url = server.url
+        config.override('upload', {'progress': False, 'max_attempts': 1})
+        queue = JobQueue(str(tmp_path / "jobs.sqlite3"), {'backoff_base': 0.01, 'max_attempts': 10})
+        with OpenWebUIClient(config) as client:
+            runner = JobRunner(queue, client, "stand-in-model", workers=3)
+            assert runner.enqueue_files(paths + [missing]) == 6
+            # Enqueueing the same batch again adds nothing
+            assert runner.enqueue_files(paths) == 0
+
+            # Make one job fail permanently
+            queue.enqueue(UPLOAD, "missing", {"file": missing, "model": "stand-in-model", "prompt": None})
+            status = runner.run(poll_interval=0.05)
+
+        assert status["kinds"][UPLOAD][DONE] == 6
+        assert status["kinds"][CHAT][DONE] == 6
+        assert [d["key"] for d in status["dead"]] == ["missing"]
+        assert server.stats["errors_injected"] > 0
+        chat_file_ids = {c["file_ids"][0] for c in server.completions}
+        assert len(chat_file_ids) == 6
+        queue.close()
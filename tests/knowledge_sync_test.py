@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Knowledge collection sync: manifest diffing, parallel uploads, removals, no-op cost."""
+
+import os
+import time
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.knowledge_sync import KnowledgeSync, scan_tree
+from src.mock_server import MockOpenWebUIServer
+from src.utils.config import Config
+
+
+def _config(url):
+    config = Config()
+    config.webui_url = url
+    config.override('upload', {'progress': False, 'max_attempts': 1})
+    config.override('knowledge', {'collection': 'Weekly', 'pattern': '*.txt', 'workers': 4})
+    return config
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _collection(server):
+    (collection,) = server.knowledge.values()
+    return collection
+
+
+def test_sync_adds_updates_and_removes(tmp_path):
+    folder = tmp_path / "transcripts"
+    _write(folder / "a.txt", "Speaker 1: alpha\n")
+    _write(folder / "b.txt", "Speaker 1: beta\n")
+    _write(folder / "2024" / "c.txt", "Speaker 1: gamma\n")
+    _write(folder / "notes.md", "not a transcript")
+
+    with MockOpenWebUIServer() as server:
+        sync = KnowledgeSync(_config(server.url), folder=str(folder))
+        first = sync.run()
+        assert first["added"] == 3 and first["failed"] == 0
+        assert len(_collection(server)["file_ids"]) == 3
+
+        # Change one file, touch another without changing it, delete a third, add a fourth
+        _write(folder / "a.txt", "Speaker 1: alpha, revised\n")
+        os.utime(folder / "b.txt", ns=(0, 10 ** 9))
+        os.remove(folder / "2024" / "c.txt")
+        _write(folder / "d.txt", "Speaker 1: delta\n")
+        plan = sync.run(dry_run=True)
+        assert plan["to_add"] == ["d.txt"] and plan["to_check"] == ["a.txt", "b.txt"]
+        assert plan["to_remove"] == [os.path.join("2024", "c.txt")]
+
+        second = sync.run()
+        assert (second["added"], second["updated"], second["restamped"], second["removed"]) == (1, 1, 1, 2)
+        assert second["unchanged"] == 1 and second["failed"] == 0
+        file_ids = _collection(server)["file_ids"]
+        contents = sorted(server.uploads[file_id].decode() for file_id in file_ids)
+        assert len(file_ids) == 3 and any("alpha, revised" in body for body in contents)
+        assert not any("gamma" in body for body in contents)
+
+        # A file removed from the collection on the server is added back
+        file_ids.remove(file_ids[0])
+        assert sync.run()["updated"] == 1 and len(_collection(server)["file_ids"]) == 3
+        sync.close()
+
+
+def test_noop_sync_makes_one_request(tmp_path):
+    folder = tmp_path / "transcripts"
+    count = 10000
+    for i in range(count):
+        _write(folder / f"part{i % 20}" / f"meeting-{i}.txt", f"Speaker {i}\n")
+    assert len(scan_tree(str(folder), '*.txt')) == count
+
+    with MockOpenWebUIServer() as server:
+        sync = KnowledgeSync(_config(server.url), folder=str(folder))
+        # Pretend every file was synced earlier
+        collection = sync.client.create_knowledge("Weekly")
+        sync.manifest.set_collection(server.url, "Weekly", collection["id"])
+        rows = []
+        for path, signature in scan_tree(str(folder), '*.txt').items():
+            file_id = f"file-{path}"
+            server.uploads[file_id] = b""
+            server.knowledge[collection["id"]]["file_ids"].append(file_id)
+            rows.append((path, signature, "0" * 64, file_id))
+        sync.manifest.record(collection["id"], rows)
+
+        requests_before = server.stats["requests"]
+        started = time.perf_counter()
+        summary = sync.run()
+        elapsed = time.perf_counter() - started
+        sync.close()
+
+    assert summary["unchanged"] == count and summary["added"] == summary["updated"] == summary["removed"] == 0
+    assert server.stats["requests"] - requests_before == 1
+    assert elapsed < 3.0
+
+
+def test_identical_files_are_added_once(tmp_path):
+    folder = tmp_path / "transcripts"
+    for name in ("monday.txt", "copy-of-monday.txt", "again.txt"):
+        _write(folder / name, "Speaker 1: same meeting\n")
+    _write(folder / "tuesday.txt", "Speaker 1: other meeting\n")
+
+    with MockOpenWebUIServer(latency=0.05) as server:
+        sync = KnowledgeSync(_config(server.url), folder=str(folder))
+        added = []
+        add_knowledge_file = sync.client.add_knowledge_file
+
+        def record_add(collection_id, file_id):
+            added.append(file_id)
+            return add_knowledge_file(collection_id, file_id)
+
+        sync.client.add_knowledge_file = record_add
+        summary = sync.run()
+        sync.close()
+
+    assert summary["added"] == 4 and summary["failed"] == 0
+    # One upload and one add per distinct content
+    assert len(server.uploads) == 2 and len(added) == len(set(added)) == 2
+    assert sorted(_collection(server)["file_ids"]) == sorted(added)
+
+
+def test_failed_removal_of_old_version_is_retried(tmp_path):
+    folder = tmp_path / "transcripts"
+    _write(folder / "a.txt", "Speaker 1: first draft\n")
+
+    with MockOpenWebUIServer() as server:
+        sync = KnowledgeSync(_config(server.url), folder=str(folder))
+        assert sync.run()["added"] == 1
+        (old_id,) = _collection(server)["file_ids"]
+
+        _write(folder / "a.txt", "Speaker 1: final version\n")
+        remove_knowledge_file = sync.client.remove_knowledge_file
+        sync.client.remove_knowledge_file = lambda collection_id, file_id: {"success": False, "file_id": file_id, "error": "HTTP 500"}
+        failed = sync.run()
+        assert failed["updated"] == 1 and failed["failed"] == 1
+        assert old_id in _collection(server)["file_ids"]
+
+        sync.client.remove_knowledge_file = remove_knowledge_file
+        retried = sync.run()
+        sync.close()
+
+    assert retried["removed"] == 1 and retried["failed"] == 0
+    (new_id,) = _collection(server)["file_ids"]
+    assert new_id != old_id and b"final version" in server.uploads[new_id]
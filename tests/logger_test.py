@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Queue-based logging: JSON records, context fields, sampling and rotation."""
+
+import io
+import json
+import logging
+import queue
+
+from src.utils.logger import NonBlockingQueueHandler, log_context, setup_logging, shutdown_logging
+
+
+def _records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_json_records_carry_context_and_extra(tmp_path):
+    path = tmp_path / "automation.log"
+    console = io.StringIO()
+    setup_logging({'file': str(path), 'level': 'DEBUG'}, console=console)
+    logger = logging.getLogger("logger_test")
+    try:
+        with log_context(file="a.txt", job_id=7):
+            logger.info("uploaded %s", "a.txt")
+            logger.debug("request", extra={"endpoint": "/api/v1/files/", "status": 200, "duration_ms": 12.5})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+    finally:
+        shutdown_logging()
+
+    first, second, third = _records(path)
+    assert first["message"] == "uploaded a.txt" and first["file"] == "a.txt" and first["job_id"] == 7
+    assert second["endpoint"] == "/api/v1/files/" and second["duration_ms"] == 12.5 and second["level"] == "DEBUG"
+    assert "file" not in third and "ValueError: boom" in third["exc_info"]
+    assert "INFO - uploaded a.txt" in console.getvalue()
+
+
+def test_debug_sampling_keeps_warnings(tmp_path):
+    path = tmp_path / "automation.log"
+    setup_logging({'file': str(path), 'level': 'DEBUG', 'sample': {'DEBUG': 0.1}})
+    logger = logging.getLogger("logger_test")
+    try:
+        for i in range(100):
+            logger.debug(f"request {i}")
+        for i in range(3):
+            logger.warning(f"slow {i}")
+    finally:
+        shutdown_logging()
+
+    levels = [r["level"] for r in _records(path)]
+    assert levels.count("DEBUG") == 10 and levels.count("WARNING") == 3
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("logger_test.full")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(5):
+            logger.warning(f"record {i}")
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+    assert handler.queue.qsize() == 2 and handler.dropped == 3
+
+
+def test_size_rotation_keeps_backups(tmp_path):
+    path = tmp_path / "automation.log"
+    setup_logging({'file': str(path), 'max_size_mb': 0.001, 'backup_count': 2})
+    logger = logging.getLogger("logger_test")
+    try:
+        for i in range(100):
+            logger.info(f"line {i} " + "x" * 50)
+    finally:
+        shutdown_logging()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["automation.log", "automation.log.1", "automation.log.2"]
+    assert _records(path)[-1]["message"].startswith("line 99")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Per-request metrics recorded by the clients against the local mock server."""
+
+import asyncio
+import json
+import os
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.async_webui_client import AsyncOpenWebUIClient
+from src.metrics import Histogram, MetricsRegistry, endpoint_label
+from src.mock_server import MockOpenWebUIServer
+from src.utils.config import Config
+from src.webui_client import OpenWebUIClient
+
+
+def _config(url):
+    config = Config()
+    config.webui_url = url
+    config.override('upload', {'progress': False})
+    config.override('upload_cache', {'enabled': False})
+    config.override('model_cache', {'enabled': False})
+    # Byte counts below are of uncompressed bodies
+    config.override('webui.compression', {'encoding': 'none'})
+    return config
+
+
+def test_endpoint_label_collapses_ids():
+    assert endpoint_label('/api/files/3f2c1d9e-8b7a-4c6d-9e0f-1a2b3c4d5e6f') == '/api/files/{id}'
+    assert endpoint_label('/api/files/') == '/api/files/'
+    assert endpoint_label('/api/models?x=1') == '/api/models'
+
+
+def test_histogram_quantiles():
+    hist = Histogram((0.1, 0.2, 0.5))
+    for value in (0.05, 0.15, 0.15, 0.4):
+        hist.observe(value)
+    assert hist.cumulative() == [('0.1', 1), ('0.2', 3), ('0.5', 4), ('+Inf', 4)]
+    assert 0.1 < hist.quantile(0.5) <= 0.2
+
+
+def test_client_records_requests(tmp_path):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_text("Speaker 1: hello\n" * 100)
+    sink = tmp_path / "requests.jsonl"
+    metrics = MetricsRegistry({'sink': str(sink)}, export_dir=str(tmp_path / "metrics"))
+
+    with MockOpenWebUIServer(latency=0.02) as server:
+        with OpenWebUIClient(_config(server.url), metrics=metrics) as client:
+            client.list_models()
+            result = client.create_chat("stand-in-model", str(transcript))
+            assert result["success"]
+            assert client.file_exists(result["file_id"])
+            client.stream_chat("stand-in-model", [{"role": "user", "content": "hi"}]).consume()
+    metrics.close()
+
+    endpoints = metrics.summary()["endpoints"]
+    assert endpoints["GET /api/models"]["requests"] == 1
+    assert endpoints["POST /api/chat/completions"]["requests"] == 2
+    assert endpoints["GET /api/files/{id}"]["statuses"] == {"200": 1}
+    upload = endpoints["POST /api/files/"]
+    assert upload["bytes_sent"] > transcript.stat().st_size
+    assert upload["bytes_received"] > 0
+    assert upload["phases_mean_s"]["wait"] >= 0.02
+
+    records = [json.loads(line) for line in sink.read_text().splitlines()]
+    assert len(records) == 5
+    # One keep-alive connection: only the first request pays for connect
+    assert records[0]["phases"]["connect"] > 0
+    assert all(r["phases"]["connect"] == 0 for r in records[1:])
+    assert all(r["status"] == 200 and r["retries"] == 0 for r in records)
+    streamed = records[-1]
+    assert streamed["bytes_received"] > 0 and streamed["phases"]["download"] >= 0
+
+    directory = metrics.export()
+    prom = open(os.path.join(directory, 'metrics.prom')).read()
+    assert 'openwebui_request_duration_seconds_bucket{method="POST",endpoint="/api/files/",le="+Inf"} 1' in prom
+    assert 'openwebui_requests_total{method="GET",endpoint="/api/models",status="200"} 1' in prom
+    assert json.load(open(os.path.join(directory, 'metrics.json')))["endpoints"]
+
+
+def test_retries_and_errors_are_counted():
+    metrics = MetricsRegistry()
+    with MockOpenWebUIServer(error_rate=1.0) as server:
+        config = _config(server.url)
+        config.override('webui.transport', {'max_retries': 2, 'backoff_factor': 0, 'retry_statuses': [500]})
+        with OpenWebUIClient(config, metrics=metrics) as client:
+            assert client.list_models() == []
+
+    endpoint = metrics.summary()["endpoints"]["GET /api/models"]
+    assert endpoint["errors"] == 1
+    assert endpoint["retries"] == 2
+
+
+def test_async_client_records_requests(tmp_path):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_text("Speaker 1: hello\n")
+    metrics = MetricsRegistry()
+
+    with MockOpenWebUIServer() as server:
+        async def run():
+            async with AsyncOpenWebUIClient(_config(server.url), metrics=metrics) as client:
+                return await client.create_chat("stand-in-model", str(transcript))
+
+        assert asyncio.run(run())["success"]
+
+    endpoints = metrics.summary()["endpoints"]
+    assert endpoints["POST /api/files/"]["bytes_sent"] > 0
+    assert endpoints["POST /api/chat/completions"]["bytes_received"] > 0
+    assert "connect" in endpoints["POST /api/files/"]["phases_mean_s"]
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Model list cache: TTL, conditional revalidation and background refresh."""
+
+import os
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.mock_server import MockOpenWebUIServer
+from src.utils.config import Config
+from src.webui_client import OpenWebUIClient
+
+
+def _client(url, data_dir, **cache_settings):
+    config = Config()
+    config.webui_url = url
+    config.override('paths.data_dir', str(data_dir))
+    config.override('model_cache', {'enabled': True, **cache_settings})
+    return OpenWebUIClient(config)
+
+
+def test_fresh_copy_skips_the_network(tmp_path):
+    with MockOpenWebUIServer() as server:
+        with _client(server.url, tmp_path) as client:
+            assert client.list_models() == server.models
+
+        # A new process reads the persisted copy
+        with _client(server.url, tmp_path) as client:
+            assert client.list_models() == server.models
+        assert len(server.model_requests) == 1
+
+
+def test_stale_copy_is_revalidated_with_etag(tmp_path):
+    with MockOpenWebUIServer() as server:
+        with _client(server.url, tmp_path, ttl=0, background_refresh=False) as client:
+            client.list_models()
+            assert client.list_models() == server.models
+
+            server.models = [{"id": "new-model"}]
+            server.models_etag = '"models-v2"'
+            assert client.list_models() == [{"id": "new-model"}]
+
+        assert server.model_requests == [None, '"models-v1"', '"models-v1"']
+
+
+def test_background_refresh_returns_stale_copy_immediately(tmp_path):
+    with MockOpenWebUIServer() as server:
+        with _client(server.url, tmp_path, ttl=0) as client:
+            client.list_models()
+            server.models = [{"id": "new-model"}]
+            server.models_etag = '"models-v2"'
+
+            assert client.list_models() == [{"id": "stand-in-model"}]
+            client.model_cache.refresh_async().join(5)
+
+        with _client(server.url, tmp_path, ttl=3600) as client:
+            assert client.list_models() == [{"id": "new-model"}]
+
+
+def test_refresh_override_ignores_ttl(tmp_path):
+    with MockOpenWebUIServer() as server:
+        with _client(server.url, tmp_path) as client:
+            client.list_models()
+            client.list_models(refresh=True)
+        assert len(server.model_requests) == 2
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Model search index, usage ranking and the selector's virtual list window."""
+
+import time
+
+from src.model_search import ModelIndex, ModelUsage
+from src.model_selector import ListWindow
+
+MODELS = [
+    "meta-llama-3-8b-instruct",
+    "meta-llama-3-70b-instruct",
+    "mistral-7b-instruct",
+    "mixtral-8x7b",
+    "gpt-4",
+    "gpt-4o-mini",
+    "qwen2.5-coder-32b",
+]
+
+
+def test_prefix_substring_and_typo_matches():
+    index = ModelIndex(MODELS)
+    assert index.search("gpt")[:2] == ["gpt-4", "gpt-4o-mini"]
+    assert index.search("gpt-4") == ["gpt-4", "gpt-4o-mini"]
+    assert set(index.search("llama 70")) == {"meta-llama-3-70b-instruct"}
+    assert set(index.search("lama")) == {"meta-llama-3-8b-instruct", "meta-llama-3-70b-instruct"}
+    assert index.search("mistrl")[0] == "mistral-7b-instruct"
+    assert "qwen2.5-coder-32b" in index.search("oder")
+    assert index.search("instruct 7b") == ["mistral-7b-instruct"]
+    assert index.search("zzz") == []
+    assert len(index.search("")) == len(MODELS)
+
+
+def test_usage_ranks_results_and_persists(tmp_path):
+    path = str(tmp_path / "model_usage.json")
+    usage = ModelUsage(path)
+    for _ in range(3):
+        usage.record("mixtral-8x7b")
+    usage.record("gpt-4o-mini")
+
+    index = ModelIndex(MODELS, ModelUsage(path))
+    assert index.search("")[:2] == ["mixtral-8x7b", "gpt-4o-mini"]
+    assert index.search("gpt")[0] == "gpt-4o-mini"
+    assert index.position("mixtral-8x7b") == 0
+    assert index.position("unknown") is None
+
+
+def test_large_catalog_stays_fast():
+    families = ["llama", "mistral", "qwen", "gemma", "phi", "falcon", "deepseek", "mixtral"]
+    models = [f"org{i % 50}/{families[i % 8]}-{i % 70}b-chat-v{i}" for i in range(5000)]
+    started = time.perf_counter()
+    index = ModelIndex(models)
+    for query in ("l", "llam", "qwen 7b", "deepsek", "chat v4999"):
+        index.search(query)
+    assert time.perf_counter() - started < 2.0
+    assert index.search("chat v4999")[0] == "org49/mixtral-29b-chat-v4999"
+
+
+def test_list_window_renders_only_visible_rows():
+    view = ListWindow(rows=10)
+    view.reset(5000, cursor=42)
+    assert view.cursor == 42 and 42 in view.visible() and len(view.visible()) == 10
+
+    view.move_cursor(-100)
+    assert view.cursor == 0 and view.offset == 0
+    view.moveto(0.5)
+    assert view.offset == 2500 and view.fractions() == (0.5, 0.502)
+    view.select_row(3)
+    assert view.cursor == 2503
+    view.scroll(10000)
+    assert view.offset == 4990 and list(view.visible())[-1] == 4999
+
+    view.reset(3)
+    view.resize(10)
+    assert list(view.visible()) == [0, 1, 2] and view.fractions() == (0.0, 1.0)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Chats with several files: parallel uploads, per-file failures, combined batch runs."""
+
+import os
+import time
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.batch import BatchRunner
+from src.mock_server import MockOpenWebUIServer
+from src.utils.config import Config
+from src.webui_client import OpenWebUIClient
+
+
+def _config(url):
+    config = Config()
+    config.webui_url = url
+    config.override('upload', {'progress': False, 'max_attempts': 1, 'parallel': 4})
+    config.override('completion_cache', {'enabled': False})
+    config.override('planner', {'enabled': False})
+    return config
+
+
+def _transcripts(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"meeting-{i}.txt"
+        path.write_text(f"Speaker {i}: weekly review\n" * 100)
+        paths.append(str(path))
+    return paths
+
+
+def test_files_upload_in_parallel_into_one_chat(tmp_path):
+    paths = _transcripts(tmp_path, 4)
+    missing = str(tmp_path / "missing.txt")
+    progress = []
+    with MockOpenWebUIServer(latency=0.3) as server:
+        with OpenWebUIClient(_config(server.url)) as client:
+            started = time.perf_counter()
+            result = client.create_chat("stand-in-model", paths + [missing])
+            wall_time = time.perf_counter() - started
+
+            uploads = client.upload_documents(paths[:2], use_cache=False, progress=lambda sent, total: progress.append((sent, total)))
+
+    assert result["success"] and len(result["file_ids"]) == 4
+    assert server.completions[0]["file_ids"] == result["file_ids"]
+    assert result["failed"] == [missing]
+    assert [f["success"] for f in result["files"]] == [True] * 4 + [False]
+    # Four 0.3s uploads at once, then the chat: well under the 1.5s of doing them in turn
+    assert wall_time < 1.2
+
+    assert [u["path"] for u in uploads] == paths[:2] and all(u["success"] for u in uploads)
+    sent, total = progress[-1]
+    assert sent == total > sum(os.path.getsize(p) for p in paths[:2])
+
+
+def test_combined_batch_reports_each_file(tmp_path):
+    paths = _transcripts(tmp_path, 3)
+    with MockOpenWebUIServer() as server:
+        runner = BatchRunner(_config(server.url), preprocess=False)
+        summary = runner.run_combined("stand-in-model", paths + [str(tmp_path / "gone.txt")])
+        runner.close()
+
+    assert summary["chat"]["success"] and len(summary["chat"]["file_ids"]) == 3
+    assert summary["succeeded"] == 3 and summary["failed"] == 1
+    assert summary["files"][-1]["error"] and summary["slowest_upload_s"] is not None
+    assert len(server.completions) == 1
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Token estimation, calibration and context-fit planning."""
+
+import random
+
+from src.planner import CHUNKED, SINGLE_SHOT, ContextPlanner, model_context_length
+from src.tokens import DEFAULT_COEFFICIENTS, FEATURES, TokenEstimator, _solve, calibrate, count_features
+
+
+def _planner(models, **settings):
+    config = {'default_context': 1000, 'reserve_tokens': 100, 'allow_upgrade': True, 'context_windows': {}}
+    config.update(settings)
+    return ContextPlanner(TokenEstimator(), models, config)
+
+
+def _transcript(tmp_path, tokens):
+    # One token per word under the all-ones coefficients below
+    path = tmp_path / "meeting.txt"
+    path.write_text("a " * tokens)
+    return str(path)
+
+
+def _ones_planner(models, **settings):
+    planner = _planner(models, **settings)
+    planner.estimator = TokenEstimator({**dict.fromkeys(FEATURES, 0.0), 'words': 1.0})
+    return planner
+
+
+def test_count_features_and_estimates(tmp_path):
+    counts = count_features("Hello, wörld 42!\nBye")
+    assert counts == {'words': 3, 'word_chars': 13, 'digits': 2, 'punctuation': 2, 'non_ascii': 1, 'newlines': 1}
+
+    estimator = TokenEstimator(cache_path=str(tmp_path / "cache.sqlite3"))
+    text = "Speaker 1: we shipped 3 fixes, then reviewed the plan.\n" * 50
+    path = tmp_path / "t.txt"
+    path.write_text(text)
+    estimate = estimator.estimate_file(str(path))
+    assert estimate == {"tokens": estimator.estimate_text(text), "chars": len(text)}
+    assert estimator.estimate_file(str(path)) == estimate  # served from the cache
+    estimator.close()
+
+
+def test_solve_matches_known_solution():
+    matrix = [[0.0, 2.0, 1.0], [1.0, 1.0, 0.0], [3.0, 0.0, 1.0]]
+    # Needs a row swap: the first pivot is zero
+    solution = _solve(matrix, [7.0, 3.0, 6.0])
+    assert [round(x, 9) for x in solution] == [1.0, 2.0, 3.0]
+
+
+def test_calibrate_recovers_reference_coefficients():
+    rng = random.Random(7)
+    truth = {'words': 0.4, 'word_chars': 0.2, 'digits': 0.5, 'punctuation': 1.0, 'non_ascii': 1.5, 'newlines': 0.25}
+    vocabulary = ["alpha", "beta", "Ωmega", "42", "x", "review", "ünder", "7"]
+    samples = [
+        " ".join(rng.choice(vocabulary) + rng.choice(["", ",", "!", "."]) for _ in range(rng.randint(3, 30)))
+        + "\n" * rng.randint(0, 3)
+        for _ in range(200)
+    ]
+
+    def reference(text):
+        counts = count_features(text)
+        return sum(truth[f] * counts[f] for f in FEATURES)
+
+    fitted = calibrate(samples, reference)
+    assert set(fitted) == set(FEATURES)
+    for name in FEATURES:
+        assert abs(fitted[name] - truth[name]) < 0.01
+
+    # A feature that never occurs stays at its default instead of drifting
+    fitted = calibrate(["plain words only"] * 20, lambda text: 3)
+    assert abs(fitted['digits'] - DEFAULT_COEFFICIENTS['digits']) < 1e-3
+
+
+def test_model_context_length_reads_known_fields():
+    assert model_context_length({'context_length': 4096}) == 4096
+    assert model_context_length({'info': {'params': {'num_ctx': '32768'}}}) == 32768
+    assert model_context_length({'ollama': {'details': {'context_length': 2048}}}) == 2048
+    assert model_context_length({'top_provider': {'context_length': 128000}}) == 128000
+    assert model_context_length({'context_length': 'n/a', 'context_window': 0}) is None
+    assert model_context_length({}) is None
+
+
+def test_plan_fits_single_shot(tmp_path):
+    planner = _ones_planner([{'id': 'small', 'context_length': 2000}])
+    plan = planner.plan(_transcript(tmp_path, 1500), 'small')
+    assert plan["strategy"] == SINGLE_SHOT and plan["model"] == 'small'
+    assert plan["tokens"] == 1500 and plan["context"] == 2000 and plan["warning"] is None
+
+
+def test_plan_upgrades_to_smallest_listed_model(tmp_path):
+    models = [
+        {'id': 'small', 'context_length': 2000},
+        {'id': 'medium', 'context_length': 8000},
+        {'id': 'large', 'context_length': 128000},
+        {'id': 'tuned'},
+    ]
+    # 'tuned' gets its window from config; 'phantom' is not on the server
+    planner = _ones_planner(models, context_windows={'tuned': 6000, 'phantom': 5000})
+    plan = planner.plan(_transcript(tmp_path, 4500), 'small')
+    assert plan["strategy"] == SINGLE_SHOT
+    assert (plan["model"], plan["context"], plan["requested_model"]) == ('tuned', 6000, 'small')
+    assert "using tuned" in plan["warning"]
+
+
+def test_plan_never_upgrades_to_unlisted_model(tmp_path):
+    planner = _ones_planner([{'id': 'small', 'context_length': 2000}], context_windows={'phantom': 100000})
+    plan = planner.plan(_transcript(tmp_path, 4500), 'small')
+    assert plan["strategy"] == CHUNKED and plan["model"] == 'small'
+
+
+def test_plan_chunks_when_nothing_fits(tmp_path):
+    planner = _ones_planner([{'id': 'small', 'context_length': 2000}, {'id': 'medium', 'context_length': 4000}])
+    plan = planner.plan(_transcript(tmp_path, 5000), 'small')
+    assert plan["strategy"] == CHUNKED and plan["model"] == 'small'
+    assert "processing in chunks" in plan["warning"]
+
+    no_upgrade = _ones_planner([{'id': 'small', 'context_length': 2000}, {'id': 'large', 'context_length': 128000}], allow_upgrade=False)
+    assert no_upgrade.plan(_transcript(tmp_path, 5000), 'small')["strategy"] == CHUNKED
+
+
+def test_unknown_model_uses_default_context(tmp_path):
+    planner = _ones_planner([{'id': 'small', 'context_length': 2000}])
+    fits = planner.plan(_transcript(tmp_path, 850), 'mystery')
+    assert fits["context"] == 1000 and fits["strategy"] == SINGLE_SHOT
+
+    # Overrides also apply to the requested model
+    override = _ones_planner([], context_windows={'mystery': 4000})
+    assert override.plan(_transcript(tmp_path, 2000), 'mystery')["context"] == 4000
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Transcript preprocessing pipeline: normalizers, savings report, pool mode."""
+
+import itertools
+import os
+
+import pytest
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.batch import BatchRunner
+from src.mock_server import MockOpenWebUIServer
+from src.preprocess import Preprocessor, register_normalizer, summarize_reports
+from src.utils.config import Config
+
+RAW = """\
+WEBVTT
+
+1
+00:00:01.000 --> 00:00:04.000
+Speaker 1: Um, so we should, uh, start.
+
+2
+00:00:04.000 --> 00:00:06.000
+Speaker 1: The budget is 12 items.
+Speaker 1: The budget is 12 items.
+[00:01:23] Alice:   Hmm.   Yes,   I agree.
+Alice (00:01:30): Meet at 10:30 tomorrow.
+Bob: uh-huh
+Bob: Ok, the umbrella stays.
+42 people came.
+"""
+
+CLEAN = """\
+Speaker 1: so we should, start.
+The budget is 12 items.
+Alice: Yes, I agree.
+Meet at 10:30 tomorrow.
+Bob: Ok, the umbrella stays.
+42 people came.
+"""
+
+
+def test_default_pipeline():
+    assert Preprocessor().clean_text(RAW) == CLEAN
+
+
+def test_custom_normalizers_and_order():
+    @register_normalizer('upper')
+    def upper(lines):
+        for line in lines:
+            yield line.upper()
+
+    assert Preprocessor({'normalizers': ['whitespace', 'upper']}).clean_text("a  b\n\n c\n") == "A B\nC\n"
+    with pytest.raises(ValueError):
+        Preprocessor({'normalizers': ['nope']})
+
+
+def test_process_reports_savings_and_reuses_output(tmp_path):
+    source = tmp_path / "meeting.txt"
+    source.write_text(RAW * 50)
+    preprocessor = Preprocessor(output_dir=str(tmp_path / "out"))
+
+    report = preprocessor.process(str(source))
+    assert not report["cached"]
+    assert os.path.basename(report["output"]) == "meeting.txt"
+    assert report["bytes_in"] == source.stat().st_size
+    assert report["bytes_out"] == os.path.getsize(report["output"])
+    assert 0 < report["tokens_out"] < report["tokens_in"]
+    assert report["tokens_saved"] == report["tokens_in"] - report["tokens_out"]
+    assert open(report["output"]).read().startswith(CLEAN)
+
+    again = preprocessor.process(str(source))
+    assert again["cached"] and again["output"] == report["output"]
+    assert again["tokens_saved"] == report["tokens_saved"]
+
+
+def test_pipeline_is_lazy():
+    # An endless transcript: nothing may be buffered beyond the lines asked for
+    lines = itertools.cycle(RAW.splitlines())
+    cleaned = list(itertools.islice(Preprocessor().clean(lines), 5))
+    assert cleaned == CLEAN.splitlines()[:5]
+
+
+def test_process_pool_matches_inline(tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"meeting_{i}.txt"
+        path.write_text(RAW * (i + 1))
+        paths.append(str(path))
+    missing = str(tmp_path / "gone.txt")
+
+    pooled = Preprocessor({'processes': 2}, output_dir=str(tmp_path / "pool")).process_many(paths + [missing])
+    inline = Preprocessor(output_dir=str(tmp_path / "inline")).process_many(paths)
+    assert [r["tokens_saved"] for r in pooled[:4]] == [r["tokens_saved"] for r in inline]
+    assert all(open(p["output"]).read() == open(i["output"]).read() for p, i in zip(pooled, inline))
+    assert pooled[4]["error"]
+    assert summarize_reports(pooled)["files"] == 4
+
+
+def test_batch_uploads_cleaned_transcripts(tmp_path):
+    (tmp_path / "meeting.txt").write_text(RAW)
+    with MockOpenWebUIServer(keep_bodies=True) as server:
+        config = Config()
+        config.webui_url = server.url
+        config.override('upload', {'progress': False})
+        config.override('planner', {'enabled': False})
+        config.override('preprocess', {'enabled': True, 'processes': 2})
+        runner = BatchRunner(config, workers=2)
+        summary = runner.run("stand-in-model", runner.collect_files(folder=str(tmp_path)))
+        runner.close()
+
+    entry = summary["files"][0]
+    assert entry["success"] and entry["file"] == str(tmp_path / "meeting.txt")
+    assert entry["preprocess"]["tokens_saved"] > 0
+    assert summary["preprocess"]["bytes_saved"] == len(RAW) - len(CLEAN)
+    body = next(iter(server.uploads.values()))
+    assert CLEAN.encode() in body and b"00:00:01.000" not in body
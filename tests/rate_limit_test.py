@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Adaptive concurrency limits, token buckets and Retry-After handling."""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.metrics import MetricsRegistry
+from src.mock_server import MockOpenWebUIServer
+from src.rate_limit import AIMDLimiter, TokenBucket, endpoint_class, parse_retry_after
+from src.utils.config import Config
+from src.webui_client import OpenWebUIClient
+
+
+def test_aimd_increase_and_decrease():
+    limiter = AIMDLimiter({'initial': 4, 'max': 6, 'latency_tolerance': 0})
+    for _ in range(4):
+        limiter.update(limiter.acquire(), 0.01, overloaded=False)
+        limiter.release()
+    assert 4.9 < limiter.limit < 5.0  # About one step per window of requests
+
+    # Requests in flight when the limit dropped do not lower it again
+    earlier = [limiter.acquire() for _ in range(3)]
+    assert limiter.update(earlier[0], 0.01, overloaded=True)
+    assert not limiter.update(earlier[1], 0.01, overloaded=True)
+    assert 2.4 < limiter.limit < 2.5
+
+    slow = AIMDLimiter({'initial': 4, 'latency_tolerance': 3})
+    for latency in (0.01, 0.01, 0.2):
+        slow.update(slow.acquire(), latency, overloaded=False)
+    assert slow.limit < 4
+
+
+def test_retry_after_and_endpoint_classes():
+    assert parse_retry_after("2.5") == 2.5
+    assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+    assert parse_retry_after("soon") is None
+    assert endpoint_class('/api/files/abc') == 'files'
+    assert endpoint_class('/api/chat/completions') == 'completions'
+    assert endpoint_class('/api/models') == 'other'
+
+
+def test_token_bucket_rate_and_pause():
+    bucket = TokenBucket(rate=50, burst=1)
+    started = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - started >= 0.07
+
+    unlimited = TokenBucket()
+    unlimited.pause(0.1)
+    assert unlimited.acquire() >= 0.09
+
+
+def test_limit_converges_below_server_capacity(tmp_path):
+    metrics = MetricsRegistry()
+    with MockOpenWebUIServer(latency=0.03, capacity=3, retry_after=0.05) as server:
+        config = Config()
+        config.webui_url = server.url
+        config.override('completion_cache', {'enabled': False})
+        config.override('webui.limits', {'initial': 8, 'latency_tolerance': 0})
+        with OpenWebUIClient(config, metrics=metrics) as client:
+            messages = [{"role": "user", "content": "Summarize"}]
+            with ThreadPoolExecutor(max_workers=12) as pool:
+                replies = list(pool.map(lambda _: client.complete("stand-in-model", messages), range(60)))
+
+    assert all(replies)
+    assert server.stats["throttled"] > 0
+    limits = metrics.summary()["limits"][f"{server.url} completions"]
+    assert limits["throttled"] > 0
+    assert limits["limit"] < 8 and min(limit for _, limit in limits["history"]) <= 4
+    assert 'openwebui_concurrency_limit{server="%s",class="completions"}' % server.url in metrics.to_prometheus()
+
+
+def test_large_upload_after_small_ones_keeps_the_files_limit(tmp_path):
+    small = tmp_path / "small.txt"
+    small.write_text("Speaker 1: short\n")
+    large = tmp_path / "large.txt"
+    large.write_text("Speaker 1: a very long meeting\n" * 1_000_000)
+    with MockOpenWebUIServer(keep_bodies=False) as server:
+        config = Config()
+        config.webui_url = server.url
+        config.override('upload', {'progress': False, 'max_attempts': 1})
+        config.override('upload_cache', {'enabled': False})
+        config.override('webui.limits', {'initial': 4, 'latency_tolerance': 3})
+        with OpenWebUIClient(config) as client:
+            for _ in range(5):
+                assert client.upload_document(str(small))["success"]
+            assert client.upload_document(str(large))["success"]
+            limits = client.limiter.stats()
+
+    # The large body takes far longer than 3x the small ones to send, on an idle server
+    assert limits[f"{server.url} files"]["limit"] >= 4
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Multi-server routing: load spreading, health checks and failover."""
+
+import os
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.batch import BatchRunner
+from src.job_queue import JobQueue, JobRunner
+from src.mock_server import MockOpenWebUIServer
+from src.router import EndpointRouter
+from src.utils.config import Config
+from src.webui_client import OpenWebUIClient
+
+
+def _config(urls):
+    config = Config()
+    config.webui_url = urls
+    config.override('upload', {'progress': False, 'max_attempts': 1})
+    config.override('webui.transport', {'max_retries': 0, 'connect_timeout': 1})
+    config.override('webui.routing', {'health_interval': 0, 'cooldown': 60})
+    config.override('completion_cache', {'enabled': False})
+    config.override('planner', {'enabled': False})
+    return config
+
+
+def _chats_stay_on_their_server(*servers):
+    for server in servers:
+        for completion in server.completions:
+            assert set(completion["file_ids"]) <= set(server.uploads)
+
+
+def test_least_loaded_server_is_picked():
+    router = EndpointRouter(["http://a:1", "http://b:1/", "http://c:1"], {'ewma_alpha': 0.5})
+    a, b, c = router.endpoints
+    router.observe(a, 0.1, ok=True)
+    router.observe(b, 0.3, ok=True)
+    router.observe(c, 0.1, ok=True)
+    router.acquire(a)
+    assert router.pick() is c
+    router.acquire(c)
+    router.acquire(c)
+    assert router.pick() is a  # Scores: a 0.2, b 0.3, c 0.3
+    router.observe(b, 0.1, ok=True)
+    assert b.latency == 0.2
+    assert router.pick(exclude=[a.url, c.url]) is b
+
+    router.observe(a, None, ok=False)
+    router.observe(c, None, ok=False)
+    assert router.pick() is b
+    assert not router.has_alternative([b.url])
+    router.observe(b, None, ok=False)
+    assert router.pick() is a  # No server is healthy: the one that failed longest ago
+
+
+def test_health_check_restores_a_server():
+    down = {"http://b:1"}
+
+    def probe(url):
+        if url in down:
+            raise OSError("refused")
+        return 0.01
+
+    router = EndpointRouter(["http://a:1", "http://b:1"], {'health_interval': 0}, probe=probe)
+    router.check()
+    assert router.stats()["http://b:1"]["healthy"] is False
+    down.clear()
+    router.check()
+    assert router.is_healthy("http://b:1") and router.stats()["http://b:1"]["latency_ms"] == 10.0
+
+
+def test_batch_spreads_files_and_fails_over(tmp_path):
+    for i in range(12):
+        (tmp_path / f"meeting_{i}.txt").write_text(f"Meeting {i}\n")
+    with MockOpenWebUIServer(latency=0.02) as first, MockOpenWebUIServer(latency=0.02) as second:
+        runner = BatchRunner(_config([first.url, second.url]), workers=4)
+        files = runner.collect_files(folder=str(tmp_path))
+        summary = runner.run("stand-in-model", files[:6])
+        assert summary["succeeded"] == 6
+        assert first.uploads and second.uploads
+        assert {e["server"] for e in summary["files"]} == {first.url, second.url}
+
+        # One server fails mid-batch: nothing is lost
+        first.error_rate = 1.0
+        summary = runner.run("stand-in-model", files[6:])
+        runner.close()
+        assert summary["succeeded"] == 6
+        assert {e["server"] for e in summary["files"]} == {second.url}
+        assert summary["servers"][first.url]["healthy"] is False
+        _chats_stay_on_their_server(first, second)
+
+
+def test_chat_job_reuploads_when_its_server_is_gone(tmp_path):
+    path = tmp_path / "meeting.txt"
+    path.write_text("Alice: The budget is approved.\n")
+    with MockOpenWebUIServer() as first, MockOpenWebUIServer() as second:
+        client = OpenWebUIClient(_config([first.url, second.url]))
+        queue = JobQueue(str(tmp_path / "jobs.sqlite3"), {'backoff_base': 0})
+        runner = JobRunner(queue, client, "stand-in-model")
+        runner.enqueue_files([str(path)])
+
+        upload = queue.claim()
+        with client.pinned(first.url):
+            runner.execute(upload)
+        first.error_rate = 1.0
+
+        runner.run(poll_interval=0.05)
+        client.close()
+        assert queue.status()["states"]["done"] == 2
+        assert len(second.uploads) == 1 and len(second.completions) == 1
+        _chats_stay_on_their_server(second)
+        queue.close()
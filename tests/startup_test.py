@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""Cold-start import time must stay within benchmarks/startup_budget.json."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import startup
+
+
+def test_startup_within_budget():
+    results = startup.check(startup.load_budget())
+    failures = [r for r in results if not r["ok"]]
+    assert not failures, failures
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Streamed multipart uploads: body format, progress and retry policy."""
+
+import os
+from email.parser import BytesParser
+from email.policy import HTTP
+
+import pytest
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.mock_server import MockOpenWebUIServer
+from src.streaming_upload import FileChangedError, MultipartFileStream
+from src.utils.config import Config
+from src.webui_client import OpenWebUIClient
+
+
+def _parse_multipart(content_type, body):
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    return list(message.iter_parts())
+
+
+def test_stream_is_valid_multipart_with_exact_length(tmp_path):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_bytes(b"line\n" * 10000)
+    seen = []
+
+    stream = MultipartFileStream(str(transcript), chunk_size=4096, progress=lambda sent, total: seen.append((sent, total)))
+    body = b"".join(stream)
+
+    assert len(body) == len(stream)
+    assert seen[-1] == (len(stream), len(stream))
+    assert len(stream.chunk_checksums) == -(-transcript.stat().st_size // 4096)
+    (part,) = _parse_multipart(stream.content_type, body)
+    assert part.get_filename() == "meeting.txt"
+    assert part.get_content() == "line\n" * 10000
+
+
+def test_changed_file_is_detected_on_retry(tmp_path):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_bytes(b"a" * 8192)
+    first = MultipartFileStream(str(transcript), chunk_size=4096)
+    b"".join(first)
+
+    transcript.write_bytes(b"b" * 8192)
+    second = MultipartFileStream(str(transcript), chunk_size=4096, expected_checksums=first.chunk_checksums)
+    with pytest.raises(FileChangedError):
+        b"".join(second)
+
+
+def test_upload_document_streams_to_server(tmp_path):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_text("Alice: hello\n" * 1000)
+
+    with MockOpenWebUIServer() as server:
+        config = Config()
+        config.webui_url = server.url
+        config.override('upload_cache', {'enabled': False})
+        with OpenWebUIClient(config) as client:
+            progress = []
+            result = client.upload_document(str(transcript), progress=lambda sent, total: progress.append(sent))
+
+        assert result["success"]
+        assert transcript.read_bytes() in server.uploads[result["file_id"]]
+        assert progress and progress == sorted(progress)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Map-reduce summarization: chunking, multi-level reduce, failures, batch --map-reduce."""
+
+import json
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import batch as batch_cli
+from src.batch import BatchRunner
+from src.mock_server import MockOpenWebUIServer
+from src.summarize import MapReduceSummarizer, chunk_text
+from src.utils.config import Config
+from src.utils.error_handler import OpenWebUIError
+from src.utils.logger import shutdown_logging
+from src.webui_client import OpenWebUIClient
+
+
+def _config(url):
+    config = Config()
+    config.webui_url = url
+    config.override('logging', {'file': None})
+    config.override('upload', {'progress': False, 'max_attempts': 1})
+    config.override('completion_cache', {'enabled': False})
+    config.override('planner', {'enabled': False})
+    config.override('summarize', {'chunk_tokens': 100, 'overlap_tokens': 20, 'chars_per_token': 1.0, 'fan_in': 2})
+    return config
+
+
+def _lines(count):
+    return "".join(f"Speaker {i % 3}: point number {i:03d}\n" for i in range(count))
+
+
+def test_chunks_respect_size_and_overlap():
+    text = _lines(40)
+    chunks = chunk_text(text, max_chars=120, overlap_chars=40)
+    assert len(chunks) > 1 and all(len(chunk) <= 120 for chunk in chunks)
+
+    line = len("Speaker 0: point number 000\n")
+    rebuilt = chunks[0]
+    for previous, chunk in zip(chunks, chunks[1:]):
+        # Each chunk repeats whole trailing lines of the previous one, up to the overlap
+        overlap = next(n for n in range(len(chunk), -1, -line) if previous.endswith(chunk[:n]))
+        assert 0 < overlap <= 40 and overlap % line == 0
+        rebuilt += chunk[overlap:]
+    assert rebuilt == text
+
+    # Without overlap the chunks are a plain partition of the text
+    assert "".join(chunk_text(text, max_chars=120)) == text
+
+
+def test_long_lines_are_split():
+    chunks = chunk_text("x" * 250 + "\nend\n", max_chars=100)
+    assert chunks == ["x" * 100, "x" * 100, "x" * 50 + "\nend\n"]
+    with pytest.raises(ValueError):
+        chunk_text("text", 0)
+
+
+def test_reduce_takes_several_levels():
+    text = _lines(36)  # 28-char lines: 3 per 100-char chunk, one of them repeated as overlap
+    with MockOpenWebUIServer() as server:
+        with OpenWebUIClient(_config(server.url)) as client:
+            summarizer = MapReduceSummarizer(client, "stand-in-model", client.config.get_summarize_config())
+            chunks = summarizer.split(text)
+            result = summarizer.summarize_text(text)
+
+    assert result["chunks"] == result["map_calls"] == len(chunks) == 12
+    # 12 -> 6 -> 3 -> 2 -> 1 with fan_in 2; a group of one is passed up without a call
+    assert result["reduce_levels"] == 4 and result["reduce_calls"] == 6 + 3 + 1 + 1
+    assert len(server.completions) == result["map_calls"] + result["reduce_calls"]
+    assert result["summary"] == "Summary: all good."
+    map_prompts = [c["messages"][0]["content"] for c in server.completions[:12]]
+    assert all("of 12 of a meeting transcript" in prompt for prompt in map_prompts)
+    assert "---" in server.completions[-1]["messages"][0]["content"]
+
+
+def test_failed_map_call_fails_the_file(tmp_path):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_text(_lines(36))
+    with MockOpenWebUIServer(error_rate=1.0) as server:
+        config = _config(server.url)
+        with OpenWebUIClient(config) as client:
+            with pytest.raises(OpenWebUIError):
+                MapReduceSummarizer(client, "stand-in-model", config.get_summarize_config()).summarize_file(str(transcript))
+
+        runner = BatchRunner(config, map_reduce=True, preprocess=False)
+        entry = runner.process_file("stand-in-model", str(transcript))
+        runner.close()
+
+    assert not entry["success"] and "500" in entry["error"]
+    assert "map_reduce" not in entry
+
+
+def test_batch_cli_map_reduce_end_to_end(tmp_path, monkeypatch):
+    folder = tmp_path / "transcripts"
+    folder.mkdir()
+    for name in ("a", "b"):
+        (folder / f"{name}.txt").write_text(_lines(36))
+    output = tmp_path / "summary.json"
+
+    with MockOpenWebUIServer() as server:
+        monkeypatch.setattr(batch_cli, 'Config', lambda: _config(server.url))
+        try:
+            code = batch_cli.main([
+                '*.txt', '--folder', str(folder), '--model', 'stand-in-model',
+                '--map-reduce', '--no-preprocess', '--workers', '2', '--output', str(output)
+            ])
+        finally:
+            shutdown_logging()
+
+    summary = json.loads(output.read_text())
+    assert code == 0 and summary["succeeded"] == 2 and summary["failed"] == 0
+    for entry in summary["files"]:
+        assert entry["chat"]["choices"][0]["message"]["content"] == "Summary: all good."
+        assert entry["map_reduce"]["chunks"] == 12 and entry["map_reduce"]["reduce_levels"] == 4
+    assert len(server.completions) == 2 * (12 + 11) and not server.uploads
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""HTTPTransport against the mock server: retry policy, backoff and pool size."""
+
+import threading
+import time
+
+from src.mock_server import MockOpenWebUIServer
+from src.transport import HTTPTransport
+
+
+def _transport(**settings):
+    return HTTPTransport({'backoff_factor': 0.05, 'max_retries': 3, **settings})
+
+
+def test_idempotent_requests_retry_listed_statuses_with_backoff():
+    with MockOpenWebUIServer(error_rate=1.0) as server:
+        with _transport(retry_statuses=[500]) as transport:
+            started = time.perf_counter()
+            response = transport.get(f"{server.url}/api/models")
+            elapsed = time.perf_counter() - started
+    assert response.status_code == 500
+    assert server.stats["requests"] == 4
+    # urllib3 retries at once, then waits 2 * 0.05s and 4 * 0.05s
+    assert elapsed >= 0.3
+
+
+def test_unlisted_status_is_not_retried():
+    with MockOpenWebUIServer(error_rate=1.0) as server:
+        with _transport() as transport:
+            assert transport.get(f"{server.url}/api/models").status_code == 500
+    assert server.stats["requests"] == 1
+
+
+def test_post_is_never_retried():
+    with MockOpenWebUIServer(error_rate=1.0) as server:
+        with _transport(retry_statuses=[500]) as transport:
+            response = transport.post(f"{server.url}/api/chat/completions", json={"model": "stand-in-model"})
+    assert response.status_code == 500
+    assert server.stats["requests"] == 1 and not server.completions
+
+
+def test_retry_after_is_respected():
+    with MockOpenWebUIServer(rate_429=1.0, retry_after=1) as server:
+        with _transport(retry_statuses=[429], max_retries=1) as transport:
+            started = time.perf_counter()
+            response = transport.get(f"{server.url}/api/models")
+            elapsed = time.perf_counter() - started
+    assert response.status_code == 429 and server.stats["throttled"] == 2
+    # Retry-After (whole seconds) overrides the much shorter backoff
+    assert elapsed >= 1.0
+
+
+def _concurrent_gets(transport, url, count):
+    statuses = []
+    threads = [threading.Thread(target=lambda: statuses.append(transport.get(url).status_code)) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+
+def test_pool_size_caps_connections_per_host():
+    with MockOpenWebUIServer(latency=0.1) as server:
+        with _transport(pool_maxsize=2, pool_block=True) as transport:
+            statuses = _concurrent_gets(transport, f"{server.url}/api/models", 8)
+        assert statuses == [200] * 8
+        assert server.max_in_flight == 2
+
+    with MockOpenWebUIServer(latency=0.1) as server:
+        with _transport(pool_maxsize=8, pool_block=True) as transport:
+            _concurrent_gets(transport, f"{server.url}/api/models", 8)
+        assert server.max_in_flight > 2
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Upload cache behaviour against a local stand-in server."""
+
+import os
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.mock_server import MockOpenWebUIServer
+from src.utils.config import Config
+from src.webui_client import OpenWebUIClient
+
+
+def _client(url, data_dir, **cache_settings):
+    config = Config()
+    config.webui_url = url
+    config.override('paths.data_dir', str(data_dir))
+    config.override('upload_cache', {'enabled': True, **cache_settings})
+    return OpenWebUIClient(config)
+
+
+def test_repeat_upload_is_a_cache_hit(tmp_path):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_text("Alice: hello\nBob: hi\n")
+
+    with MockOpenWebUIServer() as server:
+        with _client(server.url, tmp_path / "data") as client:
+            first = client.upload_document(str(transcript))
+            second = client.upload_document(str(transcript))
+
+            assert first["success"] and not first["cached"]
+            assert second["cached"] and second["file_id"] == first["file_id"]
+            assert len(server.uploads) == 1
+            assert client.upload_cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_cache_survives_restart_and_reuploads_lost_files(tmp_path):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_text("Alice: hello\n")
+
+    with MockOpenWebUIServer() as server:
+        with _client(server.url, tmp_path / "data") as client:
+            file_id = client.upload_document(str(transcript))["file_id"]
+
+        # A new process finds the entry; verify_interval=0 forces a server check
+        server.uploads.pop(file_id)
+        with _client(server.url, tmp_path / "data", verify_interval=0) as client:
+            result = client.upload_document(str(transcript))
+
+        assert result["success"] and not result["cached"]
+        assert result["file_id"] != file_id
+
+
+def test_expired_entries_are_not_reused(tmp_path):
+    transcript = tmp_path / "meeting.txt"
+    transcript.write_text("Alice: hello\n")
+
+    with MockOpenWebUIServer() as server:
+        with _client(server.url, tmp_path / "data", ttl_days=0) as client:
+            client.upload_document(str(transcript))
+            result = client.upload_document(str(transcript))
+
+        assert not result["cached"]
+        assert len(server.uploads) == 2
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Watch-folder daemon against the local mock server."""
+
+import os
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault('OPENWEBUI_API_KEY', 'test-key')
+
+from src.batch import BatchRunner
+from src.mock_server import MockOpenWebUIServer
+from src.utils.config import Config
+from src.watcher import Debouncer, InotifyWatcher, PollingWatcher, WatchDaemon, make_watcher
+
+
+def _daemon(url, folder, **kwargs):
+    config = Config()
+    config.webui_url = url
+    config.override('upload', {'progress': False})
+    config.override('planner', {'enabled': False})
+    config.override('watch', {'poll_interval': 0.05})
+    return WatchDaemon(config, "stand-in-model", runner=BatchRunner(config, workers=2), folder=str(folder), **kwargs)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_debouncer_waits_until_file_settles(tmp_path):
+    path = tmp_path / "meeting.txt"
+    path.write_text("part one\n")
+    debouncer = Debouncer(0.1)
+    debouncer.touch(str(path))
+    assert debouncer.ready() == []
+
+    time.sleep(0.12)
+    with open(path, 'a') as f:
+        f.write("part two\n")
+    # Still growing: held back for another interval
+    assert debouncer.ready() == []
+    time.sleep(0.12)
+    assert debouncer.ready() == [str(path)]
+    assert len(debouncer) == 0
+
+
+@pytest.mark.parametrize('backend', ['inotify', 'polling'])
+def test_watcher_reports_new_files(tmp_path, backend):
+    try:
+        watcher = make_watcher(str(tmp_path), '*.txt', backend, poll_interval=0.05)
+    except OSError:
+        pytest.skip("inotify not available")
+    assert isinstance(watcher, InotifyWatcher if backend == 'inotify' else PollingWatcher)
+    try:
+        (tmp_path / "meeting.txt").write_text("hello\n")
+        (tmp_path / "notes.md").write_text("ignored\n")
+        changed = set()
+        _wait_for(lambda: changed.update(watcher.wait(0.1) or set()) or changed)
+        assert changed == {str(tmp_path / "meeting.txt")}
+    finally:
+        watcher.close()
+
+
+def test_daemon_processes_new_files_and_reconciles_delta(tmp_path):
+    folder = tmp_path / "transcripts"
+    folder.mkdir()
+    (folder / "existing.txt").write_text("Speaker 1: already here\n")
+
+    with MockOpenWebUIServer() as server:
+        daemon = _daemon(server.url, folder, debounce=0.1)
+        thread = threading.Thread(target=daemon.run)
+        thread.start()
+        try:
+            assert _wait_for(lambda: daemon.processed == 1)
+            (folder / "new.txt").write_text("Speaker 2: just arrived\n")
+            assert _wait_for(lambda: daemon.processed == 2)
+        finally:
+            daemon.stop()
+            thread.join()
+            daemon.close()
+        assert len(server.completions) == 2
+
+        # Restart: nothing changed, nothing is sent
+        daemon = _daemon(server.url, folder)
+        assert daemon.reconcile() == []
+
+        # Touched but identical content is re-stamped, not re-processed
+        os.utime(folder / "existing.txt", (time.time() + 10, time.time() + 10))
+        (folder / "new.txt").write_text("Speaker 2: edited\n")
+        (folder / "later.txt").write_text("Speaker 3: while stopped\n")
+        assert daemon.reconcile() == [str(folder / "later.txt"), str(folder / "new.txt")]
+
+        assert daemon.run(once=True) == {"processed": 2, "failed": 0}
+        assert daemon.reconcile() == []
+        daemon.close()
+        assert len(server.completions) == 4
+
+
+def test_failed_files_are_retried_on_restart(tmp_path):
+    (tmp_path / "meeting.txt").write_text("Speaker 1: hello\n")
+    with MockOpenWebUIServer(error_rate=1.0) as server:
+        daemon = _daemon(server.url, tmp_path)
+        daemon.runner.client.uploader.settings['max_attempts'] = 1
+        assert daemon.run(once=True) == {"processed": 0, "failed": 1}
+        daemon.close()
+
+        server.error_rate = 0.0
+        daemon = _daemon(server.url, tmp_path)
+        assert daemon.run(once=True) == {"processed": 1, "failed": 0}
+        daemon.close()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Daemon entry point: process new transcripts as they land in the transcript folder."""
+
+import argparse
+import json
+import os
+import signal
+import sys
+from dotenv import load_dotenv
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
+
+# Load environment variables from .env file
+load_dotenv()
+
+from src.batch import BatchRunner
+from src.utils.config import Config
+from src.utils.logger import setup_logging
+from src.watcher import WatchDaemon
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Watch the transcript folder and upload and chat about every new file.")
+    parser.add_argument('--folder', help="Folder to watch (default: paths.transcript_folder)")
+    parser.add_argument('--pattern', help="File name pattern (default: batch.pattern)")
+    parser.add_argument('--model', help="Model to use (default: models.default)")
+    parser.add_argument('--workers', type=int, help="Files processed in parallel (default: batch.workers)")
+    parser.add_argument('--prompt', help="User message sent with every transcript (default: chat.prompt)")
+    parser.add_argument('--backend', choices=['auto', 'inotify', 'polling'], help="How to watch the folder (default: watch.backend)")
+    parser.add_argument('--debounce', type=float, help="Seconds a file must stay unchanged (default: watch.debounce_seconds)")
+    parser.add_argument('--once', action='store_true', help="Process files that are new since the last run, then exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    config = Config()
+    # Human-readable logs go to stderr so stdout stays machine-readable;
+    # the JSON log file is written by a background thread
+    setup_logging(config.get_log_config(), console=sys.stderr)
+    runner = BatchRunner(config, workers=args.workers, prompt=args.prompt)
+    daemon = WatchDaemon(
+        config,
+        args.model or config.get_default_model(),
+        runner=runner,
+        folder=args.folder,
+        pattern=args.pattern,
+        backend=args.backend,
+        debounce=args.debounce
+    )
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: daemon.stop())
+
+    try:
+        counts = daemon.run(once=args.once)
+    finally:
+        daemon.close()
+    print(json.dumps(counts))
+    return 0 if counts["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())